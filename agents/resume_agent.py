@@ -1,23 +1,39 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
+from pydantic import ValidationError
 from datetime import datetime
 from models.user_profile import (
     UserProfile, ScrapedJobData, JobSearchParams, ResumeAnalysisResult
 )
-from utils.prompt_templates import get_resume_analysis_prompt
+from utils.prompt_templates import get_resume_analysis_prompt, get_batch_resume_analysis_prompt
 import google.genai as genai
 from google.genai import types
 from dotenv import load_dotenv
 import os
 import json
-from scraper import scrape_indeed_jobs
-from services.rag_service import RAGService
+import asyncio
+import hashlib
+from scraper import get_job_description_store
+from services.rag_service import RAGService, get_rag_service
 
 
 class ResumeAnalyzer:
-    def __init__(self):
+    # Single and batch analyses currently running, shared by every analyzer instance
+    # so identical concurrent requests await one LLM call instead of starting their own
+    _inflight: Dict[str, "asyncio.Future[Union[ResumeAnalysisResult, Dict[str, ResumeAnalysisResult]]]"] = {}
+    _coalesced_requests: int = 0
+
+    def __init__(self, rag_service: Optional[RAGService] = None):
         load_dotenv()
         self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
         self.model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+        self._rag_service = rag_service
+
+    @property
+    def rag_service(self) -> RAGService:
+        """RAG service used for ideal profiles (the shared instance unless one was injected)"""
+        if self._rag_service is None:
+            self._rag_service = get_rag_service()
+        return self._rag_service
         
     async def analyze_resume_and_jd(
         self,
@@ -28,6 +44,9 @@ class ResumeAnalyzer:
         """
         Main function to analyze resume against job description using RAG
         
+        Concurrent calls with the same profile, job parameters and use_rag share a
+        single in-flight analysis; each caller gets its own copy of the result.
+        
         Args:
             user_profile: Structured user profile data
             job_params: Either URL or job title + location
@@ -36,128 +55,348 @@ class ResumeAnalyzer:
         Returns:
             ResumeAnalysisResult
         """
+        key = self._analysis_key(user_profile, job_params, use_rag)
+        inflight = ResumeAnalyzer._inflight.get(key)
+        if inflight is not None:
+            ResumeAnalyzer._coalesced_requests += 1
+            print(f"🔁 Joining in-flight analysis for: {job_params.job_title or job_params.url}")
+        else:
+            inflight = asyncio.ensure_future(self._run_analysis(user_profile, job_params, use_rag))
+            ResumeAnalyzer._inflight[key] = inflight
+            inflight.add_done_callback(lambda task: self._release_inflight(key, task))
+
+        # Shield so a cancelled caller does not cancel the analysis for the others
+        result = await asyncio.shield(inflight)
+        return result.model_copy(deep=True)
+
+    async def _run_analysis(
+        self,
+        user_profile: UserProfile,
+        job_params: JobSearchParams,
+        use_rag: bool,
+    ) -> ResumeAnalysisResult:
+        """Resolve the job context and run the analysis (one in-flight call per key)"""
         try:
-            ideal_profile_data = None
-            job_scraped_data = None
-            
-            # 1. Use RAG to find ideal candidate profiles instead of scraping
-            if use_rag and job_params.job_title:
+            job_scraped_data, ideal_profile_data, use_rag = await self._resolve_job_data(job_params, use_rag)
+            return await self._analyze_single(user_profile, job_scraped_data, ideal_profile_data, use_rag)
+
+        except Exception as e:
+            print(f"Error in analyze_resume_and_jd: {str(e)}")
+            raise Exception(f"Resume analysis failed: {str(e)}") from e
+
+    def _analysis_key(self, user_profile: UserProfile, job_params: JobSearchParams, use_rag: bool) -> str:
+        """
+        Key identifying an analysis by candidate profile, job parameters and RAG usage
+
+        With RAG the ideal-profile collection is part of the key, so analyzers
+        bound to different tenants' collections never share a result.
+        """
+        payload = json.dumps(
+            {
+                "profile": user_profile.model_dump(mode='json'),
+                "job": job_params.model_dump(mode='json'),
+                "use_rag": use_rag,
+                "collection": self.rag_service.collection.name if use_rag else None,
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _batch_key(
+        self,
+        user_profiles: Dict[str, UserProfile],
+        job_params: JobSearchParams,
+        use_rag: bool,
+        batch_size: int,
+    ) -> str:
+        """Key identifying a batch analysis by its candidates (in any order), job, RAG usage and batch size"""
+        candidate_keys = sorted(
+            (candidate_id, self._analysis_key(profile, job_params, use_rag))
+            for candidate_id, profile in user_profiles.items()
+        )
+        payload = json.dumps({"batch": candidate_keys, "batch_size": batch_size}, separators=(',', ':'))
+        return "batch:" + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _release_inflight(key: str, task: "asyncio.Future") -> None:
+        if ResumeAnalyzer._inflight.get(key) is task:
+            del ResumeAnalyzer._inflight[key]
+
+    @classmethod
+    def get_coalescing_stats(cls) -> Dict[str, int]:
+        """Get counters for request coalescing of identical single and batch analyses"""
+        return {
+            "in_flight": len(cls._inflight),
+            "coalesced_requests": cls._coalesced_requests,
+        }
+
+    async def analyze_candidates_batch(
+        self,
+        user_profiles: Dict[str, UserProfile],
+        job_params: JobSearchParams,
+        use_rag: bool = True,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, ResumeAnalysisResult]:
+        """
+        Analyze many candidates against the same job with shared job context
+        
+        The job description and ideal profile are resolved once and sent once per
+        batch together with up to batch_size compact candidate profiles. Each item of
+        the batched response is validated with the same rules as a single analysis;
+        candidates whose item is missing or invalid fall back to a single-candidate call.
+        Concurrent calls with the same candidates, job parameters, use_rag and
+        batch_size share a single in-flight batch analysis; each caller gets its
+        own copies of the results.
+        
+        Args:
+            user_profiles: Mapping of candidate ID to structured user profile data
+            job_params: Either URL or job title + location
+            use_rag: Whether to use RAG for ideal candidate matching (default: True)
+            batch_size: Candidates per LLM call (default: ANALYSIS_BATCH_SIZE env or 8)
+        
+        Returns:
+            Mapping of candidate ID to ResumeAnalysisResult. Candidates that could not
+            be analyzed even with the single-candidate fallback are omitted.
+        """
+        if not user_profiles:
+            return {}
+
+        batch_size = batch_size or int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))
+        key = self._batch_key(user_profiles, job_params, use_rag, batch_size)
+        inflight = ResumeAnalyzer._inflight.get(key)
+        if inflight is not None:
+            ResumeAnalyzer._coalesced_requests += 1
+            print(f"🔁 Joining in-flight batch analysis of {len(user_profiles)} candidates for: "
+                  f"{job_params.job_title or job_params.url}")
+        else:
+            inflight = asyncio.ensure_future(self._run_batch(user_profiles, job_params, use_rag, batch_size))
+            ResumeAnalyzer._inflight[key] = inflight
+            inflight.add_done_callback(lambda task: self._release_inflight(key, task))
+
+        # Shield so a cancelled caller does not cancel the others
+        results = await asyncio.shield(inflight)
+        return {cid: result.model_copy(deep=True) for cid, result in results.items()}
+
+    async def _run_batch(
+        self,
+        user_profiles: Dict[str, UserProfile],
+        job_params: JobSearchParams,
+        use_rag: bool,
+        batch_size: int,
+    ) -> Dict[str, ResumeAnalysisResult]:
+        """Resolve the job context once and analyze the candidates in batches (one in-flight call per key)"""
+        job_scraped_data, ideal_profile_data, use_rag = await self._resolve_job_data(job_params, use_rag)
+
+        results: Dict[str, ResumeAnalysisResult] = {}
+        failed_ids: List[str] = []
+        candidate_ids = list(user_profiles.keys())
+
+        for i in range(0, len(candidate_ids), batch_size):
+            chunk = {cid: user_profiles[cid] for cid in candidate_ids[i:i + batch_size]}
+            prompt = get_batch_resume_analysis_prompt(profiles=chunk, job_data=job_scraped_data)
+
+            try:
+                llm_response = await self._generate_json(prompt)
+                parsed_items = self._parse_batch_response(llm_response, list(chunk.keys()))
+            except Exception as e:
+                print(f"⚠️  Batch analysis failed: {str(e)}, falling back to single-candidate calls")
+                parsed_items = {}
+
+            for cid in chunk:
+                if cid not in parsed_items:
+                    failed_ids.append(cid)
+                    continue
                 try:
-                    rag_service = RAGService()
-                    
-                    # Search for ideal profiles based on job title
-                    query = job_params.job_title
-                    ideal_profiles = await rag_service.search_ideal_profiles(
-                        query=query,
+                    results[cid] = self._build_result(parsed_items[cid], job_scraped_data, ideal_profile_data, use_rag)
+                except ValidationError as e:
+                    print(f"⚠️  Invalid batch item for candidate {cid}: {str(e)}")
+                    failed_ids.append(cid)
+
+        # Fall back to single-candidate calls for items the batch could not answer
+        for cid in failed_ids:
+            try:
+                results[cid] = await self._analyze_single(
+                    user_profiles[cid], job_scraped_data, ideal_profile_data, use_rag
+                )
+            except Exception as e:
+                print(f"Failed to analyze candidate {cid}: {str(e)}")
+
+        print(f"\n=== Batch analysis: {len(results)}/{len(user_profiles)} candidates, {len(failed_ids)} single-call fallbacks ===")
+        return results
+
+    async def _resolve_job_data(
+        self,
+        job_params: JobSearchParams,
+        use_rag: bool,
+    ) -> Tuple[ScrapedJobData, Optional[Dict], bool]:
+        """
+        Resolve the job context for an analysis
+        
+        Returns:
+            Tuple of (job data, ideal profile data or None, whether RAG was used)
+        """
+        ideal_profile_data = None
+        job_scraped_data = None
+        
+        # 1. Use RAG to find ideal candidate profiles instead of scraping
+        if use_rag and job_params.job_title:
+            try:
+                # Look up the ideal profile for the job title (memoized across analyses)
+                ideal_match = await self.rag_service.get_ideal_profile(job_params.job_title)
+                
+                if ideal_match:
+                    ideal_profile_data = ideal_match['profile']
+                    job_scraped_data = ScrapedJobData(
+                        job_title=ideal_profile_data.get('job_title', job_params.job_title),
+                        job_description=ideal_profile_data.get('job_description', '')
+                    )
+                    print(f"✅ Found ideal profile via RAG for: {job_params.job_title}")
+                else:
+                    print(f"⚠️  No ideal profile found in RAG for: {job_params.job_title}, using fallback")
+                    # Fallback to minimal job data
+                    job_scraped_data = ScrapedJobData(
                         job_title=job_params.job_title,
-                        n_results=1
+                        job_description=f"Position for {job_params.job_title} in {job_params.location or 'N/A'}"
                     )
-                    
-                    if ideal_profiles and len(ideal_profiles) > 0:
-                        ideal_profile_data = ideal_profiles[0]['profile']
-                        job_scraped_data = ScrapedJobData(
-                            job_title=ideal_profile_data.get('job_title', job_params.job_title),
-                            job_description=ideal_profile_data.get('job_description', '')
-                        )
-                        print(f"✅ Found ideal profile via RAG for: {job_params.job_title}")
-                    else:
-                        print(f"⚠️  No ideal profile found in RAG for: {job_params.job_title}, using fallback")
-                        # Fallback to minimal job data
-                        job_scraped_data = ScrapedJobData(
-                            job_title=job_params.job_title,
-                            job_description=f"Position for {job_params.job_title} in {job_params.location or 'N/A'}"
-                        )
-                except Exception as e:
-                    print(f"⚠️  RAG search failed: {str(e)}, falling back to scraping")
-                    use_rag = False  # Fall back to scraping
+            except Exception as e:
+                print(f"⚠️  RAG search failed: {str(e)}, falling back to scraping")
+                use_rag = False  # Fall back to scraping
+        
+        # 2. Fallback to the scraped job store (scrapes only on a miss) if RAG not used or failed
+        if not use_rag or not job_scraped_data:
+            job_data = await get_job_description_store().get_or_fetch(job_params)
             
-            # 2. Fallback to scraping if RAG not used or failed
-            if not use_rag or not job_scraped_data:
-                job_data = await scrape_indeed_jobs(search_params=job_params)
-                
-                # Handle scraping result
-                if isinstance(job_data, object) and "error" in job_data:
-                    print(f"Scraping returned error: {job_data['error']}")
-                    # If scraping failed, use the search parameters to create a minimal job data
-                    if job_params.job_title and job_params.location:
-                        job_scraped_data = ScrapedJobData(
-                            job_title=job_params.job_title,
-                            job_description=f"Position for {job_params.job_title} in {job_params.location}. Full job details could not be retrieved."
-                        )
-                    else:
-                        # If we don't have job params either, use default values
-                        job_scraped_data = ScrapedJobData(
-                            job_title="Software Engineer",  # Default title
-                            job_description="Generic software engineering position. Full job details could not be retrieved."
-                        )
-                elif isinstance(job_data, dict):
-                    # If we got a dict with actual job data
+            # Handle scraping result
+            if isinstance(job_data, object) and "error" in job_data:
+                print(f"Scraping returned error: {job_data['error']}")
+                # If scraping failed, use the search parameters to create a minimal job data
+                if job_params.job_title and job_params.location:
                     job_scraped_data = ScrapedJobData(
-                        job_title=job_data.get("title") or job_params.job_title or "Software Engineer",
-                        job_description=job_data.get("description") or f"Position for {job_params.job_title} in {job_params.location}"
+                        job_title=job_params.job_title,
+                        job_description=f"Position for {job_params.job_title} in {job_params.location}. Full job details could not be retrieved."
                     )
                 else:
-                    # If we got a ScrapedJobData directly
-                    job_scraped_data = job_data
+                    # If we don't have job params either, use default values
+                    job_scraped_data = ScrapedJobData(
+                        job_title="Software Engineer",  # Default title
+                        job_description="Generic software engineering position. Full job details could not be retrieved."
+                    )
+            elif isinstance(job_data, dict):
+                # If we got a dict with actual job data
+                job_scraped_data = ScrapedJobData(
+                    job_title=job_data.get("title") or job_params.job_title or "Software Engineer",
+                    job_description=job_data.get("description") or f"Position for {job_params.job_title} in {job_params.location}"
+                )
+            else:
+                # If we got a ScrapedJobData directly
+                job_scraped_data = job_data
 
+        return job_scraped_data, ideal_profile_data, use_rag
 
-            # 2. Format data for prompt
-            prompt = get_resume_analysis_prompt(
-                profile=user_profile,
-                job_data=job_scraped_data
-            )
+    async def _analyze_single(
+        self,
+        user_profile: UserProfile,
+        job_scraped_data: ScrapedJobData,
+        ideal_profile_data: Optional[Dict],
+        use_rag: bool,
+    ) -> ResumeAnalysisResult:
+        """Run a single-candidate LLM analysis against already resolved job data"""
+        # 1. Format data for prompt
+        prompt = get_resume_analysis_prompt(
+            profile=user_profile,
+            job_data=job_scraped_data
+        )
+
+        # 2. Call LLM for analysis
+        llm_response = await self._generate_json(prompt)
+        #print("Raw LLM Response:", llm_response)
+        
+        # 3. Parse and validate response
+        parsed_response = self._parse_llm_response(llm_response)
+
+        # 4. Create result object with enhanced metadata
+        result = self._build_result(parsed_response, job_scraped_data, ideal_profile_data, use_rag)
+        print("\n=== Analyzing Resume and JD ===")
+        print(result)
+        return result
 
-            # 3. Call LLM for analysis
-            full_prompt = f"""You are a resume analysis expert. You MUST respond with ONLY a valid JSON object, with no additional text, explanations, or XML tags.
+    async def _generate_json(self, prompt: str) -> str:
+        """Call the LLM with a prompt that must be answered with JSON only"""
+        full_prompt = f"""You are a resume analysis expert. You MUST respond with ONLY a valid JSON object, with no additional text, explanations, or XML tags.
 
 {prompt}"""
-            
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    response_mime_type="application/json"
-                )
-            )
-            
-            # 4. Parse and validate response
-            llm_response = response.text
-            #print("Raw LLM Response:", llm_response)
-            
-            # 5. Parse response
-            parsed_response = self._parse_llm_response(llm_response)
-
-            # 6. Create result object with enhanced metadata
-            metadata = {
-                'job_title': job_scraped_data.job_title,
-                'job_description': job_scraped_data.job_description,
-                'analysis_timestamp': datetime.now().isoformat(),
-                'rag_used': use_rag,
-                # Add detailed scoring criteria for quick judgment
-                'candidate_overview': parsed_response.get('candidate_overview', ''),
-                'section_scores': parsed_response.get('section_scores', {}),
-                'quick_judgment': parsed_response.get('quick_judgment', {})
-            }
-            
-            # Include ideal profile data if available
-            if ideal_profile_data:
-                metadata['ideal_profile'] = ideal_profile_data
-            
-            result = ResumeAnalysisResult(
-                match_score=parsed_response['match_score'],
-                suggestions=parsed_response['suggestions'],
-                key_matches=parsed_response['key_matches'],
-                gaps=parsed_response['gaps'],
-                metadata=metadata
+        
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=full_prompt,
+            config=types.GenerateContentConfig(
+                temperature=0.7,
+                response_mime_type="application/json"
             )
-            print("\n=== Analyzing Resume and JD ===")
-            print(result)
-            return result
+        )
+        return response.text
 
-        except Exception as e:
-            print(f"Error in analyze_resume_and_jd: {str(e)}")
-            raise Exception(f"Resume analysis failed: {str(e)}") from e
+    def _build_result(
+        self,
+        parsed_response: Dict,
+        job_scraped_data: ScrapedJobData,
+        ideal_profile_data: Optional[Dict],
+        use_rag: bool,
+    ) -> ResumeAnalysisResult:
+        """Create a result object with enhanced metadata from a validated LLM response"""
+        metadata = {
+            'job_title': job_scraped_data.job_title,
+            'job_description': job_scraped_data.job_description,
+            'analysis_timestamp': datetime.now().isoformat(),
+            'rag_used': use_rag,
+            # Add detailed scoring criteria for quick judgment
+            'candidate_overview': parsed_response.get('candidate_overview', ''),
+            'section_scores': parsed_response.get('section_scores', {}),
+            'quick_judgment': parsed_response.get('quick_judgment', {})
+        }
+        
+        # Include ideal profile data if available
+        if ideal_profile_data:
+            metadata['ideal_profile'] = ideal_profile_data
+        
+        return ResumeAnalysisResult(
+            match_score=parsed_response['match_score'],
+            suggestions=parsed_response['suggestions'],
+            key_matches=parsed_response['key_matches'],
+            gaps=parsed_response['gaps'],
+            metadata=metadata
+        )
+
+    def _parse_batch_response(self, llm_response: str, candidate_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Parse a batched LLM response into per-candidate validated responses
+        
+        Items are validated individually with _parse_llm_response; invalid items,
+        unknown candidate IDs and duplicates are dropped so the caller can fall back.
+        """
+        if not llm_response:
+            raise ValueError("Empty response from LLM")
+
+        parsed = json.loads(llm_response[llm_response.find('{'):llm_response.rfind('}') + 1])
+        items = parsed.get('results') if isinstance(parsed, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("Batch response must contain a 'results' list")
+
+        expected = set(candidate_ids)
+        validated: Dict[str, Dict] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            cid = str(item.get('candidate_id', ''))
+            if cid not in expected or cid in validated:
+                continue
+            try:
+                validated[cid] = self._parse_llm_response(json.dumps(item))
+            except ValueError as e:
+                print(f"⚠️  Invalid batch item for candidate {cid}: {str(e)}")
+
+        return validated
 
     def _parse_llm_response(self, llm_response: str) -> Dict:
         """Parse and validate LLM response"""
@@ -196,6 +435,8 @@ class ResumeAnalyzer:
             # Validate score range
             if not (0 <= parsed['match_score'] <= 100):
                 raise ValueError("match_score must be between 0 and 100")
+            # ResumeAnalysisResult.match_score is an int
+            parsed['match_score'] = int(round(parsed['match_score']))
             
             # Set default values for new fields if not present (backward compatibility)
             if 'candidate_overview' not in parsed:
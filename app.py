@@ -1,27 +1,94 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
 from typing import List, Optional
 from agents.resume_extractor import ResumeExtractor
 from agents.resume_agent import ResumeAnalyzer
 from models.user_profile import UserProfile, JobSearchParams
-from services.rag_service import RAGService
+from auth.security import get_optional_user, require_role
+from database.models import User
+from services.rag_service import (
+    RAGService, SEARCH_MODES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_rag_service, get_embedding_provider
+)
+from services.candidate_index import CandidateIndex, get_candidate_index
+from services.dashboard_aggregates import DashboardAggregates
+from services.skill_index import SkillIndex
+from services.tenant_collections import get_tenant_collections
+from services.vector_snapshot import import_snapshot
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import os
+import time
 import uuid
 from datetime import datetime
 
+async def warm_up_embeddings():
+    """Load the embedding model and run one forward pass off the event loop"""
+    provider = get_embedding_provider()
+    try:
+        await asyncio.to_thread(provider.warmup)
+        print(f"✅ Embedding model ready: {provider.model_name}")
+    except Exception as e:
+        print(f"⚠️  Embedding model warmup failed: {str(e)}")
+
+def boot_from_snapshot(rag_service: RAGService) -> None:
+    """Import RAG_SNAPSHOT_PATH into an empty ideal-profile collection (see database/snapshot.py)"""
+    snapshot_path = os.getenv("RAG_SNAPSHOT_PATH")
+    if not snapshot_path or rag_service.collection.count():
+        return
+    try:
+        start = time.perf_counter()
+        header = import_snapshot(rag_service, snapshot_path)
+        print(f"✅ Booted {header['count']} ideal profiles from snapshot in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"⚠️  Snapshot import failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create long-lived services once per process and warm up the embedding model"""
+    app.state.rag_service = get_rag_service()
+    boot_from_snapshot(app.state.rag_service)
+    app.state.candidate_index = get_candidate_index()
+    app.state.tenant_collections = get_tenant_collections()
+    warmup_task = asyncio.create_task(warm_up_embeddings())
+    yield
+    warmup_task.cancel()
+
 app = FastAPI(
     title="Talent Intelligence Platform",
     description="AI-powered candidate analytics and market intelligence showcase",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
+def get_rag(request: Request, current_user: Optional[User] = Depends(get_optional_user)) -> RAGService:
+    """
+    Dependency returning the RAG service for the request
+
+    Authenticated users get their organization's own ideal-profile
+    collection once it has profiles; anonymous requests, and organizations
+    that have not synced any profiles yet, read the app's shared collection.
+    """
+    if current_user is None:
+        return request.app.state.rag_service
+    tenant_service = request.app.state.tenant_collections.get(current_user.organization_id)
+    return tenant_service if tenant_service.has_profiles() else request.app.state.rag_service
+
+def get_candidates_index(request: Request) -> CandidateIndex:
+    """Dependency returning the app's shared candidate embedding index"""
+    return request.app.state.candidate_index
+
 # In-memory storage for showcase
 candidates_store = {}
 analyses_store = {}
+# Technical skill -> candidate IDs over candidates_store, kept in sync on upload and delete
+skill_index = SkillIndex()
+# Running analysis statistics over analyses_store, updated as analyses are stored
+dashboard_aggregates = DashboardAggregates(skill_index)
 
 # Mount static files
 static_path = Path(__file__).parent / "frontend" / "static"
@@ -45,6 +112,16 @@ class CandidateResponse(BaseModel):
     ocr_confidence: Optional[float] = None
     created_at: str
 
+class IdealProfileBatchSearchRequest(BaseModel):
+    queries: List[str]
+    job_titles: Optional[List[Optional[str]]] = None
+    n_results: int = 3
+    mode: Optional[str] = None
+
+class IdealProfileSyncRequest(BaseModel):
+    profiles: List[dict]
+    delete_missing: bool = False
+
 class AnalysisResponse(BaseModel):
     id: str
     candidate_id: str
@@ -64,10 +141,36 @@ async def read_root():
         return FileResponse(frontend_path)
     return {"message": "Frontend not found. API is running at /docs"}
 
+@app.get("/api/ready")
+async def readiness():
+    """Report ready only once the embedding model has been loaded and warmed up"""
+    provider = get_embedding_provider()
+    body = {
+        "ready": provider.ready,
+        "embedding_model": provider.model_name,
+        "error": provider.error
+    }
+    return JSONResponse(status_code=200 if provider.ready else 503, content=body)
+
 # ===== Candidate Management =====
 
+def store_candidate(candidate: CandidateResponse, profile: UserProfile) -> None:
+    """Save an uploaded candidate and index their technical skills"""
+    candidates_store[candidate.id] = candidate.model_dump()
+    skill_index.add(candidate.id, profile.skills.technical if profile.skills else [])
+
+async def index_candidates(candidate_index: CandidateIndex, profiles: dict):
+    """Add uploaded candidates to the embedding index; recall is best effort"""
+    try:
+        await candidate_index.upsert_candidates(profiles)
+    except Exception as e:
+        print(f"⚠️  Failed to index candidates: {str(e)}")
+
 @app.post("/api/candidates/upload", response_model=CandidateResponse)
-async def upload_candidate_resume(file: UploadFile = File(...)):
+async def upload_candidate_resume(
+    file: UploadFile = File(...),
+    candidate_index: CandidateIndex = Depends(get_candidates_index)
+):
     """Upload a resume and extract profile data"""
     # Validate file type
     allowed_extensions = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp']
@@ -96,16 +199,21 @@ async def upload_candidate_resume(file: UploadFile = File(...)):
             created_at=datetime.now().isoformat()
         )
         
-        candidates_store[candidate_id] = candidate.model_dump()
+        store_candidate(candidate, profile)
+        await index_candidates(candidate_index, {candidate_id: profile})
         return candidate
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process resume: {str(e)}")
 
 @app.post("/api/candidates/batch-upload")
-async def batch_upload_resumes(files: List[UploadFile] = File(...)):
+async def batch_upload_resumes(
+    files: List[UploadFile] = File(...),
+    candidate_index: CandidateIndex = Depends(get_candidates_index)
+):
     """Upload multiple resumes at once"""
     successful = []
+    uploaded_profiles = {}
     failed = 0
     
     for file in files:
@@ -130,12 +238,15 @@ async def batch_upload_resumes(files: List[UploadFile] = File(...)):
                 created_at=datetime.now().isoformat()
             )
             
-            candidates_store[candidate_id] = candidate.model_dump()
+            store_candidate(candidate, profile)
+            uploaded_profiles[candidate_id] = profile
             successful.append(candidate)
             
         except Exception:
             failed += 1
     
+    await index_candidates(candidate_index, uploaded_profiles)
+    
     return {
         "successful": len(successful),
         "failed": failed,
@@ -154,13 +265,30 @@ async def get_candidate(candidate_id: str):
         raise HTTPException(status_code=404, detail="Candidate not found")
     return CandidateResponse(**candidates_store[candidate_id])
 
+@app.delete("/api/candidates/{candidate_id}")
+async def delete_candidate(
+    candidate_id: str,
+    candidate_index: CandidateIndex = Depends(get_candidates_index)
+):
+    """Delete a candidate and remove them from the skill and embedding indexes"""
+    if candidate_id not in candidates_store:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    del candidates_store[candidate_id]
+    skill_index.remove(candidate_id)
+    try:
+        await candidate_index.remove_candidate(candidate_id)
+    except Exception as e:
+        print(f"⚠️  Failed to remove candidate from index: {str(e)}")
+    return {"deleted": candidate_id}
+
 @app.post("/api/candidates/{candidate_id}/analyze", response_model=AnalysisResponse)
 async def analyze_candidate(
     candidate_id: str,
     job_title: str,
     job_location: Optional[str] = None,
     job_url: Optional[str] = None,
-    use_rag: bool = True
+    use_rag: bool = True,
+    rag_service: RAGService = Depends(get_rag)
 ):
     """Analyze a candidate against a job using RAG"""
     if candidate_id not in candidates_store:
@@ -176,7 +304,7 @@ async def analyze_candidate(
     )
     
     try:
-        resume_analyzer = ResumeAnalyzer()
+        resume_analyzer = ResumeAnalyzer(rag_service=rag_service)
         analysis_result = await resume_analyzer.analyze_resume_and_jd(
             user_profile=profile,
             job_params=job_params,
@@ -196,23 +324,43 @@ async def analyze_candidate(
         )
         
         analyses_store[analysis_id] = analysis.model_dump()
+        dashboard_aggregates.record_analysis(analyses_store[analysis_id])
         return analysis
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.get("/api/analysis/stats")
+async def get_analysis_stats():
+    """Get request coalescing counters for candidate analyses"""
+    return ResumeAnalyzer.get_coalescing_stats()
+
 # ===== Ideal Candidate Profiles (RAG) =====
 
 @app.get("/api/ideal-profiles")
-async def list_ideal_profiles():
-    """List all ideal candidate profiles in ChromaDB"""
+async def list_ideal_profiles(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    job_title: Optional[str] = None,
+    include_document: bool = False,
+    rag_service: RAGService = Depends(get_rag)
+):
+    """
+    List ideal candidate profiles one page at a time
+
+    Pass next_cursor from a response as cursor to get the next page; fields is
+    a comma-separated list of profile fields to return (default: all) and
+    job_title filters by title text.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
     try:
-        rag_service = RAGService()
-        profiles = await rag_service.get_all_profiles()
-        stats = rag_service.get_collection_stats()
+        page = await rag_service.list_profiles(limit, cursor, field_list, job_title, include_document)
         return {
-            "profiles": profiles,
-            "stats": stats
+            **page,
+            "stats": {"profile_count": rag_service.collection.count()}
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,21 +369,71 @@ async def list_ideal_profiles():
 async def search_ideal_profiles(
     query: str,
     job_title: Optional[str] = None,
-    n_results: int = 3
+    n_results: int = 3,
+    mode: Optional[str] = None,
+    rag_service: RAGService = Depends(get_rag)
 ):
-    """Search ideal candidate profiles using RAG"""
+    """Search ideal candidate profiles using RAG (mode: hybrid, vector or lexical)"""
+    if mode is not None and mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
     try:
-        rag_service = RAGService()
-        results = await rag_service.search_ideal_profiles(query, job_title, n_results)
+        results = await rag_service.search_ideal_profiles(query, job_title, n_results, mode)
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ideal-profiles/search/batch")
+async def search_ideal_profiles_batch(
+    request: IdealProfileBatchSearchRequest,
+    rag_service: RAGService = Depends(get_rag)
+):
+    """Search ideal candidate profiles for many queries with one embedding pass"""
+    if request.job_titles is not None and len(request.job_titles) != len(request.queries):
+        raise HTTPException(status_code=400, detail="job_titles must have the same length as queries")
+    if request.mode is not None and request.mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+    try:
+        results = await rag_service.search_ideal_profiles_batch(
+            request.queries, request.job_titles, request.n_results, request.mode
+        )
+        return {
+            "results": [
+                {"query": query, "results": matches}
+                for query, matches in zip(request.queries, results)
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/ideal-profiles/sync")
+async def sync_ideal_profiles(
+    request: IdealProfileSyncRequest,
+    app_request: Request,
+    current_user: User = Depends(require_role(["admin", "recruiter"]))
+):
+    """
+    Sync ideal profiles into the caller's organization collection
+
+    Profiles not in the request are kept unless delete_missing is set. The
+    shared collection is only synced with database/load_profiles.py.
+    """
+    rag_service = app_request.app.state.tenant_collections.get(current_user.organization_id)
+    if any(not profile.get("job_title") for profile in request.profiles):
+        raise HTTPException(status_code=400, detail="Every profile needs a job_title")
+    try:
+        return await rag_service.sync_profiles(request.profiles, delete_missing=request.delete_missing)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/ideal-profiles/tenants")
+async def get_ideal_profile_tenants(request: Request, current_user: User = Depends(require_role(["admin"]))):
+    """Get the open per-organization collections and their memory (admins only)"""
+    return request.app.state.tenant_collections.stats()
+
 @app.get("/api/ideal-profiles/stats")
-async def get_ideal_profiles_stats():
+async def get_ideal_profiles_stats(rag_service: RAGService = Depends(get_rag)):
     """Get statistics about ideal candidate profiles collection"""
     try:
-        rag_service = RAGService()
         stats = rag_service.get_collection_stats()
         return stats
     except Exception as e:
@@ -293,13 +491,7 @@ async def get_skills_gap_analysis():
     if not candidates_store:
         return {"message": "No candidates found"}
     
-    all_skills = {}
-    for candidate_data in candidates_store.values():
-        profile = UserProfile(**candidate_data['profile_data'])
-        if profile.skills and profile.skills.technical:
-            for skill in profile.skills.technical:
-                all_skills[skill] = all_skills.get(skill, 0) + 1
-    
+    all_skills = skill_index.counts()
     total = len(candidates_store)
     skill_coverage = {
         skill: {
@@ -321,21 +513,8 @@ async def get_statistics():
     if not candidates_store:
         return {"total_candidates": 0}
     
-    # Get average match score from analyses
-    if analyses_store:
-        avg_score = sum(a['match_score'] for a in analyses_store.values()) / len(analyses_store)
-    else:
-        avg_score = 0
-    
-    # Top skills
-    all_skills = {}
-    for candidate_data in candidates_store.values():
-        profile = UserProfile(**candidate_data['profile_data'])
-        if profile.skills and profile.skills.technical:
-            for skill in profile.skills.technical:
-                all_skills[skill] = all_skills.get(skill, 0) + 1
-    
-    top_skills = sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10]
+    avg_score = dashboard_aggregates.average_match_score
+    top_skills = dashboard_aggregates.top_skills(10)
     
     return {
         "total_candidates": len(candidates_store),
@@ -349,70 +528,100 @@ async def get_statistics():
 @app.get("/api/market-intelligence/skill-benchmarks")
 async def get_skill_benchmarks(job_title: str):
     """Get skill benchmarks for a job title"""
-    # Simple benchmark based on existing analyses
-    relevant_analyses = [
-        a for a in analyses_store.values()
-        if a.get('job_title') == job_title
-    ]
+    # Percentiles of the match scores of existing analyses for the job
+    benchmarks = dashboard_aggregates.job_benchmarks(job_title)
     
-    if not relevant_analyses:
+    if benchmarks is None:
         return {
             "message": "Insufficient data for benchmarks",
             "job_title": job_title,
             "sample_size": 0
         }
     
-    scores = [a['match_score'] for a in relevant_analyses]
-    sorted_scores = sorted(scores)
-    
-    return {
-        "job_title": job_title,
-        "sample_size": len(relevant_analyses),
-        "benchmarks": {
-            "p50": sorted_scores[len(sorted_scores) // 2] if sorted_scores else 0,
-            "p75": sorted_scores[int(len(sorted_scores) * 0.75)] if sorted_scores else 0,
-            "p90": sorted_scores[int(len(sorted_scores) * 0.9)] if sorted_scores else 0,
-            "mean": sum(scores) / len(scores) if scores else 0
-        }
-    }
+    return {"job_title": job_title, **benchmarks}
 
 # ===== Shortlisting =====
 
+@app.get("/api/shortlisting/recall")
+async def recall_candidates(
+    job_title: str,
+    n_results: int = 20,
+    rag_service: RAGService = Depends(get_rag),
+    candidate_index: CandidateIndex = Depends(get_candidates_index)
+):
+    """Get the candidates nearest to a job's ideal profile by embedding similarity, without LLM analysis"""
+    if not job_title:
+        raise HTTPException(status_code=400, detail="job_title is required")
+    
+    try:
+        start = time.perf_counter()
+        ideal_match = await rag_service.get_ideal_profile(job_title)
+        matches = await candidate_index.search(
+            ideal_match['document'] if ideal_match and ideal_match.get('document') else job_title,
+            n_results
+        )
+        matches = [m for m in matches if m['candidate_id'] in candidates_store]
+        return {
+            "job_title": job_title,
+            "ideal_profile_id": ideal_match['id'] if ideal_match else None,
+            "candidates": matches,
+            "total": len(matches),
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to recall candidates: {str(e)}")
+
 @app.get("/api/shortlisting/candidates")
-async def get_candidates_for_shortlisting(job_title: str):
-    """Get all candidates with their analysis results for shortlisting"""
+async def get_candidates_for_shortlisting(
+    job_title: str,
+    top_n: Optional[int] = None,
+    rag_service: RAGService = Depends(get_rag),
+    candidate_index: CandidateIndex = Depends(get_candidates_index)
+):
+    """
+    Get candidates with their analysis results for shortlisting
+    
+    With top_n, only the top_n candidates recalled from the candidate embedding
+    index are analyzed by the LLM.
+    """
     if not job_title:
         raise HTTPException(status_code=400, detail="job_title is required")
     
     try:
         # Get ideal profile for this job title
-        rag_service = RAGService()
-        ideal_profiles = await rag_service.search_ideal_profiles(
-            query=job_title,
-            job_title=job_title,
-            n_results=1
-        )
+        ideal_match = await rag_service.get_ideal_profile(job_title)
         
-        ideal_profile = ideal_profiles[0]['profile'] if ideal_profiles else None
+        ideal_profile = ideal_match['profile'] if ideal_match else None
+        
+        # Recall stage: narrow the pool by embedding similarity before LLM analysis
+        candidate_ids = list(candidates_store)
+        if top_n is not None:
+            recalled = await candidate_index.search(
+                ideal_match['document'] if ideal_match and ideal_match.get('document') else job_title,
+                top_n
+            )
+            candidate_ids = [m['candidate_id'] for m in recalled if m['candidate_id'] in candidates_store]
+        
+        # Analyze the candidates against the shared job context in batches
+        profiles = {
+            candidate_id: UserProfile(**candidates_store[candidate_id]['profile_data'])
+            for candidate_id in candidate_ids
+        }
+        job_params = JobSearchParams(job_title=job_title, location="")
+        resume_analyzer = ResumeAnalyzer(rag_service=rag_service)
+        analysis_results = await resume_analyzer.analyze_candidates_batch(
+            user_profiles=profiles,
+            job_params=job_params,
+            use_rag=True
+        )
         
         # Get all candidates
         candidates_list = []
         
-        for candidate_id, candidate_data in candidates_store.items():
-            profile = UserProfile(**candidate_data['profile_data'])
-            
-            # Analyze this candidate
-            job_params = JobSearchParams(job_title=job_title, location="")
-            resume_analyzer = ResumeAnalyzer()
-            
-            try:
-                analysis_result = await resume_analyzer.analyze_resume_and_jd(
-                    user_profile=profile,
-                    job_params=job_params,
-                    use_rag=True
-                )
-            except Exception as e:
-                print(f"Failed to analyze candidate {candidate_id}: {str(e)}")
+        for candidate_id, profile in profiles.items():
+            candidate_data = candidates_store[candidate_id]
+            analysis_result = analysis_results.get(candidate_id)
+            if analysis_result is None:
                 continue
             
             # Calculate years of experience
@@ -525,22 +734,14 @@ async def get_market_insights():
     if not candidates_store:
         return {"message": "No candidates found"}
     
-    # Aggregate data
-    all_skills = {}
-    for candidate_data in candidates_store.values():
-        profile = UserProfile(**candidate_data['profile_data'])
-        if profile.skills and profile.skills.technical:
-            for skill in profile.skills.technical:
-                all_skills[skill] = all_skills.get(skill, 0) + 1
-    
-    avg_match = sum(a['match_score'] for a in analyses_store.values()) / len(analyses_store) if analyses_store else 0
+    avg_match = dashboard_aggregates.average_match_score
     
     return {
         "total_candidates": len(candidates_store),
         "total_analyses": len(analyses_store),
         "average_match_score": round(avg_match, 1),
-        "top_skills": sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10],
-        "skills_diversity": len(all_skills)
+        "top_skills": dashboard_aggregates.top_skills(10),
+        "skills_diversity": skill_index.unique_skills
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""
+Hybrid retrieval benchmark
+Measures relevance (hit@1, MRR@3) and latency of the vector, lexical and
+hybrid search modes on the bundled ideal profiles (database/profiles.py)
+
+Usage:
+    python benchmarks/hybrid_retrieval_benchmark.py [--backend chroma|numpy] [--repeat 20]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from database.profiles import PROFILES
+from services.rag_service import RAGService
+
+# Query -> job title of the profile that should rank first
+LABELED_QUERIES = [
+    ("Kubernetes Terraform", "DevOps Engineer"),
+    ("CI/CD pipelines Docker monitoring", "DevOps Engineer"),
+    ("Figma wireframes usability testing", "UI/UX Designer"),
+    ("machine learning models statistics Python", "Data Scientist"),
+    ("SQL dashboards requirements gathering stakeholders", "Business Analyst"),
+    ("roadmap prioritization user stories", "Product Manager"),
+    ("SEO campaigns brand strategy", "Marketing Manager"),
+    ("PMP budget timelines risk management", "Project Manager"),
+    ("React Node.js frontend and backend", "Full Stack Developer"),
+    ("mentoring engineers system design architecture", "Senior Software Engineer"),
+    ("REST APIs unit testing Git", "Software Engineer"),
+]
+
+
+async def evaluate(rag_service: RAGService, mode: str, repeat: int):
+    hits = 0
+    reciprocal_ranks = 0.0
+    for query, expected in LABELED_QUERIES:
+        results = await rag_service.search_ideal_profiles(query, n_results=3, mode=mode)
+        titles = [r["profile"]["job_title"] for r in results]
+        hits += bool(titles) and titles[0] == expected
+        if expected in titles:
+            reciprocal_ranks += 1 / (titles.index(expected) + 1)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query, _ in LABELED_QUERIES:
+            await rag_service.search_ideal_profiles(query, n_results=3, mode=mode)
+    latency_ms = (time.perf_counter() - start) * 1000 / (repeat * len(LABELED_QUERIES))
+
+    count = len(LABELED_QUERIES)
+    return hits / count, reciprocal_ranks / count, latency_ms
+
+
+async def main_async(backend: str, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        rag_service = RAGService(collection_name="hybrid_benchmark", persist_directory=directory, backend=backend)
+        rag_service.embedding_provider.warmup()
+        await rag_service.sync_profiles(PROFILES)
+
+        print(f"{len(PROFILES)} profiles, {len(LABELED_QUERIES)} labeled queries, backend={backend}, "
+              f"model={rag_service.embedding_provider.model_name}")
+        print(f"{'mode':>8} {'hit@1':>7} {'MRR@3':>7} {'latency (ms)':>13}")
+        for mode in ("vector", "lexical", "hybrid"):
+            hit_rate, mrr, latency_ms = await evaluate(rag_service, mode, repeat)
+            print(f"{mode:>8} {hit_rate:>7.2f} {mrr:>7.2f} {latency_ms:>13.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vector, lexical and hybrid ideal-profile search")
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed passes over the labeled queries")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.backend, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Quantization benchmark
+Compares resident memory, query latency and recall@k of float32 and int8
+NumPy collections, with and without exact re-ranking, and the cost of a small
+upsert into a large collection, using clustered random unit vectors (no
+embedding model needed)
+
+Usage:
+    python benchmarks/quantization_benchmark.py [--sizes 1000 10000 50000] [--queries 100]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.vector_store import NumpyCollection
+
+# (quantization, rerank) configurations compared against the float32 baseline
+CONFIGURATIONS = [(None, False), ("int8", False), ("int8", True)]
+
+
+def _clustered_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int = 50) -> np.ndarray:
+    """Unit vectors around a few centers, closer to real embeddings than isotropic noise"""
+    centers = rng.standard_normal((clusters, dim))
+    vectors = centers[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def run_benchmark(sizes, num_queries: int, dim: int, n_results: int) -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'size':>8} {'mode':>6} {'rerank':>7} {'load (s)':>9} {'memory (MB)':>12} {'ratio':>6} "
+          f"{'query (ms)':>11} {'recall@k':>9} {'upsert (ms)':>12}")
+
+    for size in sizes:
+        data = _clustered_vectors(rng, size + num_queries, dim)
+        vectors, queries = data[:size], data[size:]
+        ids = [f"c{i}" for i in range(size)]
+        exact_top = np.argsort(-(vectors @ queries.T), axis=0)[:n_results].T
+
+        for quantization, rerank in CONFIGURATIONS:
+            collection = NumpyCollection(f"bench_{size}", quantization=quantization, rerank=rerank)
+            start = time.perf_counter()
+            collection.add(ids=ids, embeddings=vectors)
+            load_seconds = time.perf_counter() - start
+
+            collection.query(query_embeddings=queries[:1], n_results=n_results, include=[])  # warm up
+            start = time.perf_counter()
+            found = [
+                collection.query(query_embeddings=query[None, :], n_results=n_results, include=[])["ids"][0]
+                for query in queries
+            ]
+            query_ms = (time.perf_counter() - start) * 1000 / num_queries
+
+            hits = sum(len({int(i[1:]) for i in found[q]} & set(exact_top[q].tolist())) for q in range(num_queries))
+            recall = hits / (num_queries * min(n_results, size))
+            memory = collection.memory_usage()
+            ratio = memory["total_bytes"] / memory["float32_bytes"]
+
+            # Small write into the loaded collection: 5 updated and 5 new records
+            start = time.perf_counter()
+            collection.upsert(ids=ids[:5] + [f"new{i}" for i in range(5)], embeddings=queries[:10])
+            upsert_ms = (time.perf_counter() - start) * 1000
+            print(f"{size:>8} {quantization or 'none':>6} {'yes' if rerank else 'no':>7} {load_seconds:>9.2f} "
+                  f"{memory['total_bytes'] / 1e6:>12.2f} {ratio:>6.2f} {query_ms:>11.3f} {recall:>9.3f} "
+                  f"{upsert_ms:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare float32 and int8 vector storage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.queries, args.dim, args.k)
+
+
+if __name__ == "__main__":
+    main()
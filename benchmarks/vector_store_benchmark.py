@@ -0,0 +1,88 @@
+"""
+Vector store benchmark
+Compares query latency of the ChromaDB and NumPy backends across collection
+sizes using random unit vectors (no embedding model needed)
+
+Usage:
+    python benchmarks/vector_store_benchmark.py [--sizes 10 100 1000 10000] [--queries 200]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.rag_service import _get_client
+
+JOB_TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Business Analyst"]
+
+
+def _unit_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _time_queries(collection, queries: np.ndarray, n_results: int, where=None) -> float:
+    """Mean milliseconds per single-query call"""
+    collection.query(query_embeddings=queries[:1].tolist(), n_results=n_results, where=where)  # warm up
+    start = time.perf_counter()
+    for query in queries:
+        collection.query(query_embeddings=[query.tolist()], n_results=n_results, where=where)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def run_benchmark(sizes, num_queries: int, dim: int, n_results: int) -> None:
+    rng = np.random.default_rng(0)
+    queries = _unit_vectors(rng, num_queries, dim)
+    print(f"{'size':>8} {'backend':>8} {'load (s)':>9} {'query (ms)':>11} {'filtered (ms)':>14} {'recall@k':>9}")
+
+    for size in sizes:
+        vectors = _unit_vectors(rng, size, dim)
+        ids = [f"profile-{i}" for i in range(size)]
+        metadatas = [{"job_title": JOB_TITLES[i % len(JOB_TITLES)]} for i in range(size)]
+        documents = [f"Document {i}" for i in range(size)]
+        exact_top = np.argsort(-(vectors @ queries.T), axis=0)[:n_results].T
+
+        for backend in ("chroma", "numpy"):
+            with tempfile.TemporaryDirectory() as directory:
+                collection = _get_client(directory, backend).get_or_create_collection(name=f"bench_{size}")
+                start = time.perf_counter()
+                for i in range(0, size, 1000):
+                    collection.add(
+                        ids=ids[i:i + 1000],
+                        embeddings=vectors[i:i + 1000].tolist(),
+                        metadatas=metadatas[i:i + 1000],
+                        documents=documents[i:i + 1000]
+                    )
+                load_seconds = time.perf_counter() - start
+
+                query_ms = _time_queries(collection, queries, n_results)
+                filtered_ms = _time_queries(collection, queries, n_results, where={"job_title": {"$eq": JOB_TITLES[0]}})
+
+                found = collection.query(query_embeddings=queries.tolist(), n_results=n_results, include=[])["ids"]
+                hits = sum(
+                    len({int(i.split("-")[1]) for i in found[q]} & set(exact_top[q].tolist()))
+                    for q in range(num_queries)
+                )
+                recall = hits / (num_queries * min(n_results, size))
+                print(f"{size:>8} {backend:>8} {load_seconds:>9.2f} {query_ms:>11.3f} {filtered_ms:>14.3f} {recall:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ChromaDB and NumPy vector store backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--k", type=int, default=3, help="Results per query")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.queries, args.dim, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+from services.rag_service import get_embedding_provider
 
 # 1) Initialize Chroma
 client = chromadb.Client(
@@ -15,7 +15,8 @@ collection = client.get_or_create_collection(
     name="ideal_candidate_profiles"
 )
 
-# 3) Load embedding model
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+# 3) Load and warm up the embedding model used for indexing and querying
+embedder = get_embedding_provider()
+embedder.warmup()
 
 print("ChromaDB setup complete!")
@@ -4,6 +4,7 @@ Creates tables and optionally seeds initial data
 """
 from database.base import Base, engine, SessionLocal
 from database.models import Organization, User
+from database.migrations import migrate_database
 from auth.security import get_password_hash
 import sys
 
@@ -12,6 +13,8 @@ def init_database():
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     print("✓ Database tables created successfully")
+    for step in migrate_database(engine):
+        print(f"✓ Migrated {step}")
 
 
 def create_demo_organization():
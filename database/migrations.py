@@ -0,0 +1,88 @@
+"""
+Schema migrations
+Brings tables created by an older version of the models up to date, since
+create_all only creates missing tables and never alters existing ones
+"""
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+
+from database.base import engine
+from database.models import JobPosting
+
+
+def migrate_job_postings(bind=engine) -> List[str]:
+    """
+    Add the scraper cache columns to job_postings and make organization_id nullable
+
+    SQLite cannot add a UNIQUE column or drop NOT NULL in place, so there the
+    table is rebuilt (create the new table, copy the rows, drop the old one,
+    rename); other databases are altered directly.
+
+    Returns:
+        Descriptions of the steps applied (empty if the table is up to date or missing)
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table(JobPosting.__tablename__):
+        return []
+    columns = {column["name"]: column for column in inspector.get_columns(JobPosting.__tablename__)}
+    missing = [name for name in ("source_key", "scraped_at") if name not in columns]
+    organization_required = not columns["organization_id"]["nullable"]
+    redundant_index = any(
+        index["name"] == "idx_job_source_key" for index in inspector.get_indexes(JobPosting.__tablename__)
+    )
+
+    steps = []
+    if missing:
+        steps.append(f"add columns {', '.join(missing)}")
+    if organization_required:
+        steps.append("make organization_id nullable")
+    if not steps and not redundant_index:
+        return []
+
+    if bind.dialect.name == "sqlite" and steps:
+        _rebuild_sqlite_job_postings(bind, [name for name in columns if name in JobPosting.__table__.c])
+        steps.append("rebuild table")
+        return steps
+
+    table = JobPosting.__tablename__
+    with bind.begin() as conn:
+        for name in missing:
+            column_type = JobPosting.__table__.c[name].type.compile(dialect=bind.dialect)
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+        if "source_key" in missing:
+            conn.execute(text(f"CREATE UNIQUE INDEX uq_job_postings_source_key ON {table} (source_key)"))
+        if organization_required:
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN organization_id DROP NOT NULL"))
+        if redundant_index:
+            # unique=True on source_key already indexes it
+            conn.execute(text("DROP INDEX idx_job_source_key"))
+            steps.append("drop index idx_job_source_key")
+    return steps
+
+
+def _rebuild_sqlite_job_postings(bind, copied_columns: List[str]) -> None:
+    """Recreate job_postings from the model and copy the existing rows into it"""
+    table = JobPosting.__table__
+    # Built in the models' metadata so the foreign key to organizations resolves
+    new_table = table.to_metadata(table.metadata, name=f"{table.name}_new")
+    column_list = ", ".join(copied_columns)
+    try:
+        with bind.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {new_table.name}"))
+            conn.execute(CreateTable(new_table))
+            conn.execute(text(
+                f"INSERT INTO {new_table.name} ({column_list}) SELECT {column_list} FROM {table.name}"
+            ))
+            conn.execute(text(f"DROP TABLE {table.name}"))
+            conn.execute(text(f"ALTER TABLE {new_table.name} RENAME TO {table.name}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    finally:
+        table.metadata.remove(new_table)
+
+
+def migrate_database(bind=engine) -> List[str]:
+    """Apply every migration; returns the steps applied"""
+    return [f"job_postings: {step}" for step in migrate_job_postings(bind)]
@@ -102,7 +102,8 @@ class JobPosting(Base):
     __tablename__ = "job_postings"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    organization_id = Column(String, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    # NULL for postings shared by all organizations (e.g. written by the scraper cache)
+    organization_id = Column(String, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True)
     
     # Job details
     job_title = Column(String(255), nullable=False)
@@ -110,6 +111,10 @@ class JobPosting(Base):
     job_description = Column(Text, nullable=False)
     url = Column(String(500))
     
+    # Scraper cache: hash of the normalized URL or search parameters, and fetch time
+    source_key = Column(String(64), unique=True)
+    scraped_at = Column(DateTime(timezone=True))
+    
     # Metadata
     posted_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
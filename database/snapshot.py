@@ -0,0 +1,65 @@
+"""
+Export, import and verify ideal-profile vector snapshots
+A snapshot holds the IDs, documents, metadata and embeddings of a collection
+in one memory-mappable file, so workers can boot without re-embedding
+
+Usage:
+    python -m database.snapshot export snapshots/ideal_profiles.snap
+    python -m database.snapshot verify snapshots/ideal_profiles.snap
+    python -m database.snapshot import snapshots/ideal_profiles.snap [--backend numpy]
+
+Workers started with RAG_SNAPSHOT_PATH set import the snapshot on startup
+when their collection is empty.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.rag_service import RAGService
+from services.vector_snapshot import export_snapshot, import_snapshot, verify_snapshot
+
+
+def _rag_service(args) -> RAGService:
+    return RAGService(
+        collection_name=args.collection,
+        persist_directory=args.persist_directory,
+        backend=args.backend
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ideal-profile vector snapshots")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("path", help="Snapshot file")
+    parser.add_argument("--collection", default="ideal_candidate_profiles")
+    parser.add_argument("--persist-directory", default=None, help="Storage directory (default: CHROMA_DB_PATH or ./chroma_db)")
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "verify":
+        result = verify_snapshot(args.path)
+        if not result["valid"]:
+            print(f"❌ Invalid snapshot: {'; '.join(result['errors'])}")
+            return 1
+        print(f"✅ Valid snapshot: {result['count']} profiles, {result['dimension']}-d "
+              f"{result['embedding_model']} embeddings from '{result['collection_name']}'")
+        return 0
+
+    rag_service = _rag_service(args)
+    if args.command == "export":
+        header = export_snapshot(rag_service, args.path)
+        print(f"✅ Exported {header['count']} profiles from '{header['collection_name']}' to {args.path}")
+    else:
+        header = import_snapshot(rag_service, args.path)
+        print(f"✅ Imported {header['count']} profiles into '{rag_service.collection.name}' ({rag_service.backend})")
+    print(f"   Time: {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
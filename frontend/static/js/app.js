@@ -490,7 +490,7 @@ async function loadAvailableProfiles() {
     listDiv.innerHTML = '<p style="color: #666;">Loading ideal profiles...</p>';
     
     try {
-        const response = await fetch(`${API_BASE_URL}/api/ideal-profiles`);
+        const response = await fetch(`${API_BASE_URL}/api/ideal-profiles?limit=500&fields=job_title,years_experience,must_have_skills`);
         const data = await response.json();
         
         if (response.ok) {
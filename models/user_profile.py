@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Union
 from datetime import datetime
 
 class PersonalInfo(BaseModel):
@@ -98,3 +98,18 @@ class JobSearchParams(BaseModel):
     def validate_search_params(self):
         if not any([self.url, (self.job_title and self.location)]):
             raise ValueError("Either URL or both job_title and location must be provided")
+
+class IdealProfile(BaseModel):
+    """Ideal candidate profile for a job title, as stored in the RAG collection"""
+    model_config = ConfigDict(extra="allow")
+
+    job_title: str
+    job_description: Optional[str] = None
+    years_experience: Optional[Union[int, str]] = None
+    must_have_skills: List[str] = []
+    preferred_skills: List[str] = []
+    education_requirements: Union[List[str], str] = []
+    certifications: List[str] = []
+    key_responsibilities: List[str] = []
+    additional_criteria: Optional[str] = None
+    created_at: Optional[str] = None
@@ -1,3 +1,5 @@
-from .apify_scrape import scrape_indeed_jobs
+from .apify_scrape import scrape_indeed_jobs, scrape_indeed_jobs_bulk
+from .apify_client import ApifyClient, ApifyError, ApifyTimeoutError
+from .job_store import JobDescriptionStore, get_job_description_store
 
-__all__ = ['scrape_indeed_jobs']
\ No newline at end of file
+__all__ = ['scrape_indeed_jobs', 'scrape_indeed_jobs_bulk', 'ApifyClient', 'ApifyError', 'ApifyTimeoutError', 'JobDescriptionStore', 'get_job_description_store']
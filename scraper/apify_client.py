@@ -0,0 +1,221 @@
+"""
+Async Apify API client
+Starts actor task runs, polls them with exponential backoff and reads their
+datasets without blocking the event loop
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+APIFY_BASE_URL = "https://api.apify.com"
+
+# Terminal statuses of an Apify actor run
+RUN_SUCCEEDED = "SUCCEEDED"
+RUN_FAILED_STATUSES = ("FAILED", "ABORTED", "TIMED-OUT")
+
+
+class ApifyError(Exception):
+    """Raised when the Apify API returns an error or an unexpected response"""
+
+    def __init__(self, message: str, status: Optional[int] = None, response: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.response = response
+
+
+class ApifyTimeoutError(ApifyError):
+    """Raised when an actor run does not finish before the deadline"""
+
+
+class ApifyClient:
+    """
+    Minimal async client for the Apify v2 API
+
+    Use as an async context manager so the underlying HTTP connection pool is
+    closed when done:
+
+        async with ApifyClient(token) as client:
+            run = await client.run_task(task_id, payload, timeout=300)
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 15.0,
+        backoff_factor: float = 2.0,
+        request_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            token: Apify API token
+            base_url: API base URL (default: APIFY_BASE_URL env or https://api.apify.com)
+            poll_interval: Initial wait between run status polls in seconds
+            max_poll_interval: Upper bound for the wait between polls in seconds
+            backoff_factor: Multiplier applied to the wait after every poll
+            request_timeout: Timeout for a single HTTP request in seconds
+        """
+        self.base_url = (base_url or os.getenv("APIFY_BASE_URL", APIFY_BASE_URL)).rstrip("/")
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+                'Authorization': f'Bearer {token}'
+            },
+            timeout=request_timeout,
+        )
+
+    async def __aenter__(self) -> "ApifyClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client"""
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = await self._http.request(method, path, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if response.status_code >= 400:
+            raise ApifyError(
+                f"Apify request {method} {path} failed with status {response.status_code}",
+                status=response.status_code,
+                response=body,
+            )
+        return body
+
+    async def start_task_run(self, task_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Start an actor task run and return its run data"""
+        body = await self._request("POST", f"/v2/actor-tasks/{task_id}/runs", json=payload)
+        run = body.get('data', {}) if isinstance(body, dict) else {}
+        if not run.get('id'):
+            raise ApifyError("No run ID received from Apify", response=body)
+        return run
+
+    async def get_run(self, run_id: str) -> Dict[str, Any]:
+        """Get the current data of an actor run"""
+        body = await self._request("GET", f"/v2/actor-runs/{run_id}")
+        return body.get('data', {}) if isinstance(body, dict) else {}
+
+    async def abort_run(self, run_id: str) -> None:
+        """Abort an actor run, ignoring errors (best effort)"""
+        try:
+            await self._request("POST", f"/v2/actor-runs/{run_id}/abort")
+        except (ApifyError, httpx.HTTPError) as e:
+            print(f"⚠️  Failed to abort Apify run {run_id}: {str(e)}")
+
+    async def wait_for_run(self, run_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Poll an actor run with exponential backoff until it reaches a terminal status
+
+        Args:
+            run_id: Actor run ID
+            timeout: Overall deadline in seconds, or None to wait indefinitely
+
+        Returns:
+            Run data of the succeeded run
+
+        Raises:
+            ApifyError: If the run failed, was aborted or timed out on Apify's side
+            ApifyTimeoutError: If the run did not finish before the deadline
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        interval = self.poll_interval
+
+        while True:
+            run = await self.get_run(run_id)
+            status = run.get('status')
+            print(f"Current status: {status}")
+
+            if status == RUN_SUCCEEDED:
+                return run
+            if status in RUN_FAILED_STATUSES:
+                raise ApifyError(
+                    f"Actor run failed with status: {status}",
+                    response=run.get('meta', {}).get('error', {}).get('message'),
+                )
+
+            wait = interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise ApifyTimeoutError(f"Actor run {run_id} did not finish within {timeout}s")
+                wait = min(wait, remaining)
+
+            await asyncio.sleep(wait)
+            interval = min(interval * self.backoff_factor, self.max_poll_interval)
+
+    async def run_task(
+        self,
+        task_id: str,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start an actor task run and wait for it to succeed
+
+        The run is aborted on Apify if the deadline passes or the calling task
+        is cancelled, so no actor keeps running for a request nobody awaits.
+        """
+        run = await self.start_task_run(task_id, payload)
+        run_id = run['id']
+        print(f"Started actor task run: {run_id}")
+
+        try:
+            return await self.wait_for_run(run_id, timeout=timeout)
+        except (ApifyTimeoutError, asyncio.CancelledError):
+            await asyncio.shield(self.abort_run(run_id))
+            raise
+
+    async def get_dataset_items(
+        self,
+        dataset_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get items of a dataset"""
+        params: Dict[str, Any] = {"offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+        items = await self._request("GET", f"/v2/datasets/{dataset_id}/items", params=params)
+        if not isinstance(items, list):
+            raise ApifyError("Dataset items response is not a list", response=items)
+        return items
+
+    async def iter_dataset_pages(
+        self,
+        dataset_id: str,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the items of a dataset page by page
+
+        Args:
+            dataset_id: Dataset ID
+            page_size: Items requested per page
+            max_items: Stop after this many items, or None for all
+        """
+        offset = 0
+        while max_items is None or offset < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - offset)
+            page = await self.get_dataset_items(dataset_id, offset=offset, limit=limit)
+            if not page:
+                return
+            yield page
+            offset += len(page)
+            if len(page) < limit:
+                return
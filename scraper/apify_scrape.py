@@ -1,14 +1,22 @@
-import http.client
-import json
 from dotenv import load_dotenv
-from typing import Optional, Union
-from urllib.parse import urlparse, parse_qs, quote
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qs, parse_qsl, quote, urlencode, urlunparse
 import os
 from models.user_profile import ScrapedJobData, JobSearchParams
+from scraper.apify_client import ApifyClient, ApifyError
 load_dotenv()
 
 ACTOR_TASK_ID = 'gab-domingo~indeed-scraper-task'
 
+# Default overall deadline for a scrape in seconds
+DEFAULT_SCRAPE_TIMEOUT = 300
+
+# Query parameters that do not change which posting or search a URL points to
+_TRACKING_PARAMS = {"from", "tk", "advn", "sjdu", "adid"}
+
+# Dataset item fields that may hold the URL of a job or of the start URL it came from
+_ITEM_URL_FIELDS = ("url", "jobUrl", "link", "startUrl", "searchUrl")
+
 def get_country_code(url: str) -> str:
     """
     Extract and validate country code from Indeed URL.
@@ -47,17 +55,77 @@ def construct_indeed_url(job_title: str, location: str, country_code: str = 'ph'
 
     return f"https://{country_code}.indeed.com/jobs?q={job_query}&l={location_query}"
 
+def normalize_job_url(url: str) -> str:
+    """
+    Normalize a job URL so equivalent URLs compare equal
+
+    Lowercases scheme and host, drops the fragment, trailing slashes and tracking
+    parameters, and sorts the remaining query parameters.
+    """
+    parsed = urlparse(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in _TRACKING_PARAMS and not key.startswith("utm_")
+    )
+    return urlunparse((
+        (parsed.scheme or "https").lower(),
+        parsed.netloc.lower(),
+        parsed.path.rstrip("/") or "/",
+        "",
+        urlencode(query),
+        "",
+    ))
+
+def _scraped_description(job_data: Dict[str, Any]) -> Optional[str]:
+    """The job description of a scraped dataset item, if the actor found one"""
+    # Try to find the correct keys
+    return (
+        job_data.get("description") or
+        job_data.get("jobDescription") or
+        job_data.get("fullDescription")
+    )
+
+def _job_data_from_item(
+    job_data: Dict[str, Any],
+    search_params: JobSearchParams
+) -> Optional[ScrapedJobData]:
+    """Map a scraped dataset item to ScrapedJobData, or None if it has no usable fields"""
+    # Try to find the correct keys
+    title = (
+        job_data.get("title") or 
+        job_data.get("jobTitle") or 
+        job_data.get("position") or 
+        search_params.job_title
+    )
+    
+    description = (
+        _scraped_description(job_data) or
+        f"Position for {search_params.job_title} in {search_params.location}"
+    )
+    
+    if title and description:
+        return ScrapedJobData(
+            job_title=title,
+            job_description=description
+        )
+    return None
+
 async def scrape_indeed_jobs(
     url: Optional[str] = None,
     search_params: Optional[JobSearchParams] = None,
-    max_rows: int = 5
+    max_rows: int = 5,
+    timeout: Optional[float] = None
 ) -> Union[ScrapedJobData, dict]:
     """
     Scrape Indeed jobs using either a direct URL or job search parameters.
     
+    The actor run is polled with exponential backoff without blocking the event
+    loop. It is aborted when the deadline passes or the calling task is cancelled.
+    
     Args:
         search_params (Optional[JobSearchParams]): Search parameters containing URL or job title and location
-        max_rows (int): Maximum number of results to return (default: 1)
+        max_rows (int): Maximum number of results to return (default: 5)
+        timeout (Optional[float]): Overall deadline in seconds (default: APIFY_SCRAPE_TIMEOUT env or 300)
     
     Returns:
         Union[ScrapedJobData, dict]: ScrapedJobData object if successful, error dict if failed
@@ -82,121 +150,139 @@ async def scrape_indeed_jobs(
                 "error": "APIFY_TOKEN environment variable is not set"
             }
         
-        conn = http.client.HTTPSConnection("api.apify.com")
-        payload = json.dumps({
+        if timeout is None:
+            timeout = float(os.getenv("APIFY_SCRAPE_TIMEOUT", DEFAULT_SCRAPE_TIMEOUT))
+        
+        payload = {
             "startUrls": [{"url": url}],
             "maxItems": max_rows,
             "proxyConfiguration": {
                 "useApifyProxy": True
             }
-        })
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {apify_token}'
         }
         
-        # Start the actor task
-        conn.request("POST", f"/v2/actor-tasks/{ACTOR_TASK_ID}/runs", payload, headers)
-        res = conn.getresponse()
-        run_data = json.loads(res.read())
-        
-        if res.status != 201:  # Actor task creation should return 201
-            return {
-                "url": url,
-                "error": f"Failed to start actor task. Status: {res.status}",
-                "response": run_data
-            }
-            
-        # Get the run ID from the response
-        run_id = run_data.get('data', {}).get('id')  # Note: Changed to get id from data object
-        if not run_id:
-            return {
-                "url": url,
-                "error": "No run ID received from Apify",
-                "response": run_data
-            }
-            
-        print(f"Started actor task run: {run_id}")
-        
-        # Poll the run status until it's completed
-        while True:
-            conn.request("GET", f"/v2/actor-runs/{run_id}", headers=headers)
-            status_res = conn.getresponse()
-            status_data = json.loads(status_res.read())
-            
-            status = status_data.get('data', {}).get('status')  # Note: Changed to get status from data object
-            print(f"Current status: {status}")
+        async with ApifyClient(apify_token) as client:
+            # Start the actor task and wait for it to finish
+            run = await client.run_task(ACTOR_TASK_ID, payload, timeout=timeout)
             
-            if status == 'SUCCEEDED':
-                # Get the dataset ID from the run
-                dataset_id = status_data.get('data', {}).get('defaultDatasetId')
-                if not dataset_id:
-                    return {
-                        "url": url,
-                        "error": "No dataset ID found in the run"
-                    }
-                
-                # Get the dataset items
-                dataset_url = f"/v2/datasets/{dataset_id}/items"
-                conn.request("GET", dataset_url, headers=headers)
-                data_res = conn.getresponse()
-                results = json.loads(data_res.read())
-                
-                if isinstance(results, list) and len(results) > 0:
-                    job_data = results[0]
-                    
-                    # Try to find the correct keys
-                    title = (
-                        job_data.get("title") or 
-                        job_data.get("jobTitle") or 
-                        job_data.get("position") or 
-                        search_params.job_title
-                    )
-                    
-                    description = (
-                        job_data.get("description") or 
-                        job_data.get("jobDescription") or 
-                        job_data.get("fullDescription") or
-                        f"Position for {search_params.job_title} in {search_params.location}"
-                    )
-                    
-                    if title and description:
-                        return ScrapedJobData(
-                            job_title=title,
-                            job_description=description
-                        )
-                    else:
-                        return {
-                            "error": "Could not find title or description in scraped data",
-                            "available_data": job_data,
-                            "search_params": search_params.model_dump()
-                        }
-                else:
-                    return {
-                        "error": "No results found",
-                        "search_params": search_params.model_dump() if search_params else None
-                    }
-                    
-            elif status in ['FAILED', 'ABORTED', 'TIMED-OUT']:
+            # Get the dataset ID from the run
+            dataset_id = run.get('defaultDatasetId')
+            if not dataset_id:
                 return {
                     "url": url,
-                    "error": f"Actor run failed with status: {status}",
-                    "details": status_data.get('data', {}).get('meta', {}).get('error', {}).get('message')
+                    "error": "No dataset ID found in the run"
                 }
-                
-            import time
-            time.sleep(5)  # Wait 5 seconds before checking again
             
+            results = await client.get_dataset_items(dataset_id, limit=max_rows)
+        
+        if len(results) > 0:
+            job_data = _job_data_from_item(results[0], search_params)
+            if job_data is None:
+                return {
+                    "error": "Could not find title or description in scraped data",
+                    "available_data": results[0],
+                    "search_params": search_params.model_dump()
+                }
+            return job_data
+        return {
+            "error": "No results found",
+            "search_params": search_params.model_dump() if search_params else None
+        }
+        
+    except ApifyError as e:
+        print(f"Error in scrape_indeed_jobs: {str(e)}")
+        return {
+            "url": url,
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "details": e.response
+        }
     except Exception as e:
         print(f"Error in scrape_indeed_jobs: {str(e)}")
-        print(f"Last known results: {results if 'results' in locals() else 'No results available'}")
         return {
             "error": str(e),
             "error_type": type(e).__name__,
             "search_params": search_params.model_dump() if search_params else None
         }
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
+async def scrape_indeed_jobs_bulk(
+    search_params_list: List[JobSearchParams],
+    max_rows_per_url: int = 1,
+    timeout: Optional[float] = None,
+    page_size: int = 100
+) -> AsyncIterator[Tuple[JobSearchParams, ScrapedJobData]]:
+    """
+    Scrape many Indeed URLs or searches in a single actor run.
+    
+    All start URLs are sent in one run and the dataset is streamed back page by
+    page. Every item is yielded under its own job URL; the first item matching a
+    start URL is also yielded under that start URL's search parameters. Items
+    without a scraped description are skipped rather than stored with a
+    placeholder one.
+    
+    Args:
+        search_params_list (List[JobSearchParams]): URLs or job title + location searches
+        max_rows_per_url (int): Maximum results per start URL (default: 1)
+        timeout (Optional[float]): Overall deadline in seconds (default: APIFY_SCRAPE_TIMEOUT env or 300)
+        page_size (int): Dataset items fetched per page (default: 100)
+    
+    Yields:
+        Tuple of (search parameters the item belongs to, scraped job data)
+    
+    Raises:
+        ApifyError: If APIFY_TOKEN is missing or the run fails or times out
+    """
+    if not search_params_list:
+        return
+    
+    apify_token = os.getenv("APIFY_TOKEN")
+    if not apify_token:
+        raise ApifyError("APIFY_TOKEN environment variable is not set")
+    
+    if timeout is None:
+        timeout = float(os.getenv("APIFY_SCRAPE_TIMEOUT", DEFAULT_SCRAPE_TIMEOUT))
+    
+    # Map normalized start URLs back to the search parameters they came from
+    start_urls: Dict[str, JobSearchParams] = {}
+    for search_params in search_params_list:
+        search_params.validate_search_params()
+        url = search_params.url or construct_indeed_url(search_params.job_title, search_params.location, 'ph')
+        start_urls.setdefault(normalize_job_url(url), search_params)
+    
+    payload = {
+        "startUrls": [{"url": url} for url in start_urls],
+        "maxItems": max_rows_per_url * len(start_urls),
+        "proxyConfiguration": {
+            "useApifyProxy": True
+        }
+    }
+    only_start = next(iter(start_urls.values())) if len(start_urls) == 1 else None
+    matched = set()
+    
+    async with ApifyClient(apify_token) as client:
+        run = await client.run_task(ACTOR_TASK_ID, payload, timeout=timeout)
+        dataset_id = run.get('defaultDatasetId')
+        if not dataset_id:
+            raise ApifyError("No dataset ID found in the run", response=run)
+        
+        async for page in client.iter_dataset_pages(dataset_id, page_size=page_size):
+            for item in page:
+                if not _scraped_description(item):
+                    print(f"Skipping scraped item without a description: {item.get('url') or item.get('jobUrl') or item.get('link')}")
+                    continue
+                item_urls = [
+                    normalize_job_url(item[field]) for field in _ITEM_URL_FIELDS
+                    if isinstance(item.get(field), str) and item[field]
+                ]
+                source = only_start or next((start_urls[u] for u in item_urls if u in start_urls), None)
+                job_data = _job_data_from_item(item, source or JobSearchParams())
+                if job_data is None:
+                    continue
+                
+                if source is not None and id(source) not in matched:
+                    matched.add(id(source))
+                    yield source, job_data
+                
+                own_url = item.get("url") or item.get("jobUrl") or item.get("link")
+                if own_url and normalize_job_url(own_url) not in start_urls:
+                    yield JobSearchParams(url=own_url, job_title=job_data.job_title), job_data
@@ -0,0 +1,234 @@
+"""
+Scraped job description store
+Caches scraped job descriptions keyed by normalized URL or search parameters,
+serves them within a freshness TTL, refreshes stale entries in the background
+and writes them through to the JobPosting table
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from models.user_profile import ScrapedJobData, JobSearchParams
+from scraper.apify_scrape import normalize_job_url, scrape_indeed_jobs, scrape_indeed_jobs_bulk
+
+# Default freshness TTL for scraped job descriptions (24 hours)
+DEFAULT_JOB_CACHE_TTL = 24 * 60 * 60
+
+JobFetcher = Callable[..., Awaitable[Union[ScrapedJobData, dict]]]
+
+logger = logging.getLogger(__name__)
+
+
+def job_cache_key(search_params: JobSearchParams) -> str:
+    """Cache key for a job: the normalized URL, or the normalized title and location"""
+    if search_params.url:
+        return f"url:{normalize_job_url(search_params.url)}"
+    title = " ".join((search_params.job_title or "").casefold().split())
+    location = " ".join((search_params.location or "").casefold().split())
+    return f"search:{title}|{location}"
+
+
+class JobDescriptionStore:
+    """
+    Read-through / write-through store of scraped job descriptions
+
+    Lookups hit an in-memory map first, then the JobPosting table. Fresh entries
+    are returned directly; stale entries are returned immediately while a single
+    background scrape refreshes them. Misses scrape once per key even when
+    requested concurrently. Database reads and writes made from the async
+    methods run in a worker thread so they do not block the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        persist: bool = True,
+        fetcher: Optional[JobFetcher] = None
+    ):
+        """
+        Args:
+            ttl_seconds: Freshness TTL (default: JOB_CACHE_TTL_SECONDS env or 24h)
+            persist: Whether to read from and write through to the JobPosting table
+            fetcher: Coroutine function used to scrape a job (default: scrape_indeed_jobs)
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("JOB_CACHE_TTL_SECONDS", DEFAULT_JOB_CACHE_TTL)
+        )
+        self.persist = persist
+        self.fetcher = fetcher or scrape_indeed_jobs
+        self._entries: Dict[str, Tuple[ScrapedJobData, float]] = {}
+        self._pending: Dict[str, "asyncio.Task[Union[ScrapedJobData, dict]]"] = {}
+
+    def get(self, search_params: JobSearchParams) -> Optional[Tuple[ScrapedJobData, bool]]:
+        """
+        Look up a stored job description without scraping
+
+        Returns:
+            Tuple of (job data, whether it is still fresh), or None if not stored
+        """
+        key = job_cache_key(search_params)
+        entry = self._entries.get(key)
+        if entry is None and self.persist:
+            entry = self._load(key)
+            if entry is not None:
+                self._entries[key] = entry
+        if entry is None:
+            return None
+        job_data, fetched_at = entry
+        return job_data, (time.time() - fetched_at) < self.ttl_seconds
+
+    def put(self, search_params: JobSearchParams, job_data: ScrapedJobData, fetched_at: Optional[float] = None) -> None:
+        """Store a scraped job description and write it through to the database"""
+        key = job_cache_key(search_params)
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        self._entries[key] = (job_data, fetched_at)
+        if self.persist:
+            self._save(key, search_params, job_data, fetched_at)
+
+    async def get_or_fetch(self, search_params: JobSearchParams) -> Union[ScrapedJobData, dict]:
+        """
+        Get a job description, scraping it only if it is not stored
+
+        Returns:
+            ScrapedJobData if stored or scraped successfully, the scraper's error dict otherwise
+        """
+        if self.persist and job_cache_key(search_params) not in self._entries:
+            cached = await asyncio.to_thread(self.get, search_params)
+        else:
+            cached = self.get(search_params)
+        if cached is not None:
+            job_data, fresh = cached
+            if not fresh:
+                self._fetch(search_params)  # refresh in the background, serve stale
+            return job_data
+
+        return await asyncio.shield(self._fetch(search_params))
+
+    async def load_bulk(
+        self,
+        search_params_list: List[JobSearchParams],
+        max_rows_per_url: int = 1,
+        timeout: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Refresh many postings or searches with a single actor run
+        
+        Items are stored as the dataset pages stream in, so a run that fails
+        midway keeps everything loaded so far.
+        
+        Returns:
+            Counts of requested start URLs, stored entries and start URLs without results
+        """
+        requested = {job_cache_key(params) for params in search_params_list}
+        stored = 0
+        filled = set()
+        async for search_params, job_data in scrape_indeed_jobs_bulk(
+            search_params_list,
+            max_rows_per_url=max_rows_per_url,
+            timeout=timeout
+        ):
+            await asyncio.to_thread(self.put, search_params, job_data)
+            filled.add(job_cache_key(search_params))
+            stored += 1
+        
+        return {
+            "requested": len(requested),
+            "stored": stored,
+            "missing": len(requested - filled)
+        }
+
+    def _fetch(self, search_params: JobSearchParams) -> "asyncio.Task[Union[ScrapedJobData, dict]]":
+        """Start (or join) the single scrape for a key"""
+        key = job_cache_key(search_params)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._scrape_and_store(search_params))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return task
+
+    async def _scrape_and_store(self, search_params: JobSearchParams) -> Union[ScrapedJobData, dict]:
+        result = await self.fetcher(search_params=search_params)
+        if isinstance(result, ScrapedJobData):
+            await asyncio.to_thread(self.put, search_params, result)
+        else:
+            print(f"⚠️  Job scrape failed, keeping stored data if any: {result.get('error') if isinstance(result, dict) else result}")
+        return result
+
+    def _load(self, key: str) -> Optional[Tuple[ScrapedJobData, float]]:
+        """Load a stored job posting from the database"""
+        try:
+            from database.base import SessionLocal
+            from database.models import JobPosting
+
+            db = SessionLocal()
+            try:
+                posting = db.query(JobPosting).filter(JobPosting.source_key == _source_key(key)).first()
+                if posting is None:
+                    return None
+                scraped_at = posting.scraped_at or posting.updated_at or posting.created_at
+                if scraped_at.tzinfo is None:
+                    scraped_at = scraped_at.replace(tzinfo=timezone.utc)
+                return (
+                    ScrapedJobData(job_title=posting.job_title, job_description=posting.job_description),
+                    scraped_at.timestamp()
+                )
+            finally:
+                db.close()
+        except Exception as e:
+            self._disable_persistence(e)
+            return None
+
+    def _save(self, key: str, search_params: JobSearchParams, job_data: ScrapedJobData, fetched_at: float) -> None:
+        """Upsert a scraped job description into the JobPosting table"""
+        try:
+            from database.base import SessionLocal
+            from database.models import JobPosting
+
+            db = SessionLocal()
+            try:
+                source_key = _source_key(key)
+                posting = db.query(JobPosting).filter(JobPosting.source_key == source_key).first()
+                if posting is None:
+                    posting = JobPosting(source_key=source_key)
+                    db.add(posting)
+                posting.job_title = job_data.job_title
+                posting.job_description = job_data.job_description
+                posting.location = search_params.location
+                posting.url = search_params.url
+                posting.scraped_at = datetime.fromtimestamp(fetched_at, tz=timezone.utc)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        except Exception as e:
+            self._disable_persistence(e)
+
+    def _disable_persistence(self, error: Exception) -> None:
+        logger.error(
+            "Job description persistence disabled for this process; scraped jobs will not be "
+            "stored. If job_postings predates the scraper cache, run `python -m database.init_db` "
+            "to migrate it. Cause: %s", error, exc_info=error
+        )
+        self.persist = False
+
+
+def _source_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+_default_store: Optional[JobDescriptionStore] = None
+
+
+def get_job_description_store() -> JobDescriptionStore:
+    """Get the process-wide job description store"""
+    global _default_store
+    if _default_store is None:
+        _default_store = JobDescriptionStore()
+    return _default_store
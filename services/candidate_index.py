@@ -0,0 +1,146 @@
+"""
+Candidate embedding index
+Embeds uploaded candidate profiles so the candidates closest to a job title or
+ideal profile can be recalled in milliseconds, before any LLM analysis
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from models.user_profile import UserProfile
+from services.rag_service import EmbeddingProvider, get_embedding_provider
+from services.vector_store import NumpyCollection
+
+# Work history entries and description length included in a candidate document
+MAX_WORK_ENTRIES = 5
+MAX_DESCRIPTION_CHARS = 400
+
+
+class CandidateIndex:
+    """
+    Vector index of candidate profiles
+
+    Candidates live in the app's in-memory store, so the index is in-memory
+    too (a NumpyCollection) and is rebuilt as candidates are uploaded.
+    Documents are embedded with the same model as the ideal profiles, so an
+    ideal profile document can be used directly as the query.
+    """
+
+    def __init__(self, embedding_provider: Optional[EmbeddingProvider] = None, quantization: Optional[str] = None):
+        """
+        Args:
+            embedding_provider: Embedding model for candidates and queries (default: shared provider)
+            quantization: "int8" to keep only quantized codes resident, re-ranking
+                the best matches exactly (default: CANDIDATE_INDEX_QUANTIZATION env or float32)
+        """
+        self.embedding_provider = embedding_provider or get_embedding_provider()
+        quantization = (quantization or os.getenv("CANDIDATE_INDEX_QUANTIZATION") or "").lower() or None
+        self.collection = NumpyCollection("candidate_profiles", quantization=quantization)
+
+    @staticmethod
+    def create_document_text(profile: UserProfile) -> str:
+        """
+        Convert a candidate profile to text for embedding
+
+        Uses the summary, skills, recent work history and project technologies,
+        labelled like the ideal-profile documents.
+        """
+        parts = []
+        if profile.personal_info.professional_summary:
+            parts.append(f"Summary: {profile.personal_info.professional_summary}")
+        if profile.skills.technical:
+            parts.append(f"Technical Skills: {', '.join(profile.skills.technical)}")
+        if profile.skills.soft:
+            parts.append(f"Soft Skills: {', '.join(profile.skills.soft)}")
+        certifications = [c.name for c in profile.skills.certifications]
+        if certifications:
+            parts.append(f"Certifications: {', '.join(certifications)}")
+        for work in (profile.work_history or [])[:MAX_WORK_ENTRIES]:
+            parts.append(f"Experience: {work.title} at {work.company}. {work.description[:MAX_DESCRIPTION_CHARS]}")
+        technologies = sorted({tech for project in profile.projects for tech in project.technologies})
+        if technologies:
+            parts.append(f"Project Technologies: {', '.join(technologies)}")
+        return "\n".join(parts)
+
+    async def upsert_candidates(self, profiles: Dict[str, UserProfile]) -> int:
+        """
+        Index or re-index candidates in one embedding pass
+
+        The forward pass runs in a worker thread so it does not block the event loop.
+
+        Args:
+            profiles: Mapping of candidate ID to profile
+
+        Returns:
+            Number of candidates indexed
+        """
+        if not profiles:
+            return 0
+        ids = list(profiles)
+        documents = [self.create_document_text(profiles[cid]) for cid in ids]
+        embeddings = await asyncio.to_thread(self.embedding_provider.embed, documents)
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=[{"full_name": profiles[cid].personal_info.full_name} for cid in ids]
+        )
+        return len(ids)
+
+    async def remove_candidate(self, candidate_id: str) -> None:
+        """Remove a candidate from the index"""
+        self.collection.delete(ids=[candidate_id])
+
+    async def search(self, query_text: str, n_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Recall the candidates nearest to a query
+
+        The query is embedded in a worker thread so it does not block the event loop.
+
+        Args:
+            query_text: Job title, or an ideal profile document for a richer query
+            n_results: Number of candidates to return
+
+        Returns:
+            List of {"candidate_id", "full_name", "similarity_score"}, best first
+        """
+        if not self.collection.count():
+            return []
+        query_embedding = await asyncio.to_thread(self.embedding_provider.embed, [query_text], cache=False)
+        results = self.collection.query(
+            query_embeddings=query_embedding,
+            n_results=n_results,
+            include=["metadatas", "distances"]
+        )
+        return [
+            {
+                "candidate_id": candidate_id,
+                "full_name": metadata.get("full_name"),
+                "similarity_score": 1 - distance
+            }
+            for candidate_id, metadata, distance in zip(
+                results['ids'][0], results['metadatas'][0], results['distances'][0]
+            )
+        ]
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def memory_usage(self):
+        """Resident memory of the candidate vectors (see NumpyCollection.memory_usage)"""
+        return self.collection.memory_usage()
+
+
+_shared_index: Optional[CandidateIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_candidate_index() -> CandidateIndex:
+    """Get the process-wide candidate index, creating it on first use"""
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = CandidateIndex()
+    return _shared_index
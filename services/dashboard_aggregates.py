@@ -0,0 +1,74 @@
+"""
+Dashboard aggregates
+Running counters, score sums and per-job sorted score lists, updated as
+analyses are written so dashboard statistics are O(1) reads
+"""
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.skill_index import SkillIndex
+
+
+class DashboardAggregates:
+    """
+    Incrementally maintained analysis statistics
+
+    Keeps the analysis count and match-score sum overall and per job title,
+    plus each job's scores in sorted order for percentile benchmarks. Top
+    skills come from the candidate SkillIndex, which caches the most common
+    skills between changes.
+    """
+
+    def __init__(self, skill_index: SkillIndex):
+        """
+        Args:
+            skill_index: Skill index of the candidate store
+        """
+        self.skill_index = skill_index
+        self.analysis_count = 0
+        self.score_sum = 0
+        self._scores_by_job: Dict[str, List[int]] = {}
+        self._score_sum_by_job: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_analysis(self, analysis: Dict[str, Any]) -> None:
+        """Add a stored analysis (needs match_score; job_title is optional)"""
+        score = analysis['match_score']
+        job_title = analysis.get('job_title')
+        with self._lock:
+            self.analysis_count += 1
+            self.score_sum += score
+            if job_title is not None:
+                bisect.insort(self._scores_by_job.setdefault(job_title, []), score)
+                self._score_sum_by_job[job_title] = self._score_sum_by_job.get(job_title, 0) + score
+
+    @property
+    def average_match_score(self) -> float:
+        return self.score_sum / self.analysis_count if self.analysis_count else 0
+
+    def job_benchmarks(self, job_title: str) -> Optional[Dict[str, Any]]:
+        """
+        Score percentiles and mean of a job's analyses
+
+        Returns:
+            {"sample_size", "benchmarks": {"p50", "p75", "p90", "mean"}}, or None without analyses
+        """
+        with self._lock:
+            scores = self._scores_by_job.get(job_title)
+            if not scores:
+                return None
+            count = len(scores)
+            return {
+                "sample_size": count,
+                "benchmarks": {
+                    "p50": scores[count // 2],
+                    "p75": scores[int(count * 0.75)],
+                    "p90": scores[int(count * 0.9)],
+                    "mean": self._score_sum_by_job[job_title] / count
+                }
+            }
+
+    def top_skills(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The n most common candidate skills as (skill, candidate count)"""
+        return self.skill_index.top(n)
@@ -0,0 +1,190 @@
+"""
+Persistent embedding cache
+Stores computed embeddings on disk keyed by model name and text hash, so
+re-indexing unchanged profiles or candidates reads vectors instead of
+running the embedding model
+"""
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, use one cache directory per process
+    fcntl = None
+
+HASH_BYTES = 32  # sha256
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only, memory-mapped embedding cache for one model
+
+    Layout in the cache directory, per model:
+        <model>.f32        float32 rows, memory-mapped for reads
+        <model>.keys       sha256 digest of each row's text, in row order
+        <model>.meta.json  embedding dimension
+
+    Vectors are appended before their keys, so a crash mid-write leaves at
+    most an unreferenced row that the next load ignores.
+
+    Several processes may share the directory: appends and the truncation of
+    a torn tail happen under an exclusive lock on <model>.lock, and each
+    writer first reads the keys other processes appended, so row numbers
+    always come from the files rather than from this process's view.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            model_name: Embedding model the cached vectors belong to
+        """
+        self.directory = Path(directory)
+        self.model_name = model_name
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        self._vectors_path = self.directory / f"{stem}.f32"
+        self._keys_path = self.directory / f"{stem}.keys"
+        self._meta_path = self.directory / f"{stem}.meta.json"
+        self._lock_path = self.directory / f"{stem}.lock"
+        self._lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._row_count = 0  # rows read from the key file (keys may repeat across processes)
+        self._dimension: Optional[int] = None
+        self._mmap: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache files across processes"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        if not self._meta_path.exists():
+            return
+        with self._file_lock():
+            self._sync()
+
+    def _sync(self) -> None:
+        """
+        Read keys appended since the last sync (by any process); call under the file lock
+
+        Also drops a partially written tail, so appends stay aligned with the keys.
+        """
+        if self._dimension is None:
+            if not self._meta_path.exists():
+                return
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dimension = json.load(f)["dimension"]
+        row_bytes = self._dimension * 4
+        key_bytes = self._keys_path.stat().st_size if self._keys_path.exists() else 0
+        stored_rows = self._vectors_path.stat().st_size // row_bytes if self._vectors_path.exists() else 0
+        rows = min(key_bytes // HASH_BYTES, stored_rows)
+        if rows > self._row_count:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._row_count * HASH_BYTES)
+                keys = f.read((rows - self._row_count) * HASH_BYTES)
+            for i in range(rows - self._row_count):
+                self._rows.setdefault(keys[i * HASH_BYTES:(i + 1) * HASH_BYTES], self._row_count + i)
+            self._row_count = rows
+        if self._vectors_path.exists() and self._vectors_path.stat().st_size != rows * row_bytes:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+        if key_bytes != rows * HASH_BYTES:
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(rows * HASH_BYTES)
+
+    def _vectors(self) -> np.ndarray:
+        """Memory map of the stored rows, re-mapped after the file grew"""
+        if self._mmap is None or len(self._mmap) < self._row_count:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r").reshape(-1, self._dimension)
+        return self._mmap
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def lookup(self, texts: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        Look up cached embeddings
+
+        Returns:
+            Tuple of ({position in texts: vector}, positions of texts not cached)
+        """
+        found: Dict[int, np.ndarray] = {}
+        missing: List[int] = []
+        with self._lock:
+            vectors = self._vectors() if self._rows else None
+            for i, text in enumerate(texts):
+                row = self._rows.get(text_hash(text))
+                if row is None:
+                    missing.append(i)
+                else:
+                    found[i] = np.array(vectors[row])
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def store(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Append embeddings for texts that are not cached yet"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._dimension is None:
+                self._dimension = int(vectors.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model_name": self.model_name, "dimension": self._dimension}, f)
+            elif vectors.shape[1] != self._dimension:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self._dimension}")
+
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for text, vector in zip(texts, vectors):
+                key = text_hash(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # _sync() left both files exactly self._row_count rows long
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.stack(new_rows).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(new_keys))
+            for i, key in enumerate(new_keys):
+                self._rows[key] = self._row_count + i
+            self._row_count += len(new_keys)
+
+    def stats(self) -> Dict[str, object]:
+        """Cache size and hit rate since the process started"""
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
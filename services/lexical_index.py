@@ -0,0 +1,128 @@
+"""
+In-process BM25 index
+Keyword retrieval over profile documents, used next to the vector index for
+hybrid search and on its own when a query must not wait for an embedding
+"""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Standard BM25 parameters
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+# Rank constant of reciprocal rank fusion (Cormack et al.)
+RRF_K = 60
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Frequent words in the "Label: value" document layout that carry no signal
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into",
+    "is", "of", "on", "or", "the", "to", "with", "job", "title", "description",
+    "skills", "must", "have", "preferred", "years", "experience", "required",
+    "requirements", "key", "responsibilities", "additional", "criteria",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps tokens like c++, c# and splits ci/cd into ci, cd"""
+    return [token for token in _TOKEN_PATTERN.findall(str(text).lower()) if token not in _STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuse several rankings of IDs (best first) with reciprocal rank fusion
+
+    Returns:
+        List of (id, fused score) pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring
+
+    Documents can be added and removed incrementally; scoring only touches the
+    postings of the query terms.
+    """
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version with the same ID"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in [term for term, postings in self._postings.items() if doc_id in postings]:
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 10,
+        allowed_ids: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query
+
+        Args:
+            query: Keyword query
+            n_results: Maximum number of results
+            allowed_ids: Restrict results to these IDs (e.g. a job-title filter)
+
+        Returns:
+            List of (id, BM25 score) pairs with a positive score, best first
+        """
+        allowed = set(allowed_ids) if allowed_ids is not None else None
+        with self._lock:
+            count = len(self._lengths)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
@@ -0,0 +1,61 @@
+"""
+Vector quantization
+Compact codes for unit-norm embeddings, used by the NumPy vector store to keep
+large collections (e.g. the candidate pool) resident in a fraction of the
+float32 memory
+"""
+import numpy as np
+
+QUANTIZATION_MODES = ("int8",)
+
+# Rows scored per block, bounding the temporary float32 memory of a scan
+SCORE_BLOCK_ROWS = 4096
+
+
+class Int8Quantizer:
+    """
+    Scalar quantization to int8 with one scale per vector (4x smaller)
+
+    Inner products are computed on the int8 codes and rescaled, which keeps
+    rankings of unit vectors very close to float32.
+    """
+
+    mode = "int8"
+
+    def fit(self, vectors: np.ndarray) -> "Int8Quantizer":
+        return self
+
+    @property
+    def trained(self) -> bool:
+        return True
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode rows as int8 codes followed by a float32 scale (as 4 int8 bytes)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1)
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        codes = np.round(vectors / scales[:, None] * 127).astype(np.int8)
+        return np.hstack([codes, scales[:, None].view(np.int8)])
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        scales = np.ascontiguousarray(codes[:, -4:]).view(np.float32)[:, 0]
+        return codes[:, :-4].astype(np.float32) * (scales / 127)[:, None]
+
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Approximate inner products, shape (len(codes), len(queries))"""
+        result = np.empty((len(codes), len(queries)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            scales = np.ascontiguousarray(block[:, -4:]).view(np.float32)[:, 0]
+            result[start:start + len(block)] = (block[:, :-4].astype(np.float32) @ queries.T) * (scales / 127)[:, None]
+        return result
+
+    def nbytes(self) -> int:
+        return 0
+
+
+def make_quantizer(mode: str):
+    """Create the quantizer for a quantization mode ("int8")"""
+    if mode == "int8":
+        return Int8Quantizer()
+    raise ValueError(f"Unknown quantization '{mode}', expected one of {QUANTIZATION_MODES}")
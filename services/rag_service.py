@@ -3,46 +3,462 @@ RAG Service using ChromaDB for Ideal Candidate Profiles
 Stores and retrieves ideal candidate profiles for matching
 """
 import os
+import threading
+import time
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
+import bisect
+import hashlib
 import json
 import uuid
+import numpy as np
 from datetime import datetime
+from pydantic import ValidationError
+
+from models.user_profile import IdealProfile
+from services.embedding_cache import EmbeddingCache
+from services.lexical_index import BM25Index, reciprocal_rank_fusion
+from services.query_cache import QueryResultCache
+from services.title_resolver import TitleResolver
+from services.vector_store import NumpyClient
+
+load_dotenv()
+
+# Sentence-transformers model used for both indexing and querying
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Collection key (store, storage directory, collection name) -> version,
+# incremented on every change made through a RAGService; cached search results
+# are tagged with it
+_collection_versions: Dict[Tuple[str, str, str], int] = {}
+
+# Seconds between checks of a collection's change stamp for writes made by
+# other processes (RAG_CHANGE_CHECK_INTERVAL env, 0 checks on every read)
+DEFAULT_CHANGE_CHECK_INTERVAL = 2.0
+
+# Collection key -> last change stamp written by this process; a newer stamp
+# on disk means another process changed the stored collection
+_local_stamps: Dict[Tuple[str, str, str], str] = {}
+
+# Cached search results per RAGService (RAG_QUERY_CACHE_SIZE env, 0 disables)
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
+# Memoized get_ideal_profile() lookups (RAG_IDEAL_PROFILE_MEMO_SIZE env, 0 disables)
+DEFAULT_IDEAL_PROFILE_MEMO_SIZE = 1024
+
+# (collection key, job title) -> [best ideal profile match] or [] for no match,
+# shared across RAGService instances and tagged with the collection version
+_ideal_profile_memo = QueryResultCache(
+    int(os.getenv("RAG_IDEAL_PROFILE_MEMO_SIZE", DEFAULT_IDEAL_PROFILE_MEMO_SIZE))
+)
+
+# Number of profile documents embedded per forward pass when syncing
+DEFAULT_SYNC_BATCH_SIZE = 64
+
+# Retrieval modes: "hybrid" (BM25 + vector, fused with RRF), "vector" or "lexical"
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+DEFAULT_SEARCH_MODE = "hybrid"
+
+# Candidates taken from each ranking before fusing them in hybrid mode
+HYBRID_CANDIDATES = 50
+
+# Embedding size assumed when estimating the memory of a ChromaDB collection (all-MiniLM-L6-v2)
+ESTIMATED_EMBEDDING_DIMENSION = 384
+
+# Ideal profiles per page when listing
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Vector store backends: "chroma" (persistent HNSW) or "numpy" (exact, in-memory)
+RAG_BACKENDS = ("chroma", "numpy")
+DEFAULT_RAG_BACKEND = "chroma"
+
+# One client per (backend, storage directory), reused by every RAGService;
+# quantized NumPy stores are keyed "numpy:<quantization>"
+_clients: Dict[Tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+# Process-wide RAGService and embedding provider used by the app and the analyzers
+_shared_service: Optional["RAGService"] = None
+_shared_provider: Optional["EmbeddingProvider"] = None
+_shared_service_lock = threading.Lock()
+
+
+def _mark_collection_changed(collection_key: Tuple[str, str, str]) -> None:
+    """Bump a collection's version, invalidating its cached searches and ideal-profile lookups"""
+    with _clients_lock:
+        _collection_versions[collection_key] = _collection_versions.get(collection_key, 0) + 1
+
+
+def _get_client(persist_directory: str, backend: str = DEFAULT_RAG_BACKEND, quantization: Optional[str] = None):
+    """Get the shared vector store client for a backend, storage directory and quantization"""
+    if backend not in RAG_BACKENDS:
+        raise ValueError(f"Unknown RAG backend '{backend}', expected one of {RAG_BACKENDS}")
+    if quantization and backend != "numpy":
+        raise ValueError("Quantized storage requires the numpy backend")
+    key = (backend, persist_directory) if not quantization else (f"{backend}:{quantization}", persist_directory)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            Path(persist_directory).mkdir(parents=True, exist_ok=True)
+            if backend == "numpy":
+                index_directory = "numpy_index" if not quantization else f"numpy_index_{quantization}"
+                client = NumpyClient(path=str(Path(persist_directory) / index_directory), quantization=quantization)
+            else:
+                client = chromadb.PersistentClient(
+                    path=persist_directory,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+            _clients[key] = client
+        return client
+
+
+class EmbeddingProvider:
+    """
+    Sentence-transformers embedding model shared by indexing and querying
+    
+    The model is loaded on first use, or up front by warmup() during app startup,
+    so the first search after a deploy does not pay the model load. With a
+    cache directory, document embeddings are also kept in an on-disk
+    EmbeddingCache, so re-indexing unchanged text skips the model.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, cache_directory: Optional[str] = None):
+        """
+        Args:
+            model_name: Sentence-transformers model (default: EMBEDDING_MODEL env or all-MiniLM-L6-v2)
+            cache_directory: Directory of the persistent embedding cache, or None for no cache
+        """
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        self.cache = EmbeddingCache(cache_directory, self.model_name) if cache_directory else None
+        self.ready = False
+        self.error: Optional[str] = None
+        self._model = None
+        self._lock = threading.Lock()
+    
+    def _load_model(self):
+        # Imported lazily: torch and sentence-transformers take seconds to import
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(self.model_name)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+    
+    def load(self) -> None:
+        """Load the model if it is not loaded yet"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+    
+    def warmup(self) -> None:
+        """Load the model and run one forward pass, then mark the provider ready"""
+        try:
+            self.load()
+            self._encode(["warmup"])
+            self.ready = True
+            self.error = None
+        except Exception as e:
+            self.error = str(e)
+            raise
+    
+    def embed(self, texts: List[str], cache: bool = True) -> np.ndarray:
+        """
+        Embed texts in one forward pass
+        
+        Args:
+            texts: Texts to embed
+            cache: Read and write the embedding cache; pass False for one-off
+                texts such as search queries so they do not grow the cache
+        
+        Returns:
+            float32 array of shape (len(texts), dimension) with L2-normalized rows
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        texts = list(texts)
+        if self.cache is None or not cache:
+            self.load()
+            return np.asarray(self._encode(texts), dtype=np.float32)
+        
+        found, missing = self.cache.lookup(texts)
+        if not missing:
+            return np.stack([found[i] for i in range(len(texts))])
+        
+        self.load()
+        computed = np.asarray(self._encode([texts[i] for i in missing]), dtype=np.float32)
+        self.cache.store([texts[i] for i in missing], computed)
+        vectors = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        vectors[missing] = computed
+        for i, vector in found.items():
+            vectors[i] = vector
+        return vectors
+
+
+def _default_cache_directory() -> Optional[str]:
+    """EMBEDDING_CACHE_DIR env, or <CHROMA_DB_PATH>/embedding_cache; an empty value disables the cache"""
+    directory = os.getenv("EMBEDDING_CACHE_DIR")
+    if directory is not None:
+        return directory or None
+    chroma_path = os.getenv("CHROMA_DB_PATH", str(Path(__file__).parent.parent / "chroma_db"))
+    return str(Path(chroma_path) / "embedding_cache")
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """Get the process-wide embedding provider"""
+    global _shared_provider
+    if _shared_provider is None:
+        with _shared_service_lock:
+            if _shared_provider is None:
+                _shared_provider = EmbeddingProvider(cache_directory=_default_cache_directory())
+    return _shared_provider
+
+
+def get_rag_service() -> "RAGService":
+    """Get the process-wide RAGService, creating it on first use"""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = RAGService()
+    return _shared_service
+
 
 class RAGService:
-    """Service for managing ideal candidate profiles in ChromaDB"""
+    """
+    Service for managing ideal candidate profiles in ChromaDB
     
-    def __init__(self, collection_name: str = "ideal_candidate_profiles"):
+    Instances are safe to share between threads; use get_rag_service() for the
+    long-lived instance instead of creating one per request. With the "numpy"
+    backend the collection is an exact in-memory NumPy index (see
+    services/vector_store.py), which is faster for small collections such as
+    the built-in ideal profiles.
+    """
+    
+    def __init__(
+        self,
+        collection_name: str = "ideal_candidate_profiles",
+        persist_directory: Optional[str] = None,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        backend: Optional[str] = None,
+        quantization: Optional[str] = None
+    ):
         """
         Initialize ChromaDB client and collection
         
         Args:
             collection_name: Name of the ChromaDB collection
+            persist_directory: Storage directory (default: CHROMA_DB_PATH env or ./chroma_db)
+            embedding_provider: Embedding model for documents and queries (default: shared provider)
+            backend: Vector store backend, "chroma" or "numpy" (default: RAG_BACKEND env or chroma)
+            quantization: "int8" to store quantized codes with exact re-ranking
+                (numpy backend only; default: RAG_QUANTIZATION env or full precision)
         """
-        load_dotenv()
-        
+        self.embedding_provider = embedding_provider or get_embedding_provider()
+        self.backend = (backend or os.getenv("RAG_BACKEND", DEFAULT_RAG_BACKEND)).lower()
+        self.quantization = (quantization or os.getenv("RAG_QUANTIZATION") or "").lower() or None
         # Get or create persistent client
-        persist_directory = os.getenv(
+        persist_directory = persist_directory or os.getenv(
             "CHROMA_DB_PATH", 
             str(Path(__file__).parent.parent / "chroma_db")
         )
-        Path(persist_directory).mkdir(exist_ok=True)
-        
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
+        self.client = _get_client(persist_directory, self.backend, self.quantization)
+        self._lock = threading.RLock()
+        # Identifies the stored collection: same-named collections of other
+        # backends or directories are different collections
+        self.collection_key = (
+            f"{self.backend}:{self.quantization}" if self.quantization else self.backend,
+            str(Path(persist_directory).resolve()),
+            collection_name
         )
         
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
+        self.collection = self._open_collection(collection_name)
+        
+        # Decoded profiles and job-title index over the collection, loaded on first use:
+        # id -> (typed profile, decoded profile dict, document),
+        # exact title -> ids and case-folded title -> ids
+        self._records: Optional[Dict[str, Tuple[IdealProfile, Dict[str, Any], Optional[str]]]] = None
+        self._title_index: Dict[str, List[str]] = {}
+        self._folded_title_index: Dict[str, List[str]] = {}
+        self._title_resolver: Optional[TitleResolver] = None
+        self._sorted_ids: Optional[List[str]] = None  # listing order, rebuilt after changes
+        self._lexical_index = BM25Index()
+        self.search_mode = os.getenv("RAG_SEARCH_MODE", DEFAULT_SEARCH_MODE).lower()
+        self.query_cache = QueryResultCache(int(os.getenv("RAG_QUERY_CACHE_SIZE", DEFAULT_QUERY_CACHE_SIZE)))
+        # Last memory_footprint() as ((collection version, profiles cached), bytes)
+        self._footprint: Optional[Tuple[Tuple[int, bool], int]] = None
+        # Change stamp shared through the storage directory: rewritten on every
+        # change, so other processes (e.g. database/load_profiles.py) notice it
+        stamp_name = f"{self.collection_key[0].replace(':', '_')}__{collection_name}"
+        self._stamp_path = Path(persist_directory) / "collection_stamps" / stamp_name
+        self.change_check_interval = float(os.getenv("RAG_CHANGE_CHECK_INTERVAL", DEFAULT_CHANGE_CHECK_INTERVAL))
+        self._seen_stamp = self._read_stamp()
+        self._stamp_checked_at = time.monotonic()
+    
+    def _open_collection(self, name: str):
+        return self.client.get_or_create_collection(
+            name=name,
             metadata={"description": "Ideal candidate profiles for job matching"}
         )
     
+    def _read_stamp(self) -> Optional[str]:
+        try:
+            return self._stamp_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+    
+    def _record_change(self) -> None:
+        """Bump the collection version and rewrite the change stamp for other processes"""
+        _mark_collection_changed(self.collection_key)
+        stamp = uuid.uuid4().hex
+        self._stamp_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._stamp_path.with_name(f"{self._stamp_path.name}.{stamp}.tmp")
+        tmp_path.write_text(stamp, encoding="utf-8")
+        os.replace(tmp_path, self._stamp_path)
+        self._seen_stamp = stamp
+        with _clients_lock:
+            _local_stamps[self.collection_key] = stamp
+    
+    def _check_external_changes(self) -> None:
+        """
+        Reload the collection if another process or service changed it
+        
+        Compares the change stamp with the one last seen, at most once per
+        change_check_interval seconds. On a change the profile cache is
+        dropped and the version is bumped, so cached searches and lookups are
+        recomputed; if another process made the change, a NumPy collection is
+        also reopened from its snapshot (the shared in-process handle is
+        current otherwise).
+        """
+        now = time.monotonic()
+        if self.change_check_interval > 0 and now - self._stamp_checked_at < self.change_check_interval:
+            return
+        self._stamp_checked_at = now
+        stamp = self._read_stamp()
+        if stamp == self._seen_stamp:
+            return
+        with self._lock:
+            self._seen_stamp = stamp
+            with _clients_lock:
+                external = stamp != _local_stamps.get(self.collection_key)
+            if external and hasattr(self.client, "release_collection"):
+                # Reopen from the snapshot unless another service here already did
+                current = self._open_collection(self.collection.name)
+                if current is self.collection:
+                    self.client.release_collection(self.collection.name)
+                    current = self._open_collection(self.collection.name)
+                self.collection = current
+            self._records = None
+        _mark_collection_changed(self.collection_key)
+    
+    @property
+    def collection_version(self) -> int:
+        """Version of the collection, incremented whenever profiles are added, changed or deleted"""
+        return _collection_versions.get(self.collection_key, 0)
+    
+    @staticmethod
+    def _fold_title(title: str) -> str:
+        return " ".join(str(title).casefold().split())
+    
+    @staticmethod
+    def _parse_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode list fields stored as JSON strings and numeric fields stored as strings"""
+        parsed_metadata = {}
+        for key, value in metadata.items():
+            if key in ['must_have_skills', 'preferred_skills', 'education_requirements',
+                      'certifications', 'key_responsibilities']:
+                try:
+                    parsed_metadata[key] = json.loads(value) if isinstance(value, str) else value
+                except:
+                    parsed_metadata[key] = value
+            elif key == 'years_experience':
+                try:
+                    parsed_metadata[key] = int(value)
+                except:
+                    parsed_metadata[key] = value
+            else:
+                parsed_metadata[key] = value
+        return parsed_metadata
+    
+    @classmethod
+    def _decode_profile(cls, metadata: Dict[str, Any]) -> Tuple[IdealProfile, Dict[str, Any]]:
+        """Decode stored metadata into a typed profile and its plain dict form"""
+        parsed_metadata = cls._parse_metadata(metadata)
+        try:
+            profile = IdealProfile.model_validate(parsed_metadata)
+        except ValidationError:
+            # Keep hand-edited or legacy records readable, as the untyped reads did
+            profile = IdealProfile.model_construct(**parsed_metadata)
+        return profile, parsed_metadata
+    
+    def _ensure_profile_cache(self) -> None:
+        """Load the decoded profiles and title index from the collection if not loaded yet"""
+        self._check_external_changes()
+        if self._records is not None:
+            return
+        with self._lock:
+            if self._records is not None:
+                return
+            results = self.collection.get(include=["metadatas", "documents"])
+            self._records = {}
+            self._lexical_index = BM25Index()
+            self._title_index = {}
+            self._folded_title_index = {}
+            for i, profile_id in enumerate(results.get('ids') or []):
+                metadata = results['metadatas'][i] if results.get('metadatas') else {}
+                document = results['documents'][i] if results.get('documents') else None
+                self._index_record(profile_id, metadata or {}, document)
+    
+    def _index_record(self, profile_id: str, metadata: Dict[str, Any], document: Optional[str]) -> None:
+        profile, profile_dict = self._decode_profile(metadata)
+        self._records[profile_id] = (profile, profile_dict, document)
+        self._lexical_index.add(profile_id, document or "")
+        self._title_resolver = None
+        self._sorted_ids = None
+        title = profile_dict.get('job_title')
+        if title:
+            self._title_index.setdefault(title, []).append(profile_id)
+            self._folded_title_index.setdefault(self._fold_title(title), []).append(profile_id)
+    
+    def _unindex_record(self, profile_id: str) -> None:
+        record = self._records.pop(profile_id, None)
+        self._lexical_index.remove(profile_id)
+        self._title_resolver = None
+        self._sorted_ids = None
+        title = record[1].get('job_title') if record else None
+        if not title:
+            return
+        for index, key in ((self._title_index, title), (self._folded_title_index, self._fold_title(title))):
+            ids = [i for i in index.get(key, []) if i != profile_id]
+            if ids:
+                index[key] = ids
+            else:
+                index.pop(key, None)
+    
+    def refresh_index(self) -> None:
+        """Reload the decoded profiles and title index after the collection was written directly (e.g. a snapshot import)"""
+        with self._lock:
+            self._records = None
+        self._ensure_profile_cache()
+        self._record_change()
+    
+    def _lookup_title(self, job_title: str) -> Tuple[List[str], bool]:
+        """
+        Find profile IDs whose job title matches, exactly or case-insensitively
+        
+        Returns:
+            Tuple of (matching IDs, whether the match was exact)
+        """
+        self._ensure_profile_cache()
+        exact = self._title_index.get(job_title)
+        if exact:
+            return list(exact), True
+        return list(self._folded_title_index.get(self._fold_title(job_title), [])), False
+    
     def _create_document_text(self, ideal_profile: Dict[str, Any]) -> str:
         """
         Convert ideal candidate profile to searchable text document
@@ -116,6 +532,26 @@ class RAGService:
         document_text = self._create_document_text(ideal_profile)
         
         # Prepare metadata
+        metadata = self._create_metadata(ideal_profile)
+        
+        # Add to collection
+        embedding = self.embedding_provider.embed([document_text])
+        self._ensure_profile_cache()
+        with self._lock:
+            self.collection.add(
+                documents=[document_text],
+                embeddings=embedding.tolist(),
+                metadatas=[metadata],
+                ids=[profile_id]
+            )
+            self._index_record(profile_id, metadata, document_text)
+            self._record_change()
+        
+        return profile_id
+    
+    @staticmethod
+    def _create_metadata(ideal_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a profile to ChromaDB metadata (lists stored as JSON strings)"""
         metadata = {}
         for key, value in ideal_profile.items():
             if isinstance(value, list):
@@ -126,125 +562,550 @@ class RAGService:
                 metadata[key] = str(value)
         
         metadata["created_at"] = datetime.now().isoformat()
+        return metadata
+    
+    @classmethod
+    def _stable_profile_ids(cls, profiles: List[Dict[str, Any]]) -> List[str]:
+        """IDs derived from job titles, so a profile keeps its ID across syncs"""
+        ids = []
+        seen: Dict[str, int] = {}
+        for profile in profiles:
+            title_hash = hashlib.sha256(cls._fold_title(profile.get('job_title', '')).encode("utf-8")).hexdigest()[:16]
+            count = seen.get(title_hash, 0)
+            seen[title_hash] = count + 1
+            ids.append(f"profile_{title_hash}" if count == 0 else f"profile_{title_hash}_{count}")
+        return ids
+    
+    async def sync_profiles(
+        self,
+        profiles: List[Dict[str, Any]],
+        delete_missing: bool = True,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Incrementally sync the collection with a list of ideal profiles
         
-        # Add to collection
-        self.collection.add(
-            documents=[document_text],
-            metadatas=[metadata],
-            ids=[profile_id]
-        )
+        Each profile gets a stable ID from its job title and a content hash of
+        its document text and fields. Only new or changed profiles are embedded
+        (in batches) and upserted; profiles no longer in the list are deleted
+        afterwards, so the collection is never empty while syncing.
         
-        return profile_id
+        Args:
+            profiles: Ideal candidate profiles, e.g. database.profiles.PROFILES
+            delete_missing: Delete stored profiles that are not in the list
+            batch_size: Documents per embedding pass (default: 64)
+            
+        Returns:
+            Counts of added, updated, unchanged and deleted profiles
+        """
+        batch_size = batch_size or DEFAULT_SYNC_BATCH_SIZE
+        ids = self._stable_profile_ids(profiles)
+        
+        with self._lock:
+            existing = self.collection.get(include=["metadatas"])
+        existing_hashes = {
+            profile_id: (existing['metadatas'][i] or {}).get('content_hash')
+            for i, profile_id in enumerate(existing.get('ids') or [])
+        }
+        
+        changed = []
+        summary = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        for profile_id, profile in zip(ids, profiles):
+            document_text = self._create_document_text(profile)
+            content_hash = hashlib.sha256(
+                (document_text + json.dumps(profile, sort_keys=True, default=str)).encode("utf-8")
+            ).hexdigest()
+            if profile_id not in existing_hashes:
+                summary["added"] += 1
+            elif existing_hashes[profile_id] != content_hash:
+                summary["updated"] += 1
+            else:
+                summary["unchanged"] += 1
+                continue
+            metadata = self._create_metadata(profile)
+            metadata["content_hash"] = content_hash
+            changed.append((profile_id, document_text, metadata))
+        
+        self._ensure_profile_cache()
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            embeddings = self.embedding_provider.embed([document for _, document, _ in batch])
+            with self._lock:
+                self.collection.upsert(
+                    ids=[profile_id for profile_id, _, _ in batch],
+                    documents=[document for _, document, _ in batch],
+                    embeddings=embeddings.tolist(),
+                    metadatas=[metadata for _, _, metadata in batch]
+                )
+                for profile_id, document, metadata in batch:
+                    self._unindex_record(profile_id)
+                    self._index_record(profile_id, metadata, document)
+        
+        wanted = set(ids)
+        stale = [profile_id for profile_id in existing_hashes if profile_id not in wanted] if delete_missing else []
+        if stale:
+            with self._lock:
+                self.collection.delete(ids=stale)
+                for profile_id in stale:
+                    self._unindex_record(profile_id)
+            summary["deleted"] = len(stale)
+        
+        if changed or stale:
+            self._record_change()
+        return summary
     
     async def search_ideal_profiles(
         self, 
         query: str, 
         job_title: Optional[str] = None,
-        n_results: int = 3
+        n_results: int = 3,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for ideal candidate profiles using RAG
         
+        When job_title is given it is resolved against the in-memory title index
+        (exact match first, then case-insensitive). If the query is the title
+        itself, matches are answered from memory without embedding the query;
+        if no profile has the title, the search returns nothing without touching
+        the vector index. Only other queries are embedded.
+        
         Args:
             query: Search query (e.g., job title or description)
             job_title: Optional job title filter
             n_results: Number of results to return
+            mode: "hybrid", "vector" or "lexical" (default: RAG_SEARCH_MODE env or hybrid)
             
         Returns:
             List of matching ideal profiles with similarity scores
         """
-        # Build query with filters
-        where_filter = None
-        if job_title:
-            where_filter = {"job_title": {"$eq": job_title}}
+        results = await self.search_ideal_profiles_batch([query], [job_title], n_results, mode)
+        return results[0]
+    
+    async def search_ideal_profiles_batch(
+        self,
+        queries: List[str],
+        job_titles: Optional[List[Optional[str]]] = None,
+        n_results: int = 3,
+        mode: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search ideal candidate profiles for many queries at once
+        
+        Title lookups are answered from the title index as in
+        search_ideal_profiles. All remaining queries are embedded in one forward
+        pass and sent to the collection in one query per distinct job-title
+        filter (a single query when no filters are given).
+        
+        In hybrid mode the vector ranking is fused with a BM25 ranking over the
+        profile documents using reciprocal rank fusion, so exact skill keywords
+        ("Kubernetes Terraform") count as much as semantic similarity. Lexical
+        mode skips the embedding model and the vector index entirely.
+        
+        Results are cached per (mode, query, job_title, n_results) in an LRU
+        tagged with the collection version, so repeated searches skip the
+        embedding model and the index until profiles change.
+        
+        Args:
+            queries: Search queries
+            job_titles: Optional job title filter per query (same length as queries)
+            n_results: Number of results to return per query
+            mode: "hybrid", "vector" or "lexical" (default: RAG_SEARCH_MODE env or hybrid)
+            
+        Returns:
+            One list of matching ideal profiles per query, in input order
+        """
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+        if job_titles is None:
+            job_titles = [None] * len(queries)
+        if len(job_titles) != len(queries):
+            raise ValueError("job_titles must have the same length as queries")
+        
+        # Read the version before searching: results computed while the
+        # collection changes are tagged with the old version and never served
+        self._check_external_changes()
+        version = self.collection_version
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        misses = []
+        for i, (query, job_title) in enumerate(zip(queries, job_titles)):
+            cached = self.query_cache.get((mode, query, job_title, n_results), version)
+            if cached is None:
+                misses.append(i)
+            else:
+                results[i] = self._copy_results(cached)
+        if not misses:
+            return results
         
-        # Search collection
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_filter
+        computed = self._search_uncached(
+            [queries[i] for i in misses], [job_titles[i] for i in misses], n_results, mode
         )
+        for i, matches in zip(misses, computed):
+            self.query_cache.put((mode, queries[i], job_titles[i], n_results), version, self._copy_results(matches))
+            results[i] = matches
+        return results
+    
+    @staticmethod
+    def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copy search results so callers cannot modify cached entries"""
+        return [{**result, "profile": dict(result["profile"])} for result in results]
+    
+    def _search_uncached(
+        self,
+        queries: List[str],
+        job_titles: List[Optional[str]],
+        n_results: int,
+        mode: str
+    ) -> List[List[Dict[str, Any]]]:
+        """Run search_ideal_profiles_batch without the result cache"""
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        # Filter (as canonical JSON) -> indexes of the queries that need retrieval
+        pending: Dict[str, List[int]] = {}
+        filters: Dict[str, Optional[Dict[str, Any]]] = {}
+        allowed_ids: Dict[str, Optional[List[str]]] = {}
+        for i, (query, job_title) in enumerate(zip(queries, job_titles)):
+            where_filter = None
+            title_ids = None
+            if job_title:
+                title_ids, exact = self._lookup_title(job_title)
+                if not title_ids:
+                    continue
+                if self._fold_title(query) == self._fold_title(job_title):
+                    results[i] = [self._format_record(profile_id) for profile_id in title_ids[:n_results]]
+                    continue
+                if exact:
+                    where_filter = {"job_title": {"$eq": job_title}}
+                else:
+                    titles = sorted({self._records[pid][1]['job_title'] for pid in title_ids})
+                    where_filter = {"job_title": {"$in": titles}}
+            key = json.dumps(where_filter, sort_keys=True)
+            filters[key] = where_filter
+            allowed_ids[key] = title_ids
+            pending.setdefault(key, []).append(i)
+        
+        if not pending:
+            return results
+        
+        if mode == "lexical":
+            self._ensure_profile_cache()
+            for key, indexes in pending.items():
+                for i in indexes:
+                    ranking = self._lexical_index.search(queries[i], n_results, allowed_ids[key])
+                    top = ranking[0][1] if ranking else 0.0
+                    results[i] = [
+                        {**self._format_record(profile_id), "similarity_score": score / top, "bm25_score": score}
+                        for profile_id, score in ranking
+                    ]
+            return results
+        
+        # Embed every remaining query in one forward pass
+        order = [i for indexes in pending.values() for i in indexes]
+        embeddings = self.embedding_provider.embed([queries[i] for i in order], cache=False)
+        row_of = {i: row for row, i in enumerate(order)}
+        depth = n_results if mode == "vector" else max(n_results, HYBRID_CANDIDATES)
+        
+        for key, indexes in pending.items():
+            with self._lock:
+                response = self.collection.query(
+                    query_embeddings=embeddings[[row_of[i] for i in indexes]].tolist(),
+                    n_results=depth,
+                    where=filters[key]
+                )
+            for position, i in enumerate(indexes):
+                vector_results = self._format_query_results(response, position)
+                if mode == "vector":
+                    results[i] = vector_results
+                else:
+                    results[i] = self._fuse_results(
+                        queries[i], vector_results, embeddings[row_of[i]], allowed_ids[key], depth, n_results
+                    )
+        
+        return results
+    
+    def _fuse_results(
+        self,
+        query: str,
+        vector_results: List[Dict[str, Any]],
+        query_embedding: np.ndarray,
+        allowed_ids: Optional[List[str]],
+        depth: int,
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        """Fuse vector results with the BM25 ranking of a query using reciprocal rank fusion"""
+        self._ensure_profile_cache()
+        lexical = self._lexical_index.search(query, depth, allowed_ids)
+        bm25_scores = dict(lexical)
+        by_id = {result["id"]: result for result in vector_results}
+        fused = reciprocal_rank_fusion([
+            [result["id"] for result in vector_results],
+            [profile_id for profile_id, _ in lexical]
+        ])[:n_results]
+        
+        # Lexical-only hits beyond the vector depth: score them against the query embedding
+        missing = [profile_id for profile_id, _ in fused if profile_id not in by_id]
+        if missing:
+            with self._lock:
+                stored = self.collection.get(ids=missing, include=["embeddings"])
+            for profile_id, embedding in zip(stored['ids'], stored['embeddings']):
+                cosine = float(np.dot(np.asarray(embedding, dtype=np.float32), query_embedding))
+                # Same scale as 1 - squared L2 distance of unit vectors
+                by_id[profile_id] = {**self._format_record(profile_id), "similarity_score": 2 * cosine - 1}
         
-        # Format results
+        return [
+            {**by_id[profile_id], "rrf_score": score, "bm25_score": bm25_scores.get(profile_id, 0.0)}
+            for profile_id, score in fused
+            if profile_id in by_id
+        ]
+    
+    def _format_query_results(self, results: Dict[str, Any], position: int) -> List[Dict[str, Any]]:
+        """Format the matches of one query in a collection.query response"""
         profiles = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                profile_id = results['ids'][0][i]
-                metadata = results['metadatas'][0][i]
-                distance = results['distances'][0][i] if results.get('distances') and results['distances'][0] else None
-                
-                # Parse JSON fields from metadata
-                parsed_metadata = {}
-                for key, value in metadata.items():
-                    if key in ['must_have_skills', 'preferred_skills', 'education_requirements',
-                              'certifications', 'key_responsibilities']:
-                        try:
-                            parsed_metadata[key] = json.loads(value) if isinstance(value, str) else value
-                        except:
-                            parsed_metadata[key] = value
-                    elif key == 'years_experience':
-                        try:
-                            parsed_metadata[key] = int(value)
-                        except:
-                            parsed_metadata[key] = value
-                    else:
-                        parsed_metadata[key] = value
+        if results['ids'] and len(results['ids'][position]) > 0:
+            distances = results['distances'][position] if results.get('distances') else None
+            documents = results['documents'][position] if results.get('documents') else None
+            for i, profile_id in enumerate(results['ids'][position]):
+                distance = distances[i] if distances else None
+                record = self._records.get(profile_id) if self._records is not None else None
+                if record is not None:
+                    profile_dict = dict(record[1])
+                else:
+                    profile_dict = self._parse_metadata(results['metadatas'][position][i])
                 
                 profiles.append({
                     "id": profile_id,
                     "similarity_score": 1 - distance if distance is not None else 1.0,
-                    "profile": parsed_metadata,
-                    "document": results['documents'][0][i] if results.get('documents') else None
+                    "profile": profile_dict,
+                    "document": documents[i] if documents else None
                 })
         
         return profiles
     
+    def _format_record(self, profile_id: str) -> Dict[str, Any]:
+        """Format an indexed profile as an exact title match"""
+        _, profile_dict, document = self._records[profile_id]
+        return {
+            "id": profile_id,
+            "similarity_score": 1.0,
+            "profile": dict(profile_dict),
+            "document": document
+        }
+    
+    def get_profile(self, profile_id: str) -> Optional[IdealProfile]:
+        """Get the typed ideal profile for an ID from the in-memory cache"""
+        self._ensure_profile_cache()
+        record = self._records.get(profile_id)
+        return record[0] if record else None
+    
+    def resolve_job_title(self, job_title: str) -> Optional[Tuple[str, float]]:
+        """
+        Resolve a job title to a title that has ideal profiles
+        
+        Exact and case-insensitive matches resolve with similarity 1.0; other
+        titles resolve to the nearest known title by character n-gram similarity
+        if it is above TITLE_MATCH_THRESHOLD and their distinguishing words match
+        (e.g. "Sr. Software Eng" -> "Senior Software Engineer", but "Data
+        Engineer" does not resolve to "DevOps Engineer"), or else to the known
+        title with the most similar embedding above TITLE_EMBEDDING_THRESHOLD
+        (synonyms such as "Backend Developer" or "QA Engineer").
+        
+        Returns:
+            Tuple of (known job title, similarity), or None if nothing is close enough
+        """
+        title_ids, _ = self._lookup_title(job_title)
+        if title_ids:
+            return self._records[title_ids[0]][1]['job_title'], 1.0
+        
+        resolver = self._title_resolver
+        if resolver is None:
+            with self._lock:
+                resolver = self._title_resolver
+                if resolver is None:
+                    resolver = TitleResolver(
+                        self._title_index.keys(),
+                        # Request-supplied titles must not grow the embedding cache
+                        embed=lambda texts: self.embedding_provider.embed(texts, cache=False)
+                    )
+                    self._title_resolver = resolver
+        return resolver.resolve(job_title)
+    
+    async def get_ideal_profile(self, job_title: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the best ideal profile for a job title, memoized across calls
+        
+        The title is first resolved to a known title (see resolve_job_title), then
+        this is the first result of search_ideal_profiles(query=title,
+        job_title=title, n_results=1). Matches found under a different title
+        carry "resolved_title" and "title_similarity". Lookups (misses too) are
+        memoized in a bounded LRU tagged with the collection version, so they
+        are recomputed after profiles are added or deleted, here or by another
+        process (see _check_external_changes).
+        Each call returns its own copy of the match.
+        
+        Args:
+            job_title: Job title to look up
+            
+        Returns:
+            Matching ideal profile result, or None if there is no match
+        """
+        self._check_external_changes()
+        key = (self.collection_key, job_title)
+        version = self.collection_version
+        memoized = _ideal_profile_memo.get(key, version)
+        if memoized is not None:
+            return self._copy_results(memoized)[0] if memoized else None
+        
+        title, similarity = self.resolve_job_title(job_title) or (job_title, 1.0)
+        results = await self.search_ideal_profiles(query=title, job_title=title, n_results=1)
+        match = results[0] if results else None
+        if match is not None and title != job_title:
+            match = {**match, "resolved_title": title, "title_similarity": similarity}
+        _ideal_profile_memo.put(key, version, self._copy_results([match]) if match is not None else [])
+        return match
+    
+    def has_profiles(self) -> bool:
+        """Whether the collection holds any profile (answered from the decoded profile cache)"""
+        self._ensure_profile_cache()
+        return bool(self._records)
+    
     async def get_all_profiles(self) -> List[Dict[str, Any]]:
-        """Get all ideal candidate profiles"""
-        results = self.collection.get()
+        """Get all ideal candidate profiles (served from the decoded profile cache)"""
+        self._ensure_profile_cache()
+        with self._lock:
+            records = list(self._records.items())
         
-        profiles = []
-        if results.get('ids'):
-            for i, profile_id in enumerate(results['ids']):
-                metadata = results['metadatas'][i] if results.get('metadatas') else {}
-                
-                # Parse JSON fields
-                parsed_metadata = {}
-                for key, value in metadata.items():
-                    if key in ['must_have_skills', 'preferred_skills', 'education_requirements',
-                              'certifications', 'key_responsibilities']:
-                        try:
-                            parsed_metadata[key] = json.loads(value) if isinstance(value, str) else value
-                        except:
-                            parsed_metadata[key] = value
-                    elif key == 'years_experience':
-                        try:
-                            parsed_metadata[key] = int(value)
-                        except:
-                            parsed_metadata[key] = value
-                    else:
-                        parsed_metadata[key] = value
-                
-                profiles.append({
-                    "id": profile_id,
-                    "profile": parsed_metadata,
-                    "document": results['documents'][i] if results.get('documents') else None
-                })
+        return [
+            {
+                "id": profile_id,
+                "profile": dict(profile_dict),
+                "document": document
+            }
+            for profile_id, (_, profile_dict, document) in records
+        ]
+    
+    async def list_profiles(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        job_title: Optional[str] = None,
+        include_document: bool = False
+    ) -> Dict[str, Any]:
+        """
+        List ideal profiles one page at a time
         
-        return profiles
+        Profiles are ordered by ID and paged with a keyset cursor (the last ID
+        of the previous page), so pages stay consistent while profiles are
+        added or deleted. Served from the decoded profile cache.
+        
+        Args:
+            limit: Maximum profiles per page
+            cursor: next_cursor of the previous page (None for the first page)
+            fields: Profile fields to return (default: all)
+            job_title: Only profiles whose job title contains this text (case-insensitive)
+            include_document: Include the embedded document text
+            
+        Returns:
+            {"profiles": [...], "next_cursor": ID or None on the last page,
+             "total": number of profiles matching the filter}
+        """
+        self._ensure_profile_cache()
+        title_filter = self._fold_title(job_title) if job_title else None
+        with self._lock:
+            if self._sorted_ids is None:
+                self._sorted_ids = sorted(self._records)
+            ids = self._sorted_ids
+            if title_filter:
+                ids = [
+                    profile_id for profile_id in ids
+                    if title_filter in self._fold_title(self._records[profile_id][1].get('job_title', ''))
+                ]
+            start = bisect.bisect_right(ids, cursor) if cursor else 0
+            page_ids = ids[start:start + limit]
+            page = []
+            for profile_id in page_ids:
+                _, profile_dict, document = self._records[profile_id]
+                if fields is not None:
+                    profile_dict = {field: profile_dict[field] for field in fields if field in profile_dict}
+                item = {"id": profile_id, "profile": dict(profile_dict)}
+                if include_document:
+                    item["document"] = document
+                page.append(item)
+        
+        return {
+            "profiles": page,
+            "next_cursor": page_ids[-1] if start + limit < len(ids) and page_ids else None,
+            "total": len(ids)
+        }
     
     async def delete_profile(self, profile_id: str) -> bool:
         """Delete an ideal candidate profile"""
-        try:
-            self.collection.delete(ids=[profile_id])
-            return True
-        except Exception:
-            return False
+        self._ensure_profile_cache()
+        with self._lock:
+            try:
+                self.collection.delete(ids=[profile_id])
+                self._unindex_record(profile_id)
+                return True
+            except Exception:
+                return False
+            finally:
+                self._record_change()
+    
+    def memory_footprint(self) -> int:
+        """
+        Approximate bytes this service keeps resident for its collection
+
+        Vector memory as reported by the NumPy store (or count x float32
+        embedding size for ChromaDB, whose segments the shared client manages)
+        plus the cached profile documents. Measured again only after a write
+        or after the profile cache is loaded or dropped; otherwise the last
+        measurement is returned.
+        """
+        with self._lock:
+            stamp = (self.collection_version, self._records is not None)
+            if self._footprint is not None and self._footprint[0] == stamp:
+                return self._footprint[1]
+            if hasattr(self.collection, "memory_usage"):
+                vector_bytes = self.collection.memory_usage()["total_bytes"]
+            else:
+                vector_bytes = self.collection.count() * ESTIMATED_EMBEDDING_DIMENSION * 4
+            records = self._records.values() if self._records is not None else ()
+            footprint = vector_bytes + sum(len(document or "") for _, _, document in records)
+            self._footprint = (stamp, footprint)
+            return footprint
+    
+    def close(self) -> None:
+        """
+        Release the cached profiles and the collection handle
+        
+        Stored profiles are untouched; a NumPy collection is reloaded from its
+        snapshot if it is opened again. ChromaDB segments stay loaded in the
+        shared PersistentClient, so for that backend only the Python-side
+        caches are freed.
+        """
+        self.query_cache.clear()
+        with self._lock:
+            self._records = None
+            self._footprint = None
+            self._title_index = {}
+            self._folded_title_index = {}
+            self._title_resolver = None
+            self._lexical_index = BM25Index()
+        _mark_collection_changed(self.collection_key)
+        if hasattr(self.client, "release_collection"):
+            self.client.release_collection(self.collection.name)
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection"""
+        self._check_external_changes()
         count = self.collection.count()
         return {
             "collection_name": self.collection.name,
-            "profile_count": count
+            "profile_count": count,
+            "embedding_model": self.embedding_provider.model_name,
+            "embedding_cache": self.embedding_provider.cache.stats() if self.embedding_provider.cache else None,
+            "backend": self.backend,
+            "vector_memory": self.collection.memory_usage() if hasattr(self.collection, "memory_usage") else None,
+            "collection_version": self.collection_version,
+            "query_cache": self.query_cache.stats()
         }
@@ -0,0 +1,92 @@
+"""
+Candidate skill index
+Inverted index of technical skill -> candidate IDs, maintained as candidates
+are uploaded and deleted so skill analytics never rescan the candidate store
+"""
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Most common skills kept ready for top() between changes that could reorder them
+TOP_SKILLS_CACHE_SIZE = 50
+
+
+class SkillIndex:
+    """
+    Incrementally maintained skill -> candidate-ID index
+
+    Each candidate counts once per skill, whatever the number of times the
+    skill is listed on their profile. Full counts cost O(unique skills); the
+    most common skills are cached and only recomputed after a change that
+    can affect them (a cached skill changed, or another skill caught up with
+    the last cached count), so top() is usually a slice.
+    """
+
+    def __init__(self):
+        self._candidates_by_skill: Dict[str, Set[str]] = {}
+        self._skills_by_candidate: Dict[str, Tuple[str, ...]] = {}
+        self._top_cache: Optional[List[Tuple[str, int]]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of indexed candidates"""
+        return len(self._skills_by_candidate)
+
+    def add(self, candidate_id: str, skills: Iterable[str]) -> None:
+        """Index a candidate's skills, replacing any previous entry for the candidate"""
+        unique_skills = tuple(dict.fromkeys(skill for skill in skills if skill))
+        with self._lock:
+            self._remove(candidate_id)
+            self._skills_by_candidate[candidate_id] = unique_skills
+            for skill in unique_skills:
+                candidates = self._candidates_by_skill.setdefault(skill, set())
+                candidates.add(candidate_id)
+                self._invalidate_top(skill, len(candidates))
+
+    def remove(self, candidate_id: str) -> None:
+        """Remove a candidate from the index"""
+        with self._lock:
+            self._remove(candidate_id)
+
+    def _remove(self, candidate_id: str) -> None:
+        for skill in self._skills_by_candidate.pop(candidate_id, ()):
+            candidates = self._candidates_by_skill[skill]
+            candidates.discard(candidate_id)
+            self._invalidate_top(skill, len(candidates))
+            if not candidates:
+                del self._candidates_by_skill[skill]
+
+    def _invalidate_top(self, skill: str, count: int) -> None:
+        """Drop the cached top skills if a skill's new count can change them"""
+        cache = self._top_cache
+        if cache is None:
+            return
+        if len(cache) < TOP_SKILLS_CACHE_SIZE or count >= cache[-1][1] or any(s == skill for s, _ in cache):
+            self._top_cache = None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of candidates per skill"""
+        with self._lock:
+            return {skill: len(candidates) for skill, candidates in self._candidates_by_skill.items()}
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The n most common skills as (skill, candidate count), most common first"""
+        if n > TOP_SKILLS_CACHE_SIZE:
+            return heapq.nlargest(n, self.counts().items(), key=lambda item: item[1])
+        with self._lock:
+            if self._top_cache is None:
+                self._top_cache = heapq.nlargest(
+                    TOP_SKILLS_CACHE_SIZE,
+                    ((skill, len(candidates)) for skill, candidates in self._candidates_by_skill.items()),
+                    key=lambda item: item[1]
+                )
+            return self._top_cache[:n]
+
+    def candidates_with(self, skill: str) -> Set[str]:
+        """IDs of the candidates listing a skill"""
+        with self._lock:
+            return set(self._candidates_by_skill.get(skill, ()))
+
+    @property
+    def unique_skills(self) -> int:
+        return len(self._candidates_by_skill)
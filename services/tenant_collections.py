@@ -0,0 +1,182 @@
+"""
+Per-organization ideal-profile collections
+Each organization gets its own collection, opened lazily and kept in an LRU of
+open handles bounded by a handle count and, on the NumPy backend, a memory
+budget, so large tenants do not slow searches for small ones and idle tenants
+do not pin memory
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.rag_service import EmbeddingProvider, RAGService
+
+# Prefix of per-organization collection names: <prefix>_<organization>
+TENANT_COLLECTION_PREFIX = "ideal_profiles"
+
+# Open-handle limits (TENANT_MAX_OPEN and TENANT_MEMORY_BUDGET_MB env)
+DEFAULT_MAX_OPEN = 32
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Organization IDs used verbatim in collection names; anything else is hashed.
+# Keeps names within ChromaDB's rules (3-63 chars of [a-zA-Z0-9._-], alphanumeric ends)
+_SAFE_ORGANIZATION_ID = re.compile(r"[A-Za-z0-9]([A-Za-z0-9_-]{0,38}[A-Za-z0-9])?")
+
+
+def tenant_collection_name(organization_id: str, prefix: str = TENANT_COLLECTION_PREFIX) -> str:
+    """
+    Collection name of an organization
+
+    Raises:
+        ValueError: If the organization ID is empty
+    """
+    organization_id = str(organization_id or "").strip()
+    if not organization_id:
+        raise ValueError("organization_id is required")
+    if not _SAFE_ORGANIZATION_ID.fullmatch(organization_id):
+        organization_id = hashlib.sha256(organization_id.encode("utf-8")).hexdigest()[:24]
+    return f"{prefix}_{organization_id}"
+
+
+class TenantCollections:
+    """
+    LRU of per-organization RAGService instances
+
+    Every organization is served by its own RAGService over its own collection
+    (sharing the process-wide embedding model and vector store client). A
+    service is opened on first use; when more than max_open are open, or
+    their measured memory exceeds the budget, the least recently used ones are
+    closed. Closing only drops in-memory state, so a tenant opened again is
+    reloaded from storage.
+
+    The memory budget applies to NumPy collections only: closing one frees its
+    vectors, and its footprint is measured rather than estimated. ChromaDB
+    keeps a closed collection's segments loaded in the shared client, so
+    ChromaDB tenants are bounded by max_open alone and report no footprint.
+    Footprints are re-measured only after a tenant's collection changes.
+    """
+
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        backend: Optional[str] = None,
+        quantization: Optional[str] = None,
+        max_open: Optional[int] = None,
+        memory_budget_bytes: Optional[int] = None,
+        prefix: str = TENANT_COLLECTION_PREFIX
+    ):
+        """
+        Args:
+            persist_directory: Storage directory (default: CHROMA_DB_PATH env or ./chroma_db)
+            embedding_provider: Embedding model (default: shared provider)
+            backend: Vector store backend, "chroma" or "numpy" (default: RAG_BACKEND env or chroma)
+            quantization: Quantized storage for the numpy backend (default: RAG_QUANTIZATION env)
+            max_open: Maximum open organizations (default: TENANT_MAX_OPEN env or 32)
+            memory_budget_bytes: Memory budget of the open NumPy-backed organizations
+                (default: TENANT_MEMORY_BUDGET_MB env or 256 MB)
+            prefix: Collection name prefix
+        """
+        self._service_options = {
+            "persist_directory": persist_directory,
+            "embedding_provider": embedding_provider,
+            "backend": backend,
+            "quantization": quantization
+        }
+        self.max_open = max_open or int(os.getenv("TENANT_MAX_OPEN", DEFAULT_MAX_OPEN))
+        self.memory_budget_bytes = memory_budget_bytes or int(
+            float(os.getenv("TENANT_MEMORY_BUDGET_MB", DEFAULT_MEMORY_BUDGET_MB)) * 1024 * 1024
+        )
+        self.prefix = prefix
+        # collection name -> [organization ID, service, footprint in bytes (None for ChromaDB)],
+        # least recently used first
+        self._open: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+
+    def get(self, organization_id: str) -> RAGService:
+        """
+        Get the RAGService of an organization, opening it if needed
+
+        Raises:
+            ValueError: If the organization ID is empty
+        """
+        name = tenant_collection_name(organization_id, self.prefix)
+        with self._lock:
+            entry = self._open.get(name)
+            if entry is not None:
+                self._open.move_to_end(name)
+                # Cached by the service until its collection changes, so a plain read is O(1)
+                entry[2] = self._measure(entry[1])
+            else:
+                # Opening adds memory: pick up writes to open tenants before deciding what to evict
+                for open_entry in self._open.values():
+                    open_entry[2] = self._measure(open_entry[1])
+                service = RAGService(collection_name=name, **self._service_options)
+                entry = [str(organization_id).strip(), service, self._measure(service)]
+                self._open[name] = entry
+                self.opened += 1
+            self._evict()
+            return entry[1]
+
+    @staticmethod
+    def _measure(service: RAGService) -> Optional[int]:
+        """Footprint of a NumPy-backed service; None for ChromaDB, which closing cannot free"""
+        return service.memory_footprint() if service.backend == "numpy" else None
+
+    def _memory_bytes(self) -> int:
+        return sum(footprint or 0 for _, _, footprint in self._open.values())
+
+    def _evict(self) -> None:
+        """Close least recently used organizations until within limits, keeping the newest open"""
+        while len(self._open) > 1 and (
+            len(self._open) > self.max_open or self._memory_bytes() > self.memory_budget_bytes
+        ):
+            _, (_, service, _) = self._open.popitem(last=False)
+            service.close()
+            self.evicted += 1
+
+    def release(self, organization_id: str) -> bool:
+        """Close an organization's service; returns whether it was open"""
+        name = tenant_collection_name(organization_id, self.prefix)
+        with self._lock:
+            entry = self._open.pop(name, None)
+        if entry is None:
+            return False
+        entry[1].close()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Open organizations (least recently used first) and their memory"""
+        with self._lock:
+            open_tenants = [
+                {"organization_id": organization_id, "collection_name": name, "memory_bytes": footprint}
+                for name, (organization_id, _, footprint) in self._open.items()
+            ]
+        return {
+            "open": open_tenants,
+            "open_count": len(open_tenants),
+            "max_open": self.max_open,
+            "memory_bytes": sum(tenant["memory_bytes"] or 0 for tenant in open_tenants),
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "opened": self.opened,
+            "evicted": self.evicted
+        }
+
+
+_shared_tenants: Optional[TenantCollections] = None
+_shared_tenants_lock = threading.Lock()
+
+
+def get_tenant_collections() -> TenantCollections:
+    """Get the process-wide per-organization collections, creating them on first use"""
+    global _shared_tenants
+    if _shared_tenants is None:
+        with _shared_tenants_lock:
+            if _shared_tenants is None:
+                _shared_tenants = TenantCollections()
+    return _shared_tenants
@@ -0,0 +1,244 @@
+"""
+Job title resolution
+Maps free-form job titles ("Sr. Software Eng", "Fullstack Dev") to the
+closest known ideal-profile title using character n-gram similarity, with
+an embedding nearest-neighbor fallback for synonyms ("Backend Developer")
+"""
+import os
+import re
+import threading
+from collections import Counter
+from math import sqrt
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Minimum cosine similarity for a title to resolve to a known title
+DEFAULT_TITLE_MATCH_THRESHOLD = 0.55
+
+# Minimum embedding cosine similarity for the fallback resolution
+DEFAULT_TITLE_EMBEDDING_THRESHOLD = 0.6
+
+# Minimum similarity of the distinguishing words (see GENERIC_TITLE_WORDS)
+DEFAULT_DISTINGUISHING_MATCH_THRESHOLD = 0.5
+
+# Seniority and role words shared by many titles. They say little about which
+# role a title is ("Data Engineer" vs "DevOps Engineer"), so the remaining,
+# distinguishing words of two titles must match on their own
+GENERIC_TITLE_WORDS = frozenset({
+    "senior", "junior", "mid", "level", "entry", "lead", "principal", "staff",
+    "chief", "head", "associate", "intern", "trainee", "i", "ii", "iii", "iv",
+    "engineer", "engineers", "developer", "developers", "manager", "analyst",
+    "designer", "specialist", "consultant", "programmer", "architect",
+    "administrator", "coordinator", "officer", "technician",
+})
+
+# Character n-gram size used to compare titles
+NGRAM_SIZE = 3
+
+# Common abbreviations in job titles, expanded before comparing
+TITLE_ABBREVIATIONS: Dict[str, str] = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "jnr": "junior",
+    "mid": "mid level",
+    "eng": "engineer",
+    "engr": "engineer",
+    "dev": "developer",
+    "devs": "developers",
+    "mgr": "manager",
+    "mngr": "manager",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "fe": "frontend",
+    "be": "backend",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "qa": "quality assurance",
+    "pm": "product manager",
+    "ba": "business analyst",
+    "ds": "data scientist",
+}
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title, strip punctuation and expand common abbreviations"""
+    words = re.sub(r"[^\w/+#]+", " ", str(title).casefold()).replace("/", " ").split()
+    return " ".join(TITLE_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> Counter:
+    """Character n-grams of each word, padded so word boundaries count"""
+    grams: Counter = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams[padded] += 1
+            continue
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+def _distinguishing_words(normalized_title: str) -> str:
+    """Words of a normalized title that are not in GENERIC_TITLE_WORDS"""
+    return " ".join(word for word in normalized_title.split() if word not in GENERIC_TITLE_WORDS)
+
+
+def _profile(title: str) -> Tuple[Counter, float, Counter, float]:
+    """N-grams and norms of a title and of its distinguishing words"""
+    normalized = normalize_title(title)
+    grams = _ngrams(normalized)
+    key_grams = _ngrams(_distinguishing_words(normalized))
+    return (
+        grams, sqrt(sum(c * c for c in grams.values())),
+        key_grams, sqrt(sum(c * c for c in key_grams.values()))
+    )
+
+
+def _cosine(a: Counter, b: Counter, norm_a: float, norm_b: float) -> float:
+    if not norm_a or not norm_b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b.get(gram, 0) for gram, count in a.items()) / (norm_a * norm_b)
+
+
+class TitleResolver:
+    """
+    Nearest-neighbor index over known job titles
+
+    Titles are compared as bags of character trigrams after normalization, so
+    abbreviations, punctuation, word order and small spelling differences still
+    match. A title only resolves if its distinguishing words (everything but
+    seniority and generic role words) are also similar, so titles that merely
+    share "Engineer" or "Developer" do not.
+
+    Titles that are spelled differently but mean the same ("Backend Developer",
+    "QA Engineer") fall back to the nearest known title by embedding
+    similarity when an embed function is given. The known titles are embedded
+    once per rebuild. A title with only generic words still never resolves to
+    a more specific one. Resolutions (including misses) are cached until the
+    index is rebuilt.
+    """
+
+    def __init__(
+        self,
+        titles: Iterable[str] = (),
+        threshold: Optional[float] = None,
+        distinguishing_threshold: Optional[float] = None,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+        embedding_threshold: Optional[float] = None
+    ):
+        """
+        Args:
+            titles: Known job titles
+            threshold: Minimum similarity to resolve (default: TITLE_MATCH_THRESHOLD env or 0.55)
+            distinguishing_threshold: Minimum similarity of the distinguishing words
+                (default: TITLE_DISTINGUISHING_THRESHOLD env or 0.5)
+            embed: Function embedding a list of texts, e.g. EmbeddingProvider.embed
+                (None disables the embedding fallback)
+            embedding_threshold: Minimum embedding similarity for the fallback
+                (default: TITLE_EMBEDDING_THRESHOLD env or 0.6)
+        """
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("TITLE_MATCH_THRESHOLD", DEFAULT_TITLE_MATCH_THRESHOLD)
+        )
+        self.distinguishing_threshold = distinguishing_threshold if distinguishing_threshold is not None else float(
+            os.getenv("TITLE_DISTINGUISHING_THRESHOLD", DEFAULT_DISTINGUISHING_MATCH_THRESHOLD)
+        )
+        self.embed = embed
+        self.embedding_threshold = embedding_threshold if embedding_threshold is not None else float(
+            os.getenv("TITLE_EMBEDDING_THRESHOLD", DEFAULT_TITLE_EMBEDDING_THRESHOLD)
+        )
+        self._entries: List[Tuple[str, Counter, float, Counter, float]] = []
+        self._title_vectors: Optional[np.ndarray] = None  # unit embeddings of _entries, on first fallback
+        self._cache: Dict[str, Optional[Tuple[str, float]]] = {}
+        self._lock = threading.Lock()
+        self.rebuild(titles)
+
+    def rebuild(self, titles: Iterable[str]) -> None:
+        """Replace the known titles and clear cached resolutions"""
+        entries = [(title, *_profile(title)) for title in sorted(set(titles))]
+        with self._lock:
+            self._entries = entries
+            self._title_vectors = None
+            self._cache = {}
+
+    def candidates(self, title: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank known titles by similarity to a title
+
+        Returns:
+            List of (known title, similarity) pairs, best first
+        """
+        return [(known, similarity) for known, similarity, _ in self._score(title)[:limit]]
+
+    def _score(self, title: str) -> List[Tuple[str, float, float]]:
+        """(known title, similarity, distinguishing-word similarity) for every known title, best first"""
+        grams, norm, key_grams, key_norm = _profile(title)
+        scored = []
+        for known, known_grams, known_norm, known_key_grams, known_key_norm in self._entries:
+            if not key_norm and not known_key_norm:
+                # Neither title has distinguishing words ("Senior Engineer" vs "Engineer")
+                key_similarity = 1.0
+            else:
+                key_similarity = _cosine(key_grams, known_key_grams, key_norm, known_key_norm)
+            scored.append((known, _cosine(grams, known_grams, norm, known_norm), key_similarity))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    @staticmethod
+    def _unit(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _resolve_by_embedding(self, title: str) -> Optional[Tuple[str, float]]:
+        """Nearest known title by embedding similarity, above the embedding threshold"""
+        with self._lock:
+            entries = self._entries
+            if not entries:
+                return None
+            if self._title_vectors is None:
+                self._title_vectors = self._unit(self.embed([normalize_title(known) for known, *_ in entries]))
+            title_vectors = self._title_vectors
+
+        normalized = normalize_title(title)
+        generic_only = not _distinguishing_words(normalized)
+        similarities = title_vectors @ self._unit(self.embed([normalized]))[0]
+        for i in np.argsort(-similarities):
+            if similarities[i] < self.embedding_threshold:
+                break
+            known, _, _, _, known_key_norm = entries[i]
+            if generic_only and known_key_norm:
+                continue  # "Engineer" alone says nothing about which engineer
+            return known, float(similarities[i])
+        return None
+
+    def resolve(self, title: str) -> Optional[Tuple[str, float]]:
+        """
+        Resolve a title to the closest known title above both thresholds, or
+        else to the nearest one by embedding similarity
+
+        Returns:
+            Tuple of (known title, similarity), or None if nothing is close enough
+        """
+        key = normalize_title(title)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        match = next(
+            (
+                (known, similarity) for known, similarity, key_similarity in self._score(title)
+                if similarity >= self.threshold and key_similarity >= self.distinguishing_threshold
+            ),
+            None
+        )
+        if match is None and self.embed is not None:
+            match = self._resolve_by_embedding(title)
+        with self._lock:
+            self._cache[key] = match
+        return match
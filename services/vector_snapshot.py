@@ -0,0 +1,210 @@
+"""
+Vector store snapshots
+One-file export of an ideal-profile collection (IDs, documents, metadata and
+precomputed embeddings) that a new worker can memory-map and boot from
+without re-embedding anything or needing the chroma_db/ directory
+
+File layout:
+    8 bytes   magic b"TIPSNAP1"
+    8 bytes   header length, little-endian uint64
+    header    UTF-8 JSON: format version, collection, embedding model,
+              dimension, count, vector checksum, ids, documents, metadatas
+    padding   zeros up to a 64-byte boundary
+    vectors   count x dimension little-endian float32 rows
+"""
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"TIPSNAP1"
+SNAPSHOT_FORMAT_VERSION = 1
+_ALIGNMENT = 64
+
+# Records upserted per call when importing into ChromaDB
+IMPORT_BATCH_SIZE = 1000
+
+
+def _checksum(vectors: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(vectors, dtype="<f4").data).hexdigest()
+
+
+def write_snapshot(
+    path: str,
+    ids,
+    vectors: np.ndarray,
+    documents,
+    metadatas,
+    embedding_model: str,
+    collection_name: str
+) -> Dict[str, Any]:
+    """
+    Write a snapshot file atomically (temp file, then rename)
+
+    Returns:
+        The snapshot header without the per-record lists
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    if vectors.ndim != 2:
+        vectors = vectors.reshape(len(ids), -1)
+    header = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "collection_name": collection_name,
+        "embedding_model": embedding_model,
+        "dimension": int(vectors.shape[1]),
+        "count": len(ids),
+        "checksum": _checksum(vectors),
+        "created_at": datetime.now().isoformat(),
+        "ids": list(ids),
+        "documents": list(documents),
+        "metadatas": list(metadatas),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix_length = len(SNAPSHOT_MAGIC) + 8 + len(header_bytes)
+    padding = -prefix_length % _ALIGNMENT
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        f.write(vectors.data)
+    os.replace(tmp_path, path)
+    return {key: value for key, value in header.items() if key not in ("ids", "documents", "metadatas")}
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Read a snapshot, memory-mapping its vectors
+
+    Returns:
+        The header plus "vectors", a read-only (count, dimension) float32 memory map
+
+    Raises:
+        ValueError: If the file is not a snapshot or is truncated
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a vector snapshot")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    if header.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {header.get('format_version')}")
+
+    prefix_length = len(SNAPSHOT_MAGIC) + 8 + header_length
+    offset = prefix_length + (-prefix_length % _ALIGNMENT)
+    count, dimension = header["count"], header["dimension"]
+    if os.path.getsize(path) < offset + count * dimension * 4:
+        raise ValueError(f"{path} is truncated")
+    if count:
+        header["vectors"] = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(count, dimension))
+    else:
+        header["vectors"] = np.zeros((0, dimension), dtype=np.float32)
+    return header
+
+
+def verify_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Check a snapshot's structure and vector checksum
+
+    Returns:
+        {"valid": bool, "errors": [...], plus collection, model, dimension and count}
+    """
+    errors = []
+    try:
+        snapshot = read_snapshot(path)
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        return {"valid": False, "errors": [str(e)]}
+
+    count = snapshot["count"]
+    for field in ("ids", "documents", "metadatas"):
+        if len(snapshot[field]) != count:
+            errors.append(f"{field} has {len(snapshot[field])} entries, expected {count}")
+    if len(set(snapshot["ids"])) != len(snapshot["ids"]):
+        errors.append("duplicate ids")
+    vectors = snapshot["vectors"]
+    if _checksum(vectors) != snapshot["checksum"]:
+        errors.append("vector checksum mismatch")
+    elif count and not np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-3):
+        errors.append("vectors are not unit-normalized")
+    return {
+        "valid": not errors,
+        "errors": errors,
+        "collection_name": snapshot["collection_name"],
+        "embedding_model": snapshot["embedding_model"],
+        "dimension": snapshot["dimension"],
+        "count": count,
+        "created_at": snapshot.get("created_at")
+    }
+
+
+def export_snapshot(rag_service, path: str) -> Dict[str, Any]:
+    """
+    Export a RAGService collection to a snapshot file
+
+    Stored metadata is written as is, so an import restores the collection exactly.
+    """
+    with rag_service._lock:
+        records = rag_service.collection.get(include=["embeddings", "documents", "metadatas"])
+    ids = list(records.get("ids") or [])
+    vectors = np.asarray(records.get("embeddings") if ids else np.zeros((0, 0)), dtype=np.float32)
+    if ids:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+    return write_snapshot(
+        path,
+        ids,
+        vectors,
+        records.get("documents") or [None] * len(ids),
+        records.get("metadatas") or [{}] * len(ids),
+        embedding_model=rag_service.embedding_provider.model_name,
+        collection_name=rag_service.collection.name
+    )
+
+
+def import_snapshot(rag_service, path: str) -> Dict[str, Any]:
+    """
+    Replace a RAGService collection with the contents of a snapshot
+
+    The NumPy backend adopts the memory-mapped vectors directly; ChromaDB
+    collections are upserted in batches (records not in the snapshot are
+    deleted). No document is re-embedded.
+
+    Raises:
+        ValueError: If the snapshot was built with a different embedding model
+    """
+    snapshot = read_snapshot(path)
+    model_name = rag_service.embedding_provider.model_name
+    if snapshot["embedding_model"] != model_name:
+        raise ValueError(
+            f"Snapshot embedded with '{snapshot['embedding_model']}', but the service uses '{model_name}'"
+        )
+
+    ids, vectors = snapshot["ids"], snapshot["vectors"]
+    collection = rag_service.collection
+    with rag_service._lock:
+        if hasattr(collection, "replace_all"):
+            collection.replace_all(ids, vectors, snapshot["documents"], snapshot["metadatas"])
+        else:
+            keep = set(ids)
+            stale = [record_id for record_id in collection.get(include=[])["ids"] if record_id not in keep]
+            if stale:
+                collection.delete(ids=stale)
+            for start in range(0, len(ids), IMPORT_BATCH_SIZE):
+                end = start + IMPORT_BATCH_SIZE
+                collection.upsert(
+                    ids=ids[start:end],
+                    embeddings=np.asarray(vectors[start:end]).tolist(),
+                    documents=snapshot["documents"][start:end],
+                    metadatas=snapshot["metadatas"][start:end]
+                )
+    rag_service.refresh_index()
+    return {key: value for key, value in snapshot.items() if key not in ("ids", "documents", "metadatas", "vectors")}
@@ -0,0 +1,578 @@
+"""
+In-memory NumPy vector store
+A drop-in alternative to a ChromaDB collection for small collections: vectors
+live in one contiguous float32 matrix and are searched exactly with a single
+matrix product, and persisted as a float32 row file plus a JSON record file.
+Large collections can keep only int8 codes resident instead, with the
+float32 vectors memory-mapped from the row file.
+"""
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.quantization import make_quantizer
+
+# Candidates re-ranked with full-precision vectors per requested result
+DEFAULT_RERANK_FACTOR = 4
+
+# Rows encoded or copied per block when a quantized collection is re-encoded
+# or its row file rewritten, bounding the temporary float32 memory
+ROW_BLOCK_ROWS = 4096
+
+# Fields returned when a call does not pass include=
+DEFAULT_GET_INCLUDE = ("metadatas", "documents")
+DEFAULT_QUERY_INCLUDE = ("metadatas", "documents", "distances")
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Chroma-style metadata filter against one metadata dict
+
+    Supports {"key": value}, the $eq, $ne, $gt, $gte, $lt, $lte, $in and $nin
+    operators, and $and / $or combinations.
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        value = metadata.get(key)
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                ok = value == operand
+            elif operator == "$ne":
+                ok = value != operand
+            elif operator == "$in":
+                ok = value in operand
+            elif operator == "$nin":
+                ok = value not in operand
+            elif operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                ok = {
+                    "$gt": value > operand,
+                    "$gte": value >= operand,
+                    "$lt": value < operand,
+                    "$lte": value <= operand,
+                }[operator]
+            else:
+                raise ValueError(f"Unsupported where operator: {operator}")
+            if not ok:
+                return False
+    return True
+
+
+class NumpyCollection:
+    """
+    Vector collection backed by a NumPy matrix
+
+    Implements the subset of the ChromaDB Collection API used by RAGService
+    (add, upsert, query, get, delete, count) with the same argument names and
+    result shapes. Distances are squared L2 like Chroma's default space, which
+    for unit vectors is 2 - 2 * cosine similarity.
+
+    The float32 matrix grows geometrically, and a persisted collection appends
+    new rows to its row file (<name>.f32) and overwrites updated rows in
+    place, so a write costs the rows written rather than the whole matrix.
+
+    With quantization ("int8") searches scan compact codes held in memory,
+    while the float32 vectors stay in a memory-mapped row file (<name>.f32
+    next to the snapshot, or a temporary file for memory-only collections)
+    that is only read to re-rank the best candidates exactly. Upserts append
+    new rows to that file and overwrite updated rows in place, encoding only
+    those rows; only deletes rewrite the file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        persist_directory: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        quantization: Optional[str] = None,
+        rerank: bool = True,
+        rerank_factor: int = DEFAULT_RERANK_FACTOR
+    ):
+        """
+        Args:
+            name: Collection name
+            persist_directory: Directory for the <name>.f32 / <name>.json snapshot, or None for memory only
+            metadata: Collection metadata
+            quantization: None for exact float32 search, "int8" for quantized codes
+            rerank: Re-rank quantized candidates with the full-precision vectors
+            rerank_factor: Candidates re-ranked per requested result
+        """
+        self.name = name
+        self.metadata = metadata or {}
+        self._dir = Path(persist_directory) if persist_directory else None
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        # Unquantized vectors are a view of the first rows of _vector_buffer,
+        # which grows geometrically so appends do not copy every vector
+        # (None while _vectors is a memory map or an array passed in by the caller)
+        self._vector_buffer: Optional[np.ndarray] = None
+        self.quantization = quantization
+        self.rerank = rerank
+        self.rerank_factor = rerank_factor
+        self._quantizer = make_quantizer(quantization) if quantization else None
+        # Codes of the records: a view of the first rows of _code_buffer, which
+        # grows geometrically so appends do not copy every code
+        self._codes: Optional[np.ndarray] = None
+        self._code_buffer: Optional[np.ndarray] = None
+        self._spill_dir = tempfile.TemporaryDirectory(prefix=f"{name}-") if quantization and self._dir is None else None
+        self._load()
+
+    # ---- persistence ----
+
+    @property
+    def _paths(self):
+        return self._dir / f"{self.name}.npy", self._dir / f"{self.name}.json"
+
+    @property
+    def _row_path(self) -> Path:
+        """Float32 row file of a persisted or quantized collection"""
+        if self._dir is not None:
+            return self._dir / f"{self.name}.f32"
+        return Path(self._spill_dir.name) / "vectors.f32"
+
+    def _load(self) -> None:
+        if self._dir is None:
+            return
+        vectors_path, records_path = self._paths
+        if not records_path.exists():
+            return
+        with open(records_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        self.metadata = records.get("metadata") or self.metadata
+        self._ids = records["ids"]
+        self._documents = records["documents"]
+        self._metadatas = records["metadatas"]
+        self._positions = {profile_id: i for i, profile_id in enumerate(self._ids)}
+        dimension = records.get("dimension") or 0
+        count = len(self._ids)
+        if self._quantizer is None:
+            if not count:
+                self._vectors = np.zeros((0, 0), dtype=np.float32)
+            elif self._row_path.exists():
+                self._vectors = np.fromfile(self._row_path, dtype="<f4", count=count * dimension).reshape(count, dimension)
+            else:
+                # Snapshot saved as .npy by an older version: move its vectors to a row file
+                self._vectors = np.load(vectors_path)
+                self._rewrite_rows(self._vectors)
+            self._vector_buffer = self._vectors
+            return
+        if count and not self._row_path.exists():
+            # Snapshot saved without quantization: move its vectors to a row file
+            snapshot = np.load(vectors_path, mmap_mode="r")
+            self._rewrite_rows(snapshot)
+            dimension = snapshot.shape[1]
+        self._map_vectors(dimension)
+        if count:
+            self._requantize()
+
+    def _save(self) -> None:
+        """
+        Write the records atomically (write to a temp file, then rename)
+
+        The vectors are in the row file, which writes update in place before
+        the records are saved; rows past the saved record count are ignored
+        on load.
+        """
+        if self._dir is None:
+            return
+        self._dir.mkdir(parents=True, exist_ok=True)
+        vectors_path, records_path = self._paths
+        tmp_records = records_path.with_suffix(".json.tmp")
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump({
+                "metadata": self.metadata,
+                "dimension": int(self._vectors.shape[1]) if self._vectors.ndim == 2 else 0,
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas,
+            }, f)
+        os.replace(tmp_records, records_path)
+        vectors_path.unlink(missing_ok=True)
+
+    # ---- quantization ----
+
+    def _map_vectors(self, dimension: int) -> None:
+        """Memory-map the float32 rows of the current records read-only"""
+        if not self._ids:
+            self._vectors = np.zeros((0, dimension), dtype=np.float32)
+            return
+        self._vectors = np.memmap(self._row_path, dtype="<f4", mode="r", shape=(len(self._ids), dimension))
+
+    def _write_rows(self, start: int, rows: np.ndarray, updates: Dict[int, np.ndarray]) -> None:
+        """Overwrite updated rows in the row file and write appended rows from row start"""
+        path = self._row_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        row_bytes = rows.shape[1] * 4
+        with open(path, "r+b" if path.exists() else "w+b") as f:
+            for position, vector in updates.items():
+                f.seek(position * row_bytes)
+                f.write(np.ascontiguousarray(vector, dtype="<f4").tobytes())
+            f.seek(start * row_bytes)
+            f.write(np.ascontiguousarray(rows, dtype="<f4").tobytes())
+            f.truncate()
+
+    def _rewrite_rows(self, vectors: np.ndarray, positions: Optional[Sequence[int]] = None) -> None:
+        """Replace the row file with the given rows (all, or those at positions), copied in blocks"""
+        path = self._row_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".f32.tmp")
+        count = len(vectors) if positions is None else len(positions)
+        with open(tmp_path, "wb") as f:
+            for start in range(0, count, ROW_BLOCK_ROWS):
+                block = (vectors[start:start + ROW_BLOCK_ROWS] if positions is None
+                         else vectors[positions[start:start + ROW_BLOCK_ROWS]])
+                f.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+        os.replace(tmp_path, path)
+
+    def _append_vectors(self, rows: np.ndarray) -> None:
+        """Append float32 rows, growing the buffer geometrically"""
+        count = len(self._vectors) if self._vectors.size else 0
+        needed = count + len(rows)
+        if self._vector_buffer is None or len(self._vector_buffer) < needed:
+            buffer = np.empty((max(needed, 2 * count), rows.shape[1]), dtype=np.float32)
+            if count:
+                buffer[:count] = self._vectors
+            self._vector_buffer = buffer
+        self._vector_buffer[count:needed] = rows
+        self._vectors = self._vector_buffer[:needed]
+
+    def _set_codes(self, codes: Optional[np.ndarray]) -> None:
+        self._codes = self._code_buffer = codes
+
+    def _append_codes(self, codes: np.ndarray) -> None:
+        """Append codes, growing the buffer geometrically"""
+        count = len(self._codes)
+        needed = count + len(codes)
+        if len(self._code_buffer) < needed:
+            buffer = np.empty((max(needed, 2 * count), codes.shape[1]), dtype=codes.dtype)
+            buffer[:count] = self._codes
+            self._code_buffer = buffer
+        self._code_buffer[count:needed] = codes
+        self._codes = self._code_buffer[:needed]
+
+    def _requantize(self) -> None:
+        """Train the quantizer if needed and encode every vector"""
+        if not self._quantizer.trained:
+            self._quantizer.fit(np.asarray(self._vectors))
+        self._set_codes(np.concatenate([
+            self._quantizer.encode(self._vectors[start:start + ROW_BLOCK_ROWS])
+            for start in range(0, len(self._ids), ROW_BLOCK_ROWS)
+        ]))
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """
+        Resident memory of the vector data
+
+        Returns:
+            Bytes of resident float32 vectors, quantized codes and codebooks,
+            their total, and what the same vectors take as float32
+        """
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                resident_vectors = 0
+            else:
+                resident_vectors = (self._vector_buffer if self._vector_buffer is not None else self._vectors).nbytes
+            codes = self._code_buffer.nbytes if self._code_buffer is not None else 0
+            codebook = self._quantizer.nbytes() if self._quantizer is not None else 0
+            return {
+                "quantization": self.quantization,
+                "vectors": len(self._ids),
+                "resident_float32_bytes": resident_vectors,
+                "code_bytes": codes,
+                "codebook_bytes": codebook,
+                "total_bytes": resident_vectors + codes + codebook,
+                "float32_bytes": len(self._ids) * (self._vectors.shape[1] if self._vectors.ndim == 2 else 0) * 4,
+            }
+
+    # ---- writes ----
+
+    @staticmethod
+    def _as_matrix(embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _write(self, ids, embeddings, documents, metadatas, replace: bool) -> None:
+        if embeddings is None:
+            raise ValueError("NumpyCollection requires explicit embeddings")
+        vectors = self._as_matrix(embeddings)
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+        if not (len(ids) == len(vectors) == len(documents) == len(metadatas)):
+            raise ValueError("ids, embeddings, documents and metadatas must have the same length")
+
+        with self._lock:
+            if not replace:
+                duplicates = [i for i in ids if i in self._positions]
+                if duplicates:
+                    raise ValueError(f"IDs already exist: {duplicates}")
+            if self._vectors.size and vectors.shape[1] != self._vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self._vectors.shape[1]}"
+                )
+
+            count = len(self._ids)
+            new_rows = []
+            updates: Dict[int, np.ndarray] = {}
+            for i, profile_id in enumerate(ids):
+                position = self._positions.get(profile_id)
+                if position is None:
+                    self._positions[profile_id] = len(self._ids)
+                    self._ids.append(profile_id)
+                    self._documents.append(documents[i])
+                    self._metadatas.append(dict(metadatas[i] or {}))
+                    new_rows.append(vectors[i])
+                else:
+                    self._documents[position] = documents[i]
+                    self._metadatas[position] = dict(metadatas[i] or {})
+                    if position >= count:
+                        new_rows[position - count] = vectors[i]
+                    else:
+                        updates[position] = vectors[i]
+            appended = np.stack(new_rows) if new_rows else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+            if self._quantizer is None:
+                if self._vector_buffer is None and self._vectors.size:
+                    self._vectors = self._vector_buffer = np.array(self._vectors)
+                for position, vector in updates.items():
+                    self._vectors[position] = vector
+                if len(appended):
+                    self._append_vectors(appended)
+                if self._dir is not None:
+                    self._write_rows(count, appended, updates)
+            else:
+                self._write_rows(count, appended, updates)
+                self._map_vectors(vectors.shape[1])
+                self._update_codes(updates, appended)
+            self._save()
+
+    def _update_codes(self, updates: Dict[int, np.ndarray], appended: np.ndarray) -> None:
+        """Encode updated and appended rows only"""
+        if self._codes is None or not self._quantizer.trained:
+            self._requantize()
+            return
+        if updates:
+            positions = list(updates)
+            self._codes[positions] = self._quantizer.encode(np.stack([updates[p] for p in positions]))
+        if len(appended):
+            self._append_codes(self._quantizer.encode(appended))
+
+    def replace_all(self, ids, vectors: np.ndarray, documents, metadatas) -> None:
+        """
+        Replace every record at once, e.g. when booting from a snapshot
+
+        Args:
+            ids: Record IDs
+            vectors: Unit-norm float32 vectors, used as is (a read-only memory map stays mapped)
+            documents: Document per record
+            metadatas: Metadata per record
+        """
+        if not (len(ids) == len(vectors) == len(documents) == len(metadatas)):
+            raise ValueError("ids, vectors, documents and metadatas must have the same length")
+        with self._lock:
+            self._ids = list(ids)
+            self._positions = {record_id: i for i, record_id in enumerate(self._ids)}
+            if len(self._positions) != len(self._ids):
+                raise ValueError("Duplicate IDs")
+            self._documents = list(documents)
+            self._metadatas = [dict(metadata or {}) for metadata in metadatas]
+            self._set_codes(None)
+            if self._quantizer is None:
+                self._vectors = vectors if len(self._ids) else np.zeros((0, 0), dtype=np.float32)
+                self._vector_buffer = None
+                if self._dir is not None:
+                    self._rewrite_rows(self._vectors)
+            else:
+                self._quantizer = make_quantizer(self.quantization)  # retrain on the new data
+                self._rewrite_rows(vectors)
+                self._map_vectors(vectors.shape[1] if vectors.ndim == 2 else 0)
+                if self._ids:
+                    self._requantize()
+            self._save()
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None, **_) -> None:
+        """Add new records; raises ValueError for existing IDs"""
+        self._write(list(ids), embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **_) -> None:
+        """Add records, replacing those whose IDs already exist"""
+        self._write(list(ids), embeddings, documents, metadatas, replace=True)
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None, **_) -> None:
+        """Delete records by ID and/or metadata filter"""
+        with self._lock:
+            drop = set(self._select(ids, where))
+            if not drop:
+                return
+            keep = [i for i in range(len(self._ids)) if i not in drop]
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._positions = {profile_id: i for i, profile_id in enumerate(self._ids)}
+            if self._quantizer is None:
+                self._vectors = self._vectors[keep] if keep else np.zeros((0, self._vectors.shape[1]), dtype=np.float32)
+                self._vector_buffer = self._vectors
+                if self._dir is not None:
+                    self._rewrite_rows(self._vectors)
+            else:
+                self._rewrite_rows(self._vectors, keep)
+                self._map_vectors(self._vectors.shape[1])
+                self._set_codes(self._codes[keep] if self._codes is not None else None)
+            self._save()
+
+    # ---- reads ----
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def _select(self, ids: Optional[Sequence[str]], where: Optional[Dict[str, Any]]) -> List[int]:
+        """Row positions matching the IDs (in the given order) and the filter"""
+        if ids is not None:
+            positions = [self._positions[i] for i in ids if i in self._positions]
+        else:
+            positions = range(len(self._ids))
+        return [p for p in positions if matches_where(self._metadatas[p], where)]
+
+    def _records(self, positions, include) -> Dict[str, Any]:
+        return {
+            "ids": [self._ids[p] for p in positions],
+            "documents": [self._documents[p] for p in positions] if "documents" in include else None,
+            "metadatas": [dict(self._metadatas[p]) for p in positions] if "metadatas" in include else None,
+            "embeddings": self._vectors[list(positions)] if "embeddings" in include else None,
+        }
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = DEFAULT_GET_INCLUDE,
+        **_
+    ) -> Dict[str, Any]:
+        """Get records by ID and/or metadata filter"""
+        with self._lock:
+            positions = self._select(ids, where)
+            start = offset or 0
+            positions = positions[start:start + limit] if limit is not None else positions[start:]
+            return {**self._records(positions, include), "included": list(include)}
+
+    def query(
+        self,
+        query_embeddings,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = DEFAULT_QUERY_INCLUDE,
+        **_
+    ) -> Dict[str, Any]:
+        """
+        Nearest-neighbor search for one or more query embeddings
+
+        Exact for float32 collections; quantized collections scan the codes and
+        optionally re-rank the best candidates with the float32 vectors.
+
+        Returns:
+            Chroma-shaped result: one list per query under ids, documents,
+            metadatas and distances
+        """
+        queries = self._as_matrix(query_embeddings)
+        result: Dict[str, Any] = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+        with self._lock:
+            quantized = self._codes is not None
+            if where:
+                candidates = np.asarray(self._select(None, where), dtype=np.intp)
+            else:
+                candidates = np.arange(len(self._ids))
+            k = min(n_results, len(candidates))
+            depth = min(k * self.rerank_factor, len(candidates)) if quantized and self.rerank else k
+            if k:
+                # (n_candidates, d) @ (d, n_queries) -> cosine similarities
+                if quantized:
+                    similarities = self._quantizer.scores(self._codes[candidates] if where else self._codes, queries)
+                else:
+                    similarities = (self._vectors[candidates] if where else self._vectors) @ queries.T
+            for q in range(len(queries)):
+                if k:
+                    column = similarities[:, q]
+                    top = np.argpartition(-column, depth - 1)[:depth] if depth < len(column) else np.arange(len(column))
+                    scores = column[top]
+                    if quantized and self.rerank:
+                        scores = np.asarray(self._vectors[candidates[top]]) @ queries[q]
+                    order = np.argsort(-scores, kind="stable")[:k]
+                    positions = candidates[top[order]].tolist()
+                    distances = (2.0 - 2.0 * scores[order]).tolist()
+                else:
+                    positions, distances = [], []
+                records = self._records(positions, include)
+                result["ids"].append(records["ids"])
+                result["documents"].append(records["documents"])
+                result["metadatas"].append(records["metadatas"])
+                result["embeddings"].append(records["embeddings"])
+                result["distances"].append(distances if "distances" in include else None)
+        for field in ("documents", "metadatas", "embeddings", "distances"):
+            if field not in include:
+                result[field] = None
+        result["included"] = list(include)
+        return result
+
+
+class NumpyClient:
+    """Holds the NumPy collections of one storage directory"""
+
+    def __init__(self, path: Optional[str] = None, quantization: Optional[str] = None, rerank: bool = True):
+        self.path = path
+        self.quantization = quantization
+        self.rerank = rerank
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None, **_) -> NumpyCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = NumpyCollection(
+                    name,
+                    persist_directory=self.path,
+                    metadata=metadata,
+                    quantization=self.quantization,
+                    rerank=self.rerank
+                )
+                self._collections[name] = collection
+            return collection
+
+    def release_collection(self, name: str) -> None:
+        """Drop the in-memory handle of a collection; its snapshot stays on disk and is reloaded on next use"""
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def delete_collection(self, name: str) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
+        if self.path:
+            for suffix in (".npy", ".f32", ".json"):
+                (Path(self.path) / f"{name}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,43 @@
+# tests/conftest.py
+import sys
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.rag_service import EmbeddingProvider
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic bag-of-words embedding so tests never download a model"""
+
+    DIMENSION = 256
+
+    def __init__(self):
+        super().__init__(model_name="test-hashing")
+        self.forward_passes = 0
+        self.texts_embedded = 0
+
+    def _load_model(self):
+        return object()
+
+    def _encode(self, texts):
+        self.forward_passes += 1
+        self.texts_embedded += len(texts)
+        vectors = np.zeros((len(texts), self.DIMENSION), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"[a-z0-9+#]+", text.lower()):
+                vectors[row, zlib.crc32(token.encode()) % self.DIMENSION] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture
+def embedding_provider():
+    return HashingEmbeddingProvider()
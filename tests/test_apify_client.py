@@ -0,0 +1,218 @@
+# tests/test_apify_client.py
+import sys
+import json
+import asyncio
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scraper.apify_client import ApifyClient, ApifyError, ApifyTimeoutError
+from scraper.apify_scrape import scrape_indeed_jobs
+from models.user_profile import JobSearchParams, ScrapedJobData
+
+
+class FakeApify:
+    """In-process fake of the Apify endpoints used by the scraper"""
+
+    def __init__(self, statuses, items):
+        self.statuses = list(statuses)
+        self.items = items
+        self.requests = []
+        self.aborted = False
+
+    def handle(self, method, path, query, body):
+        self.requests.append((method, path))
+        if method == "POST" and path.endswith("/runs"):
+            return 201, {"data": {"id": "run-1", "status": "READY"}}
+        if method == "POST" and path.endswith("/abort"):
+            self.aborted = True
+            return 200, {"data": {"id": "run-1", "status": "ABORTED"}}
+        if path == "/v2/actor-runs/run-1":
+            status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+            return 200, {"data": {"id": "run-1", "status": status, "defaultDatasetId": "ds-1"}}
+        if path == "/v2/datasets/ds-1/items":
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [len(self.items)])[0])
+            return 200, self.items[offset:offset + limit]
+        return 404, {"error": "not found"}
+
+
+@pytest.fixture
+def fake_apify():
+    servers = []
+
+    def start(statuses, items=()):
+        fake = FakeApify(statuses, list(items))
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload = fake.handle(self.command, parsed.path, parse_qs(parsed.query), body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        fake.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        return fake
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_run_task_polls_without_blocking_event_loop(fake_apify):
+    fake = fake_apify(["RUNNING", "RUNNING", "RUNNING", "SUCCEEDED"])
+
+    async def run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        async with ApifyClient("token", base_url=fake.base_url, poll_interval=0.01, max_poll_interval=0.04) as client:
+            run_data = await client.run_task("task", {"startUrls": []}, timeout=5)
+        done.set()
+        await ticker_task
+        return run_data, ticks
+
+    run_data, ticks = asyncio.run(run())
+    assert run_data["status"] == "SUCCEEDED"
+    assert ticks > 3
+    assert fake.requests.count(("GET", "/v2/actor-runs/run-1")) == 4
+
+
+def test_run_task_aborts_run_after_deadline(fake_apify):
+    fake = fake_apify(["RUNNING"])
+
+    async def run():
+        async with ApifyClient("token", base_url=fake.base_url, poll_interval=0.01) as client:
+            await client.run_task("task", {}, timeout=0.1)
+
+    with pytest.raises(ApifyTimeoutError):
+        asyncio.run(run())
+    assert fake.aborted
+
+
+def test_run_task_aborts_run_when_cancelled(fake_apify):
+    fake = fake_apify(["RUNNING"])
+
+    async def run():
+        async with ApifyClient("token", base_url=fake.base_url, poll_interval=0.01) as client:
+            task = asyncio.create_task(client.run_task("task", {}))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+    assert fake.aborted
+
+
+def test_failed_run_raises_apify_error(fake_apify):
+    fake = fake_apify(["FAILED"])
+
+    async def run():
+        async with ApifyClient("token", base_url=fake.base_url) as client:
+            await client.run_task("task", {})
+
+    with pytest.raises(ApifyError):
+        asyncio.run(run())
+
+
+def test_scrape_indeed_jobs_against_fake_server(fake_apify, monkeypatch):
+    fake = fake_apify(["SUCCEEDED"], [{"jobTitle": "Data Engineer", "description": "Build pipelines"}])
+    monkeypatch.setenv("APIFY_TOKEN", "token")
+    monkeypatch.setenv("APIFY_BASE_URL", fake.base_url)
+
+    result = asyncio.run(scrape_indeed_jobs(
+        search_params=JobSearchParams(job_title="Data Engineer", location="Manila")
+    ))
+
+    assert result == ScrapedJobData(job_title="Data Engineer", job_description="Build pipelines")
+
+
+def test_bulk_scrape_streams_pages_into_job_store(fake_apify, monkeypatch):
+    from scraper.job_store import JobDescriptionStore
+
+    items = [
+        {"url": "https://ph.indeed.com/viewjob?jk=1", "title": "Data Engineer", "description": "Pipelines"},
+        {"url": "https://ph.indeed.com/viewjob?jk=2&from=serp", "title": "ML Engineer", "description": "Models"},
+        {"url": "https://ph.indeed.com/viewjob?jk=3", "title": "Analyst", "description": "Dashboards"},
+    ]
+    fake = fake_apify(["SUCCEEDED"], items)
+    monkeypatch.setenv("APIFY_TOKEN", "token")
+    monkeypatch.setenv("APIFY_BASE_URL", fake.base_url)
+    tracked = [
+        JobSearchParams(url="https://ph.indeed.com/viewjob?jk=1"),
+        JobSearchParams(url="https://ph.indeed.com/viewjob?jk=2"),
+        JobSearchParams(url="https://ph.indeed.com/viewjob?jk=9"),
+    ]
+    store = JobDescriptionStore(persist=False)
+
+    async def run():
+        from scraper import apify_scrape
+        pages = []
+        async for pair in apify_scrape.scrape_indeed_jobs_bulk(tracked, page_size=2):
+            pages.append(pair)
+        return pages, await store.load_bulk(tracked)
+
+    pairs, summary = asyncio.run(run())
+
+    assert fake.requests.count(("POST", "/v2/actor-tasks/gab-domingo~indeed-scraper-task/runs")) == 2
+    assert [params.url for params, _ in pairs] == [
+        "https://ph.indeed.com/viewjob?jk=1",
+        "https://ph.indeed.com/viewjob?jk=2",
+        "https://ph.indeed.com/viewjob?jk=3",
+    ]
+    assert summary == {"requested": 3, "stored": 3, "missing": 1}
+    assert store.get(tracked[1])[0].job_description == "Models"
+
+
+def test_bulk_scrape_skips_items_without_a_description(fake_apify, monkeypatch):
+    from scraper.job_store import JobDescriptionStore
+
+    items = [
+        {"url": "https://ph.indeed.com/viewjob?jk=1", "title": "Data Engineer", "description": "Pipelines"},
+        {"url": "https://ph.indeed.com/viewjob?jk=2", "title": "ML Engineer"},
+        {"url": "https://ph.indeed.com/viewjob?jk=4", "title": "Analyst", "description": ""},
+    ]
+    fake = fake_apify(["SUCCEEDED"], items)
+    monkeypatch.setenv("APIFY_TOKEN", "token")
+    monkeypatch.setenv("APIFY_BASE_URL", fake.base_url)
+    tracked = [
+        JobSearchParams(url="https://ph.indeed.com/viewjob?jk=1"),
+        JobSearchParams(url="https://ph.indeed.com/viewjob?jk=2"),
+    ]
+    store = JobDescriptionStore(persist=False)
+
+    summary = asyncio.run(store.load_bulk(tracked))
+
+    assert summary == {"requested": 2, "stored": 1, "missing": 1}
+    assert store.get(tracked[1]) is None
+    assert store.get(JobSearchParams(url="https://ph.indeed.com/viewjob?jk=4")) is None
@@ -0,0 +1,136 @@
+# tests/test_candidate_index.py
+import sys
+import asyncio
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.candidate_index import CandidateIndex
+from models.user_profile import UserProfile
+
+
+def make_profile(name: str, summary: str, skills) -> UserProfile:
+    return UserProfile(
+        personal_info={
+            "full_name": name,
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "location": "Manila, Philippines",
+            "professional_summary": summary
+        },
+        work_history=[],
+        education=[],
+        skills={"technical": skills, "soft": [], "certifications": []},
+        projects=[]
+    )
+
+
+CANDIDATES = {
+    "ops": make_profile("Ana Cruz", "Platform engineer automating infrastructure.", ["Kubernetes", "Terraform", "AWS", "Docker"]),
+    "data": make_profile("Ben Reyes", "Data scientist building models.", ["Python", "Statistics", "Machine Learning", "SQL"]),
+    "design": make_profile("Cara Lim", "Product designer.", ["Figma", "Wireframing", "Usability Testing"]),
+}
+
+
+def test_candidates_are_recalled_by_embedding_similarity(embedding_provider):
+    index = CandidateIndex(embedding_provider=embedding_provider)
+
+    async def run():
+        assert await index.upsert_candidates(CANDIDATES) == 3
+        first = await index.search("Kubernetes Terraform Docker", n_results=2)
+        await index.remove_candidate("ops")
+        return first, await index.search("Kubernetes Terraform Docker", n_results=3)
+
+    first, after_removal = asyncio.run(run())
+    assert embedding_provider.forward_passes == 3
+    assert first[0]["candidate_id"] == "ops"
+    assert first[0]["full_name"] == "Ana Cruz"
+    assert len(first) == 2
+    assert "ops" not in [m["candidate_id"] for m in after_removal]
+
+
+def test_embedding_runs_off_the_event_loop(embedding_provider, monkeypatch):
+    import threading
+
+    index = CandidateIndex(embedding_provider=embedding_provider)
+    threads = []
+    embed = embedding_provider.embed
+    monkeypatch.setattr(
+        embedding_provider, "embed",
+        lambda texts, cache=True: threads.append(threading.get_ident()) or embed(texts, cache=cache)
+    )
+
+    async def run():
+        await index.upsert_candidates(CANDIDATES)
+        await index.search("Kubernetes Terraform Docker")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_recall_endpoint_ranks_store_candidates_against_ideal_profile(tmp_path, monkeypatch, embedding_provider):
+    import services.rag_service as rag_module
+    import services.candidate_index as index_module
+    from fastapi.testclient import TestClient
+    from database.profiles import PROFILES
+    import app as app_module
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setattr(index_module, "_shared_index", None)
+    for candidate_id, profile in CANDIDATES.items():
+        monkeypatch.setitem(app_module.candidates_store, candidate_id, {"profile_data": profile.model_dump()})
+
+    with TestClient(app_module.app) as client:
+        asyncio.run(app_module.app.state.rag_service.sync_profiles(PROFILES))
+        asyncio.run(app_module.app.state.candidate_index.upsert_candidates(CANDIDATES))
+        response = client.get("/api/shortlisting/recall", params={"job_title": "DevOps Engineer", "n_results": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ideal_profile_id"] is not None
+    assert [m["candidate_id"] for m in body["candidates"]][0] == "ops"
+    assert body["total"] == 2
+
+
+def test_skill_analytics_follow_candidate_uploads_and_deletes(tmp_path, monkeypatch, embedding_provider):
+    import services.rag_service as rag_module
+    import services.candidate_index as index_module
+    from fastapi.testclient import TestClient
+    from services.dashboard_aggregates import DashboardAggregates
+    from services.skill_index import SkillIndex
+    import app as app_module
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setattr(index_module, "_shared_index", None)
+    monkeypatch.setattr(app_module, "candidates_store", {})
+    monkeypatch.setattr(app_module, "skill_index", SkillIndex())
+    monkeypatch.setattr(app_module, "dashboard_aggregates", DashboardAggregates(app_module.skill_index))
+
+    candidates = dict(CANDIDATES, ops2=make_profile("Dan Uy", "SRE.", ["Kubernetes", "Docker", "Docker"]))
+    for candidate_id, profile in candidates.items():
+        app_module.store_candidate(
+            app_module.CandidateResponse(id=candidate_id, profile_data=profile.model_dump(), created_at="2024-01-01"),
+            profile
+        )
+
+    with TestClient(app_module.app) as client:
+        asyncio.run(app_module.app.state.candidate_index.upsert_candidates(candidates))
+        coverage = client.get("/api/analytics/skills-gap").json()["skill_coverage"]
+        assert coverage["Docker"] == {"count": 2, "percentage": 50.0}
+        top_skills = client.get("/api/analytics/statistics").json()["top_skills"]
+        assert top_skills[:2] == [{"skill": "Kubernetes", "count": 2}, {"skill": "Docker", "count": 2}]
+
+        assert client.delete("/api/candidates/ops").status_code == 200
+        assert client.delete("/api/candidates/ops").status_code == 404
+        insights = client.get("/api/market-intelligence/insights").json()
+        assert insights["total_candidates"] == 3
+        assert ["Kubernetes", 1] in insights["top_skills"]
+        assert "Terraform" not in client.get("/api/analytics/skills-gap").json()["skill_coverage"]
+        assert app_module.app.state.candidate_index.count() == 3
@@ -0,0 +1,49 @@
+# tests/test_dashboard_aggregates.py
+import sys
+import random
+from collections import Counter
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.dashboard_aggregates import DashboardAggregates
+from services.skill_index import SkillIndex
+
+
+def test_running_aggregates_match_a_full_recount():
+    rng = random.Random(0)
+    skills = [f"skill-{i}" for i in range(120)]
+    index = SkillIndex()
+    aggregates = DashboardAggregates(index)
+    candidates = {}
+    analyses = []
+
+    for step in range(600):
+        if candidates and rng.random() < 0.2:
+            candidate_id = rng.choice(sorted(candidates))
+            del candidates[candidate_id]
+            index.remove(candidate_id)
+        else:
+            candidate_id = f"c{step}"
+            candidates[candidate_id] = rng.sample(skills[:rng.randint(8, 120)], rng.randint(1, 8))
+            index.add(candidate_id, candidates[candidate_id])
+        analysis = {"match_score": rng.randint(0, 100), "job_title": rng.choice(["Data Scientist", "DevOps Engineer", None])}
+        analyses.append(analysis)
+        aggregates.record_analysis(analysis)
+
+        if step % 25 == 0:
+            expected = Counter(skill for owned in candidates.values() for skill in set(owned))
+            top = aggregates.top_skills(10)
+            assert [count for _, count in top] == sorted(expected.values(), reverse=True)[:10]
+            assert all(expected[skill] == count for skill, count in top)
+
+    assert aggregates.average_match_score == sum(a["match_score"] for a in analyses) / len(analyses)
+    scores = sorted(a["match_score"] for a in analyses if a["job_title"] == "Data Scientist")
+    benchmarks = aggregates.job_benchmarks("Data Scientist")
+    assert benchmarks["sample_size"] == len(scores)
+    assert benchmarks["benchmarks"]["p50"] == scores[len(scores) // 2]
+    assert benchmarks["benchmarks"]["p90"] == scores[int(len(scores) * 0.9)]
+    assert benchmarks["benchmarks"]["mean"] == sum(scores) / len(scores)
+    assert aggregates.job_benchmarks("Product Manager") is None
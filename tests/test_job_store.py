@@ -0,0 +1,127 @@
+# tests/test_job_store.py
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scraper.job_store import JobDescriptionStore, job_cache_key, normalize_job_url
+from models.user_profile import JobSearchParams, ScrapedJobData
+
+PARAMS = JobSearchParams(job_title="Data Engineer", location="Manila")
+
+
+class FakeScraper:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, search_params):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return ScrapedJobData(job_title=search_params.job_title, job_description=f"Scrape #{self.calls}")
+
+
+def test_cache_keys_normalize_urls_and_search_params():
+    assert normalize_job_url("HTTPS://PH.Indeed.com/viewjob/?jk=1&utm_source=x&from=serp#top") == \
+        "https://ph.indeed.com/viewjob?jk=1"
+    assert job_cache_key(JobSearchParams(job_title=" Data  Engineer", location="MANILA")) == \
+        job_cache_key(PARAMS)
+
+
+def test_fresh_entries_are_served_without_scraping():
+    scraper = FakeScraper()
+    store = JobDescriptionStore(ttl_seconds=60, persist=False, fetcher=scraper)
+
+    async def run():
+        first = await store.get_or_fetch(PARAMS)
+        second = await store.get_or_fetch(PARAMS)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert scraper.calls == 1
+    assert first == second
+
+
+def test_concurrent_misses_scrape_once():
+    scraper = FakeScraper(delay=0.05)
+    store = JobDescriptionStore(ttl_seconds=60, persist=False, fetcher=scraper)
+
+    async def run():
+        return await asyncio.gather(*[store.get_or_fetch(PARAMS) for _ in range(4)])
+
+    results = asyncio.run(run())
+    assert scraper.calls == 1
+    assert len({r.job_description for r in results}) == 1
+
+
+def test_stale_entries_are_served_and_refreshed_in_background():
+    scraper = FakeScraper()
+    store = JobDescriptionStore(ttl_seconds=60, persist=False, fetcher=scraper)
+    store.put(PARAMS, ScrapedJobData(job_title="Data Engineer", job_description="Old"), fetched_at=time.time() - 120)
+
+    async def run():
+        stale = await store.get_or_fetch(PARAMS)
+        await asyncio.sleep(0.01)
+        return stale, await store.get_or_fetch(PARAMS)
+
+    stale, refreshed = asyncio.run(run())
+    assert stale.job_description == "Old"
+    assert refreshed.job_description == "Scrape #1"
+    assert scraper.calls == 1
+
+
+def test_entries_are_written_through_to_job_postings(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import database.base
+    from database.models import JobPosting
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    JobPosting.__table__.create(bind=engine)
+    monkeypatch.setattr(database.base, "SessionLocal", sessionmaker(bind=engine))
+
+    scraper = FakeScraper()
+    asyncio.run(JobDescriptionStore(ttl_seconds=60, fetcher=scraper).get_or_fetch(PARAMS))
+
+    # A new process (empty memory) reads the persisted posting instead of scraping
+    restarted = JobDescriptionStore(ttl_seconds=60, fetcher=scraper)
+    job_data, fresh = restarted.get(PARAMS)
+    assert fresh
+    assert job_data.job_description == "Scrape #1"
+    assert scraper.calls == 1
+
+
+def test_legacy_job_postings_table_is_migrated_for_write_through(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import sessionmaker
+    import database.base
+    from database.migrations import migrate_job_postings
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE job_postings (id VARCHAR PRIMARY KEY, organization_id VARCHAR NOT NULL, "
+            "job_title VARCHAR(255) NOT NULL, location VARCHAR(255), job_description TEXT NOT NULL, "
+            "url VARCHAR(500), posted_date DATETIME, created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO job_postings (id, organization_id, job_title, job_description) "
+            "VALUES ('p1', 'acme', 'Analyst', 'Existing posting')"
+        ))
+
+    assert migrate_job_postings(engine)
+    columns = {c["name"]: c for c in inspect(engine).get_columns("job_postings")}
+    assert {"source_key", "scraped_at"} <= set(columns) and columns["organization_id"]["nullable"]
+    assert migrate_job_postings(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT job_description FROM job_postings")).scalar() == "Existing posting"
+
+    monkeypatch.setattr(database.base, "SessionLocal", sessionmaker(bind=engine))
+    store = JobDescriptionStore(ttl_seconds=60, fetcher=FakeScraper())
+    asyncio.run(store.get_or_fetch(PARAMS))
+    assert store.persist
+    assert JobDescriptionStore(ttl_seconds=60).get(PARAMS)[0].job_description == "Scrape #1"
@@ -0,0 +1,73 @@
+# tests/test_prompt_encoding.py
+import sys
+import json
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils.prompt_templates import encode_profile_compact, estimate_tokens, get_resume_analysis_prompt
+from models.user_profile import UserProfile, ScrapedJobData
+
+test_profile = UserProfile(
+    personal_info={
+        "full_name": "Gabriel Domingo",
+        "email": "gabriel.domingo@gmail.com",
+        "location": "Manila, Philippines",
+        "professional_summary": "Software engineer building scalable systems. " * 20
+    },
+    work_history=[
+        {
+            "company": "Microsoft",
+            "title": "Software Engineer",
+            "start_date": "2020-01",
+            "end_date": "2023-01",
+            "description": "Developed and maintained software applications using Python and React. " * 10,
+            "achievements": [f"Achievement {i}" for i in range(20)]
+        }
+    ],
+    education=[
+        {
+            "institution": "University of the Philippines",
+            "degree": "Bachelor of Science in Computer Science",
+            "field_of_study": "Computer Science",
+            "graduation_date": "2020",
+            "relevant_coursework": [f"Course {i}" for i in range(20)]
+        }
+    ],
+    skills={"technical": ["Python", "React", "SQL"], "soft": [], "certifications": []},
+    projects=[]
+)
+
+
+def test_compact_encoding_drops_empty_fields_and_whitespace():
+    text, tokens = encode_profile_compact(test_profile, token_budget=None)
+    data = json.loads(text)
+
+    assert "gpa" not in data["education"][0]
+    assert "projects" not in data
+    assert "certifications" not in data["skills"]
+    assert "\n" not in text and '": ' not in text
+    assert tokens == estimate_tokens(text)
+    assert len(text) < len(json.dumps(test_profile.model_dump(), indent=2))
+
+
+def test_compact_encoding_truncates_low_value_fields_to_budget():
+    _, full_tokens = encode_profile_compact(test_profile, token_budget=None)
+    text, tokens = encode_profile_compact(test_profile, token_budget=300)
+    data = json.loads(text)
+
+    assert tokens < full_tokens
+    assert tokens <= 300
+    assert "achievements" not in data["work_history"][0]
+    assert data["skills"]["technical"] == ["Python", "React", "SQL"]
+    assert data["personal_info"]["full_name"] == "Gabriel Domingo"
+
+
+def test_analysis_prompt_uses_compact_profile():
+    job = ScrapedJobData(job_title="Software Engineer", job_description="Build APIs")
+    prompt = get_resume_analysis_prompt(test_profile, job)
+
+    assert encode_profile_compact(test_profile)[0] in prompt
+    assert '"job_title":"Software Engineer"' in prompt
@@ -0,0 +1,546 @@
+# tests/test_rag_service.py
+import sys
+import asyncio
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.rag_service import RAGService
+
+
+def test_ideal_profile_lookup_is_memoized_until_collection_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    rag_service = RAGService(collection_name="memo_test")
+    calls = []
+
+    async def fake_search(query, job_title=None, n_results=3):
+        calls.append(query)
+        return [{"id": "p1", "similarity_score": 1.0, "profile": {"job_title": job_title}, "document": ""}]
+
+    rag_service.search_ideal_profiles = fake_search
+
+    async def run():
+        for _ in range(5):
+            match = await rag_service.get_ideal_profile("Data Scientist")
+            assert match["profile"]["job_title"] == "Data Scientist"
+        await rag_service.delete_profile("missing")
+        await rag_service.get_ideal_profile("Data Scientist")
+
+    asyncio.run(run())
+    assert calls == ["Data Scientist", "Data Scientist"]
+
+
+def test_ideal_profile_memo_is_bounded_and_returns_copies(tmp_path, monkeypatch):
+    import services.rag_service as rag_module
+    from services.query_cache import QueryResultCache
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_ideal_profile_memo", QueryResultCache(max_entries=2))
+    rag_service = RAGService(collection_name="memo_bound_test")
+
+    async def fake_search(query, job_title=None, n_results=3):
+        return [{"id": "p1", "similarity_score": 1.0, "profile": {"job_title": job_title}, "document": ""}]
+
+    rag_service.search_ideal_profiles = fake_search
+
+    async def run():
+        first = await rag_service.get_ideal_profile("Data Scientist")
+        first["profile"]["job_title"] = "modified by caller"
+        again = await rag_service.get_ideal_profile("Data Scientist")
+        for title in ["Astronaut", "Pastry Chef", "Nurse"]:
+            await rag_service.get_ideal_profile(title)
+        return again
+
+    again = asyncio.run(run())
+    assert again["profile"]["job_title"] == "Data Scientist"
+    assert len(rag_module._ideal_profile_memo) == 2
+
+
+def test_same_named_collections_in_different_stores_do_not_share_lookups(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    first = RAGService(collection_name="ideal_candidate_profiles", persist_directory=str(tmp_path / "a"),
+                       embedding_provider=embedding_provider, backend="numpy")
+    second = RAGService(collection_name="ideal_candidate_profiles", persist_directory=str(tmp_path / "b"),
+                        embedding_provider=embedding_provider, backend="numpy")
+    asyncio.run(first.sync_profiles([p for p in PROFILES if p["job_title"] == "Data Scientist"]))
+
+    assert asyncio.run(first.get_ideal_profile("Data Scientist"))["profile"]["job_title"] == "Data Scientist"
+    assert asyncio.run(second.get_ideal_profile("Data Scientist")) is None
+    assert first.collection_version != second.collection_version
+
+
+def test_rag_services_share_client_and_app_injects_one_instance(tmp_path, monkeypatch, embedding_provider):
+    import services.rag_service as rag_module
+    from fastapi.testclient import TestClient
+
+    first = RAGService(collection_name="shared_a", persist_directory=str(tmp_path))
+    second = RAGService(collection_name="shared_b", persist_directory=str(tmp_path))
+    assert first.client is second.client
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    import app as app_module
+
+    with TestClient(app_module.app) as client:
+        service = app_module.app.state.rag_service
+        assert service is rag_module.get_rag_service()
+        for _ in range(2):
+            response = client.get("/api/ideal-profiles/stats")
+            assert response.status_code == 200
+            assert response.json()["profile_count"] == 0
+        assert app_module.app.state.rag_service is service
+
+
+def test_profiles_are_indexed_and_queried_with_the_configured_provider(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="provider_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+
+    async def run():
+        for profile in PROFILES[:4]:
+            await rag_service.add_ideal_profile(profile)
+        return await rag_service.search_ideal_profiles("machine learning statistics python", n_results=1)
+
+    results = asyncio.run(run())
+    assert results[0]["profile"]["job_title"] == "Data Scientist"
+    assert embedding_provider.forward_passes == 5
+    assert rag_service.get_collection_stats()["embedding_model"] == "test-hashing"
+
+
+def test_readiness_reports_ready_only_after_warmup(tmp_path, monkeypatch, embedding_provider):
+    import services.rag_service as rag_module
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    assert TestClient(app_module.app).get("/api/ready").status_code == 503
+
+    with TestClient(app_module.app) as client:
+        embedding_provider.warmup()
+        response = client.get("/api/ready")
+        assert response.status_code == 200
+        assert response.json()["embedding_model"] == "test-hashing"
+
+
+def test_title_lookups_use_the_title_index_without_embedding(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="title_index_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+
+    async def run():
+        for profile in PROFILES[:4]:
+            await rag_service.add_ideal_profile(profile)
+        passes = embedding_provider.forward_passes
+        exact = await rag_service.search_ideal_profiles("Data Scientist", job_title="Data Scientist")
+        folded = await rag_service.get_ideal_profile("  data   SCIENTIST ")
+        missing = await rag_service.search_ideal_profiles("anything", job_title="Astronaut")
+        assert embedding_provider.forward_passes == passes
+        return exact, folded, missing
+
+    exact, folded, missing = asyncio.run(run())
+    assert [r["profile"]["job_title"] for r in exact] == ["Data Scientist"]
+    assert exact[0]["similarity_score"] == 1.0
+    assert folded["profile"]["job_title"] == "Data Scientist"
+    assert missing == []
+
+    # A fresh service over the same collection rebuilds the index from Chroma
+    reopened = RAGService(
+        collection_name="title_index_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    asyncio.run(reopened.delete_profile(exact[0]["id"]))
+    assert asyncio.run(reopened.search_ideal_profiles("Data Scientist", job_title="Data Scientist")) == []
+
+
+def test_unknown_titles_resolve_to_the_nearest_known_title(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+    from services.title_resolver import TitleResolver
+
+    resolver = TitleResolver([p["job_title"] for p in PROFILES], threshold=0.55)
+    assert resolver.resolve("Sr. Software Eng")[0] == "Senior Software Engineer"
+    assert resolver.resolve("Fullstack Dev")[0] == "Full Stack Developer"
+    assert resolver.resolve("Pastry Chef") is None
+    # Sharing only a generic role word is not a match
+    for title in ["Data Engineer", "Sales Engineer", "Engineer", "Java Developer"]:
+        assert resolver.resolve(title) is None, title
+
+    rag_service = RAGService(
+        collection_name="title_resolution_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+
+    async def run():
+        for profile in PROFILES[:3]:
+            await rag_service.add_ideal_profile(profile)
+        return await rag_service.get_ideal_profile("Sr Software Engineer"), await rag_service.get_ideal_profile("Nurse")
+
+    match, miss = asyncio.run(run())
+    assert match["profile"]["job_title"] == "Senior Software Engineer"
+    assert match["resolved_title"] == "Senior Software Engineer"
+    assert miss is None
+
+
+def test_synonym_titles_fall_back_to_embedding_similarity(embedding_provider):
+    from database.profiles import PROFILES
+    from services.title_resolver import TitleResolver
+
+    # Stand-in for a semantic model: "backend developer" means "software engineer"
+    synonyms = {"backend": "software", "developer": "engineer"}
+
+    def embed(texts):
+        return embedding_provider.embed([" ".join(synonyms.get(w, w) for w in t.split()) for t in texts], cache=False)
+
+    resolver = TitleResolver([p["job_title"] for p in PROFILES], embed=embed)
+    assert resolver.resolve("Backend Developer") == ("Software Engineer", pytest.approx(1.0))
+    assert resolver.resolve("Sr. Software Eng")[0] == "Senior Software Engineer"
+    # Only generic words, or nothing similar enough: still unresolved
+    for title in ["Developer", "Data Engineer", "Pastry Chef"]:
+        assert resolver.resolve(title) is None, title
+
+
+def test_numpy_backend_matches_chroma_and_persists_snapshot(tmp_path, embedding_provider):
+    import services.rag_service as rag_module
+    from database.profiles import PROFILES
+
+    def build(backend, directory):
+        return RAGService(
+            collection_name="backend_test",
+            persist_directory=str(directory),
+            embedding_provider=embedding_provider,
+            backend=backend
+        )
+
+    chroma = build("chroma", tmp_path / "chroma")
+    numpy_service = build("numpy", tmp_path / "numpy")
+    query = "cloud infrastructure kubernetes automation"
+
+    async def run():
+        for profile in PROFILES:
+            await chroma.add_ideal_profile(profile)
+            await numpy_service.add_ideal_profile(profile)
+        return (
+            await chroma.search_ideal_profiles(query, n_results=3),
+            await numpy_service.search_ideal_profiles(query, n_results=3),
+            await numpy_service.search_ideal_profiles(query, job_title="data scientist", n_results=3),
+        )
+
+    from_chroma, from_numpy, filtered = asyncio.run(run())
+    assert [r["profile"]["job_title"] for r in from_numpy] == [r["profile"]["job_title"] for r in from_chroma]
+    for a, b in zip(from_chroma, from_numpy):
+        assert abs(a["similarity_score"] - b["similarity_score"]) < 1e-4
+    assert [r["profile"]["job_title"] for r in filtered] == ["Data Scientist"]
+    assert numpy_service.get_collection_stats()["backend"] == "numpy"
+
+    # A new process reloads the row file/JSON snapshot
+    rag_module._clients.pop(("numpy", str(tmp_path / "numpy")))
+    reloaded = build("numpy", tmp_path / "numpy")
+    assert reloaded.collection is not numpy_service.collection
+    assert reloaded.get_collection_stats()["profile_count"] == len(PROFILES)
+    assert asyncio.run(reloaded.search_ideal_profiles(query, n_results=3)) == from_numpy
+
+
+def test_batch_search_embeds_all_queries_in_one_pass(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="batch_search_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    queries = [
+        "machine learning statistics python",
+        "Product Manager",
+        "kubernetes ci cd pipelines",
+        "roadmap stakeholders",
+        "anything",
+    ]
+    job_titles = [None, "product manager", None, "Product Manager", "Astronaut"]
+
+    async def run():
+        for profile in PROFILES:
+            await rag_service.add_ideal_profile(profile)
+        passes = embedding_provider.forward_passes
+        batch = await rag_service.search_ideal_profiles_batch(queries, job_titles, n_results=2)
+        batch_passes = embedding_provider.forward_passes - passes
+        single = [
+            await rag_service.search_ideal_profiles(q, t, n_results=2)
+            for q, t in zip(queries, job_titles)
+        ]
+        return batch, batch_passes, single
+
+    batch, batch_passes, single = asyncio.run(run())
+    assert batch_passes == 1
+    assert batch == single
+    assert batch[1][0]["profile"]["job_title"] == "Product Manager"
+    assert batch[4] == []
+
+
+def test_reads_are_served_from_the_decoded_profile_cache(tmp_path, monkeypatch, embedding_provider):
+    from database.profiles import PROFILES
+    from models.user_profile import IdealProfile
+
+    rag_service = RAGService(
+        collection_name="profile_cache_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+
+    async def load():
+        return [await rag_service.add_ideal_profile(profile) for profile in PROFILES[:3]]
+
+    ids = asyncio.run(load())
+    typed = rag_service.get_profile(ids[0])
+    assert isinstance(typed, IdealProfile)
+    assert typed.years_experience == PROFILES[0]["years_experience"]
+    assert typed.must_have_skills == PROFILES[0]["must_have_skills"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("metadata decoded on read")
+
+    monkeypatch.setattr(RAGService, "_parse_metadata", staticmethod(fail))
+
+    async def read():
+        return (
+            await rag_service.get_all_profiles(),
+            await rag_service.search_ideal_profiles("python rest apis", n_results=2),
+        )
+
+    all_profiles, results = asyncio.run(read())
+    assert [p["profile"]["job_title"] for p in all_profiles] == [p["job_title"] for p in PROFILES[:3]]
+    assert all_profiles[0]["profile"]["must_have_skills"] == PROFILES[0]["must_have_skills"]
+    assert all(isinstance(r["profile"]["years_experience"], int) for r in results)
+
+
+def test_sync_profiles_only_embeds_new_and_changed_profiles(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="sync_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    profiles = [dict(p) for p in PROFILES[:5]]
+
+    first = asyncio.run(rag_service.sync_profiles(profiles, batch_size=2))
+    assert first == {"added": 5, "updated": 0, "unchanged": 0, "deleted": 0}
+    assert embedding_provider.texts_embedded == 5
+    assert embedding_provider.forward_passes == 3
+    ids = {p["id"] for p in asyncio.run(rag_service.get_all_profiles())}
+
+    assert asyncio.run(rag_service.sync_profiles(profiles)) == {"added": 0, "updated": 0, "unchanged": 5, "deleted": 0}
+    assert embedding_provider.texts_embedded == 5
+
+    profiles[0] = {**profiles[0], "years_experience": 7}
+    second = asyncio.run(rag_service.sync_profiles(profiles[:4] + [PROFILES[5]]))
+    assert second == {"added": 1, "updated": 1, "unchanged": 3, "deleted": 1}
+    assert embedding_provider.texts_embedded == 7
+
+    stored = asyncio.run(rag_service.get_all_profiles())
+    assert len(stored) == 5
+    assert ids - {p["id"] for p in stored} == {rag_service._stable_profile_ids([PROFILES[4]])[0]}
+    match = asyncio.run(rag_service.get_ideal_profile(PROFILES[0]["job_title"]))
+    assert match["profile"]["years_experience"] == 7
+
+
+@pytest.mark.parametrize("backend", ["numpy", "chroma"])
+def test_profiles_synced_by_another_process_are_picked_up_on_read(tmp_path, embedding_provider, backend):
+    import subprocess
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="external_sync_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider,
+        backend=backend
+    )
+    rag_service.change_check_interval = 0
+    asyncio.run(rag_service.sync_profiles(PROFILES[:2]))
+    assert asyncio.run(rag_service.get_ideal_profile("Data Scientist")) is None
+
+    # Same as running database/load_profiles.py against the app's storage
+    script = (
+        "import asyncio\n"
+        "from database.profiles import PROFILES\n"
+        "from services.rag_service import RAGService\n"
+        "from tests.conftest import HashingEmbeddingProvider\n"
+        f"service = RAGService('external_sync_test', {str(tmp_path)!r}, HashingEmbeddingProvider(), {backend!r})\n"
+        "asyncio.run(service.sync_profiles(PROFILES[:4]))\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=str(project_root), check=True)
+
+    match = asyncio.run(rag_service.get_ideal_profile("Data Scientist"))
+    assert match["profile"]["job_title"] == "Data Scientist"
+    assert len(asyncio.run(rag_service.get_all_profiles())) == 4
+    assert rag_service.get_collection_stats()["profile_count"] == 4
+
+
+def test_hybrid_and_lexical_search_rank_keyword_matches(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+    from services.lexical_index import BM25Index, reciprocal_rank_fusion
+
+    index = BM25Index()
+    index.add("a", "Kubernetes Terraform AWS")
+    index.add("b", "Kubernetes Kubernetes React")
+    index.add("c", "Excel reporting")
+    assert [doc_id for doc_id, _ in index.search("terraform kubernetes")] == ["a", "b"]
+    index.remove("a")
+    assert [doc_id for doc_id, _ in index.search("terraform")] == []
+    assert [doc_id for doc_id, _ in reciprocal_rank_fusion([["x", "y"], ["y", "z"]])] == ["y", "x", "z"]
+
+    rag_service = RAGService(
+        collection_name="hybrid_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    asyncio.run(rag_service.sync_profiles(PROFILES))
+    keyword_titles = {"DevOps Engineer", "Senior Software Engineer"}
+
+    passes = embedding_provider.forward_passes
+    lexical = asyncio.run(rag_service.search_ideal_profiles("Kubernetes Terraform", n_results=2, mode="lexical"))
+    assert embedding_provider.forward_passes == passes
+    assert {r["profile"]["job_title"] for r in lexical} == keyword_titles
+    assert lexical[0]["similarity_score"] == 1.0
+
+    hybrid = asyncio.run(rag_service.search_ideal_profiles("Kubernetes Terraform", n_results=3))
+    assert embedding_provider.forward_passes == passes + 1
+    assert {r["profile"]["job_title"] for r in hybrid[:2]} == keyword_titles
+    assert hybrid[0]["rrf_score"] >= hybrid[1]["rrf_score"] >= hybrid[2]["rrf_score"]
+
+    filtered = asyncio.run(rag_service.search_ideal_profiles(
+        "Kubernetes Terraform", job_title="DevOps Engineer", mode="lexical"
+    ))
+    assert [r["profile"]["job_title"] for r in filtered] == ["DevOps Engineer"]
+
+
+def test_embedding_cache_skips_the_model_for_unchanged_documents(tmp_path):
+    from database.profiles import PROFILES
+    from services.embedding_cache import EmbeddingCache
+    from tests.conftest import HashingEmbeddingProvider
+
+    def provider_with_cache():
+        provider = HashingEmbeddingProvider()
+        provider.cache = EmbeddingCache(str(tmp_path / "cache"), provider.model_name)
+        return provider
+
+    first = provider_with_cache()
+    rag_service = RAGService(collection_name="cache_a", persist_directory=str(tmp_path), embedding_provider=first)
+    asyncio.run(rag_service.sync_profiles(PROFILES))
+    asyncio.run(rag_service.search_ideal_profiles("python apis", n_results=1))
+    assert first.texts_embedded == len(PROFILES) + 1
+    assert len(first.cache) == len(PROFILES)  # queries are not cached
+
+    # A rebuild in a new process reads every document vector from the cache
+    second = provider_with_cache()
+    rebuilt = RAGService(collection_name="cache_b", persist_directory=str(tmp_path), embedding_provider=second)
+    asyncio.run(rebuilt.sync_profiles(PROFILES))
+    assert second.forward_passes == 0
+    assert rebuilt.get_collection_stats()["embedding_cache"]["hit_rate"] == 1.0
+    expected = first.embed(["Job Title: Data Scientist"], cache=False)
+    assert np.allclose(second.embed(["Job Title: Data Scientist"]), expected)
+
+    # A torn write (vector appended without its key) is dropped on load
+    with open(tmp_path / "cache" / "test-hashing.f32", "ab") as f:
+        f.write(np.ones(HashingEmbeddingProvider.DIMENSION, dtype=np.float32).tobytes())
+    reloaded = EmbeddingCache(str(tmp_path / "cache"), "test-hashing")
+    assert len(reloaded) == len(PROFILES) + 1
+    found, missing = reloaded.lookup(["Job Title: Data Scientist"])
+    assert not missing and np.allclose(found[0], expected[0])
+
+
+def test_embedding_cache_shared_by_two_processes_keeps_rows_aligned(tmp_path):
+    from services.embedding_cache import EmbeddingCache
+
+    def vector(value):
+        return np.full((1, 4), value, dtype=np.float32)
+
+    worker_a = EmbeddingCache(str(tmp_path), "model")
+    worker_b = EmbeddingCache(str(tmp_path), "model")
+    worker_a.store(["alpha"], vector(1.0))
+    worker_b.store(["beta"], vector(2.0))  # B never loaded alpha's row
+    worker_a.store(["gamma", "alpha"], np.vstack([vector(3.0), vector(1.0)]))
+
+    for cache in (worker_a, worker_b, EmbeddingCache(str(tmp_path), "model")):
+        found, missing = cache.lookup(["alpha", "beta", "gamma"])
+        for position in found:
+            assert np.allclose(found[position], position + 1.0)
+    found, missing = worker_b.lookup(["beta"])
+    assert not missing and np.allclose(found[0], 2.0)
+    assert len(EmbeddingCache(str(tmp_path), "model")) == 3
+
+
+def test_search_results_are_cached_until_the_collection_changes(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="query_cache_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    asyncio.run(rag_service.sync_profiles(PROFILES[:4]))
+    passes = embedding_provider.forward_passes
+
+    first = asyncio.run(rag_service.search_ideal_profiles("kubernetes terraform", n_results=3))
+    first[0]["profile"]["job_title"] = "modified by caller"
+    again = asyncio.run(rag_service.search_ideal_profiles("kubernetes terraform", n_results=3))
+    assert embedding_provider.forward_passes == passes + 1
+    assert again[0]["profile"]["job_title"] != "modified by caller"
+    assert rag_service.get_collection_stats()["query_cache"]["hits"] == 1
+
+    # Adding a profile bumps the version, so the next search is recomputed
+    devops = next(p for p in PROFILES if p["job_title"] == "DevOps Engineer")
+    new_id = asyncio.run(rag_service.add_ideal_profile(devops))
+    after_add = asyncio.run(rag_service.search_ideal_profiles("kubernetes terraform", n_results=3))
+    assert embedding_provider.forward_passes == passes + 3  # the new document and the query
+    assert new_id in [r["id"] for r in after_add]
+
+    asyncio.run(rag_service.delete_profile(new_id))
+    after_delete = asyncio.run(rag_service.search_ideal_profiles("kubernetes terraform", n_results=3))
+    assert new_id not in [r["id"] for r in after_delete]
+    assert rag_service.query_cache.stale == 2
+
+
+def test_profiles_are_listed_in_pages_with_projection_and_title_filter(tmp_path, embedding_provider):
+    from database.profiles import PROFILES
+
+    rag_service = RAGService(
+        collection_name="listing_test",
+        persist_directory=str(tmp_path),
+        embedding_provider=embedding_provider
+    )
+    asyncio.run(rag_service.sync_profiles(PROFILES))
+
+    seen = []
+    cursor = None
+    while True:
+        page = asyncio.run(rag_service.list_profiles(limit=4, cursor=cursor, fields=["job_title"]))
+        assert page["total"] == len(PROFILES)
+        assert all(set(p["profile"]) == {"job_title"} and "document" not in p for p in page["profiles"])
+        seen.extend(p["id"] for p in page["profiles"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted({p["id"] for p in asyncio.run(rag_service.get_all_profiles())})
+
+    engineers = asyncio.run(rag_service.list_profiles(job_title="ENGINEER", include_document=True))
+    titles = [p["profile"]["job_title"] for p in engineers["profiles"]]
+    assert titles and all("engineer" in title.lower() for title in titles)
+    assert engineers["total"] == len(titles)
+    assert all(p["document"] for p in engineers["profiles"])
@@ -0,0 +1,186 @@
+# tests/test_resume_batch.py
+import sys
+import json
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from agents.resume_agent import ResumeAnalyzer
+from models.user_profile import UserProfile, JobSearchParams, ScrapedJobData
+
+
+def make_profile(name: str) -> UserProfile:
+    return UserProfile(
+        personal_info={
+            "full_name": name,
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "location": "Manila, Philippines",
+            "professional_summary": "Backend engineer working with Python and SQL."
+        },
+        work_history=[],
+        education=[],
+        skills={"technical": ["Python", "SQL"], "soft": [], "certifications": []},
+        projects=[]
+    )
+
+
+def analysis_item(candidate_id: str, score: int) -> dict:
+    return {
+        "candidate_id": candidate_id,
+        "match_score": score,
+        "suggestions": ["Add metrics"],
+        "key_matches": ["Python"],
+        "gaps": ["Kubernetes"]
+    }
+
+
+class FakeModels:
+    """Stands in for client.aio.models and replays canned LLM responses"""
+
+    def __init__(self, responses, delay: float = 0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.prompts = []
+
+    async def generate_content(self, model, contents, config):
+        self.prompts.append(contents)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text=self.responses.pop(0))
+
+
+def make_analyzer(monkeypatch, responses, delay: float = 0, collection: str = "ideal_candidate_profiles") -> ResumeAnalyzer:
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    analyzer = ResumeAnalyzer(rag_service=SimpleNamespace(collection=SimpleNamespace(name=collection)))
+    analyzer.client = SimpleNamespace(aio=SimpleNamespace(models=FakeModels(responses, delay)))
+
+    async def resolve(job_params, use_rag):
+        job = ScrapedJobData(job_title="Software Engineer", job_description="Build APIs in Python")
+        return job, None, use_rag
+
+    analyzer._resolve_job_data = resolve
+    return analyzer
+
+
+def test_batch_sends_job_context_once(monkeypatch):
+    batch = {"results": [analysis_item("a", 80), analysis_item("b", 40)]}
+    analyzer = make_analyzer(monkeypatch, [json.dumps(batch)])
+
+    results = asyncio.run(analyzer.analyze_candidates_batch(
+        {"a": make_profile("Ana Cruz"), "b": make_profile("Ben Reyes")},
+        JobSearchParams(job_title="Software Engineer", location="")
+    ))
+
+    prompts = analyzer.client.aio.models.prompts
+    assert len(prompts) == 1
+    assert prompts[0].count("Build APIs in Python") == 1
+    assert results["a"].match_score == 80
+    assert results["b"].metadata["quick_judgment"]["recommendation"] == "reject"
+
+
+def test_invalid_batch_items_fall_back_to_single_calls(monkeypatch):
+    batch = {"results": [analysis_item("a", 75), dict(analysis_item("b", 140))]}
+    single = analysis_item("b", 55)
+    single.pop("candidate_id")
+    analyzer = make_analyzer(monkeypatch, [json.dumps(batch), json.dumps(single)])
+
+    results = asyncio.run(analyzer.analyze_candidates_batch(
+        {"a": make_profile("Ana Cruz"), "b": make_profile("Ben Reyes")},
+        JobSearchParams(job_title="Software Engineer", location="")
+    ))
+
+    assert len(analyzer.client.aio.models.prompts) == 2
+    assert results["a"].match_score == 75
+    assert results["b"].match_score == 55
+
+
+def test_identical_concurrent_analyses_share_one_call(monkeypatch):
+    single = analysis_item("a", 66)
+    single.pop("candidate_id")
+    analyzer = make_analyzer(monkeypatch, [json.dumps(single)], delay=0.05)
+    profile = make_profile("Ana Cruz")
+    job_params = JobSearchParams(job_title="Software Engineer", location="")
+    before = ResumeAnalyzer.get_coalescing_stats()["coalesced_requests"]
+
+    async def run():
+        return await asyncio.gather(*[
+            analyzer.analyze_resume_and_jd(profile, job_params) for _ in range(3)
+        ])
+
+    results = asyncio.run(run())
+
+    assert len(analyzer.client.aio.models.prompts) == 1
+    assert [r.match_score for r in results] == [66, 66, 66]
+    results[0].metadata["edited"] = True
+    results[0].gaps.append("edited")
+    assert "edited" not in results[1].metadata and "edited" not in results[2].gaps
+    stats = ResumeAnalyzer.get_coalescing_stats()
+    assert stats["coalesced_requests"] - before == 2
+    assert stats["in_flight"] == 0
+
+
+def test_analyses_against_different_collections_are_not_shared(monkeypatch):
+    single = analysis_item("a", 66)
+    single.pop("candidate_id")
+    acme = make_analyzer(monkeypatch, [json.dumps(single)], delay=0.05, collection="tenant_acme")
+    other = dict(single, match_score=31)
+    globex = make_analyzer(monkeypatch, [json.dumps(other)], delay=0.05, collection="tenant_globex")
+    profile = make_profile("Ana Cruz")
+    job_params = JobSearchParams(job_title="Software Engineer", location="")
+
+    async def run():
+        return await asyncio.gather(
+            acme.analyze_resume_and_jd(profile, job_params),
+            globex.analyze_resume_and_jd(profile, job_params)
+        )
+
+    results = asyncio.run(run())
+
+    assert [r.match_score for r in results] == [66, 31]
+    assert len(acme.client.aio.models.prompts) == 1
+    assert len(globex.client.aio.models.prompts) == 1
+
+
+def test_identical_concurrent_batches_share_one_call(monkeypatch):
+    batch = {"results": [analysis_item("a", 80), analysis_item("b", 40)]}
+    analyzer = make_analyzer(monkeypatch, [json.dumps(batch)], delay=0.05)
+    profiles = {"a": make_profile("Ana Cruz"), "b": make_profile("Ben Reyes")}
+    job_params = JobSearchParams(job_title="Software Engineer", location="")
+    before = ResumeAnalyzer.get_coalescing_stats()["coalesced_requests"]
+
+    async def run():
+        return await asyncio.gather(
+            analyzer.analyze_candidates_batch(profiles, job_params),
+            analyzer.analyze_candidates_batch(dict(reversed(list(profiles.items()))), job_params)
+        )
+
+    first, second = asyncio.run(run())
+
+    assert len(analyzer.client.aio.models.prompts) == 1
+    assert first == second and first is not second
+    assert first["a"].match_score == 80
+    first["a"].metadata["edited"] = True
+    assert first["a"] is not second["a"] and "edited" not in second["a"].metadata
+    stats = ResumeAnalyzer.get_coalescing_stats()
+    assert stats["coalesced_requests"] - before == 1
+    assert stats["in_flight"] == 0
+
+
+def test_fractional_and_unbuildable_batch_items_do_not_abort_the_batch(monkeypatch):
+    unbuildable = dict(analysis_item("b", 40), suggestions=[{"not": "a string"}])
+    batch = {"results": [analysis_item("a", 72.5), unbuildable]}
+    single = analysis_item("b", 44)
+    single.pop("candidate_id")
+    analyzer = make_analyzer(monkeypatch, [json.dumps(batch), json.dumps(single)])
+
+    results = asyncio.run(analyzer.analyze_candidates_batch(
+        {"a": make_profile("Ana Cruz"), "b": make_profile("Ben Reyes")},
+        JobSearchParams(job_title="Software Engineer", location="")
+    ))
+
+    assert results["a"].match_score == 72
+    assert results["b"].match_score == 44
+    assert len(analyzer.client.aio.models.prompts) == 2
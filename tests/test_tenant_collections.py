@@ -0,0 +1,147 @@
+# tests/test_tenant_collections.py
+import sys
+import asyncio
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from database.profiles import PROFILES
+from services.tenant_collections import TenantCollections, tenant_collection_name
+
+
+def test_organizations_get_isolated_collections_with_lru_eviction(tmp_path, embedding_provider):
+    tenants = TenantCollections(
+        persist_directory=str(tmp_path), embedding_provider=embedding_provider, backend="numpy", max_open=2
+    )
+
+    async def run():
+        await tenants.get("acme").sync_profiles(PROFILES[:3])
+        await tenants.get("globex").sync_profiles(PROFILES[3:4])
+        assert tenants.get("acme").get_collection_stats()["profile_count"] == 3
+        assert tenants.get("globex").get_collection_stats()["profile_count"] == 1
+
+        # Opening a third organization closes the least recently used one (acme)
+        tenants.get("initech")
+        assert [t["organization_id"] for t in tenants.stats()["open"]] == ["globex", "initech"]
+        assert tenants.evicted == 1
+
+        # A reopened organization is reloaded from storage
+        profiles = await tenants.get("acme").get_all_profiles()
+        assert sorted(p["profile"]["job_title"] for p in profiles) == sorted(p["job_title"] for p in PROFILES[:3])
+
+    asyncio.run(run())
+
+
+def test_memory_budget_evicts_idle_organizations(tmp_path, embedding_provider):
+    tenants = TenantCollections(
+        persist_directory=str(tmp_path), embedding_provider=embedding_provider, backend="numpy",
+        max_open=10, memory_budget_bytes=1
+    )
+    asyncio.run(tenants.get("big").sync_profiles(PROFILES))
+    tenants.get("small")
+    assert tenants.stats()["open_count"] == 1
+    assert tenants.stats()["open"][0]["organization_id"] == "small"
+
+
+def test_footprints_are_measured_after_writes_not_reads(tmp_path, embedding_provider):
+    tenants = TenantCollections(persist_directory=str(tmp_path), embedding_provider=embedding_provider, backend="numpy")
+    service = tenants.get("acme")
+    measurements = []
+    memory_usage = service.collection.memory_usage
+    service.collection.memory_usage = lambda: measurements.append(1) or memory_usage()
+
+    for _ in range(5):
+        tenants.get("acme")
+    assert measurements == []
+
+    asyncio.run(service.sync_profiles(PROFILES[:3]))
+    tenants.get("acme")
+    tenants.get("acme")
+    assert len(measurements) == 1
+    assert tenants.stats()["memory_bytes"] > 0
+
+
+def test_memory_budget_does_not_apply_to_chroma(tmp_path, embedding_provider):
+    tenants = TenantCollections(
+        persist_directory=str(tmp_path), embedding_provider=embedding_provider, backend="chroma",
+        max_open=2, memory_budget_bytes=1
+    )
+    asyncio.run(tenants.get("big").sync_profiles(PROFILES[:3]))
+    tenants.get("small")
+    assert tenants.stats()["open_count"] == 2
+    assert all(t["memory_bytes"] is None for t in tenants.stats()["open"])
+    tenants.get("third")
+    assert [t["organization_id"] for t in tenants.stats()["open"]] == ["small", "third"]
+
+
+def test_collection_names_are_valid_for_any_organization_id():
+    assert tenant_collection_name("acme-42") == "ideal_profiles_acme-42"
+    hashed = tenant_collection_name("Acme Corp / EU")
+    assert hashed.startswith("ideal_profiles_") and len(hashed) <= 63
+    assert hashed != tenant_collection_name("Acme Corp / US")
+
+
+def test_tenant_collection_comes_from_the_authenticated_user(tmp_path, monkeypatch, embedding_provider):
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    import services.rag_service as rag_module
+    import services.tenant_collections as tenant_module
+    from auth.security import get_current_user, get_optional_user
+    import app as app_module
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setattr(tenant_module, "_shared_tenants", None)
+    recruiter = SimpleNamespace(organization_id="acme", role="recruiter", is_active=True)
+
+    with TestClient(app_module.app) as client:
+        asyncio.run(app_module.app.state.rag_service.sync_profiles(PROFILES[:2]))
+
+        # Anonymous callers read the shared collection and cannot sync
+        assert client.post("/api/ideal-profiles/sync", json={"profiles": PROFILES[:1]}).status_code == 401
+        assert client.get("/api/ideal-profiles/stats").json()["profile_count"] == 2
+
+        app_module.app.dependency_overrides[get_current_user] = lambda: recruiter
+        app_module.app.dependency_overrides[get_optional_user] = lambda: recruiter
+        try:
+            response = client.post("/api/ideal-profiles/sync", json={"profiles": PROFILES[2:3]})
+            assert response.json() == {"added": 1, "updated": 0, "unchanged": 0, "deleted": 0}
+            stats = client.get("/api/ideal-profiles/stats").json()
+            assert stats["collection_name"] == "ideal_profiles_acme" and stats["profile_count"] == 1
+            assert client.get("/api/ideal-profiles/tenants").status_code == 403
+        finally:
+            app_module.app.dependency_overrides.clear()
+
+    assert app_module.app.state.rag_service.get_collection_stats()["profile_count"] == 2
+
+
+def test_new_organization_reads_the_shared_profiles_until_it_syncs(tmp_path, monkeypatch, embedding_provider):
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    import services.rag_service as rag_module
+    import services.tenant_collections as tenant_module
+    from auth.security import get_current_user, get_optional_user
+    import app as app_module
+
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(rag_module, "_shared_provider", embedding_provider)
+    monkeypatch.setattr(rag_module, "_shared_service", None)
+    monkeypatch.setattr(tenant_module, "_shared_tenants", None)
+    recruiter = SimpleNamespace(organization_id="fresh-org", role="recruiter", is_active=True)
+
+    with TestClient(app_module.app) as client:
+        asyncio.run(app_module.app.state.rag_service.sync_profiles(PROFILES[:3]))
+        app_module.app.dependency_overrides[get_current_user] = lambda: recruiter
+        app_module.app.dependency_overrides[get_optional_user] = lambda: recruiter
+        try:
+            stats = client.get("/api/ideal-profiles/stats").json()
+            assert stats["collection_name"] == "ideal_candidate_profiles" and stats["profile_count"] == 3
+
+            client.post("/api/ideal-profiles/sync", json={"profiles": PROFILES[3:4]})
+            stats = client.get("/api/ideal-profiles/stats").json()
+            assert stats["collection_name"] == "ideal_profiles_fresh-org" and stats["profile_count"] == 1
+        finally:
+            app_module.app.dependency_overrides.clear()
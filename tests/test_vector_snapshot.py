@@ -0,0 +1,58 @@
+# tests/test_vector_snapshot.py
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from database.profiles import PROFILES
+from services.rag_service import RAGService
+from services.vector_snapshot import export_snapshot, import_snapshot, verify_snapshot
+
+
+def test_snapshot_round_trip_boots_a_collection_without_embedding(tmp_path, embedding_provider):
+    source = RAGService(collection_name="snapshot_source", persist_directory=str(tmp_path / "a"),
+                        embedding_provider=embedding_provider)
+    asyncio.run(source.sync_profiles(PROFILES))
+    snapshot_path = tmp_path / "ideal_profiles.snap"
+    header = export_snapshot(source, str(snapshot_path))
+    assert header["count"] == len(PROFILES)
+
+    result = verify_snapshot(str(snapshot_path))
+    assert result["valid"] and result["embedding_model"] == "test-hashing"
+
+    for backend in ("numpy", "chroma"):
+        passes = embedding_provider.forward_passes
+        worker = RAGService(collection_name="snapshot_worker", persist_directory=str(tmp_path / backend),
+                            embedding_provider=embedding_provider, backend=backend)
+        import_snapshot(worker, str(snapshot_path))
+        assert embedding_provider.forward_passes == passes
+        assert worker.get_collection_stats()["profile_count"] == len(PROFILES)
+        assert (asyncio.run(worker.get_ideal_profile("Data Scientist"))["id"]
+                == asyncio.run(source.get_ideal_profile("Data Scientist"))["id"])
+        expected = asyncio.run(source.search_ideal_profiles("python machine learning", mode="vector"))
+        found = asyncio.run(worker.search_ideal_profiles("python machine learning", mode="vector"))
+        assert [r["id"] for r in found] == [r["id"] for r in expected]
+
+
+def test_corrupt_or_mismatched_snapshots_are_rejected(tmp_path, embedding_provider):
+    source = RAGService(collection_name="snapshot_bad", persist_directory=str(tmp_path),
+                        embedding_provider=embedding_provider)
+    asyncio.run(source.sync_profiles(PROFILES[:3]))
+    snapshot_path = tmp_path / "bad.snap"
+    export_snapshot(source, str(snapshot_path))
+
+    embedding_provider.model_name = "another-model"
+    with pytest.raises(ValueError):
+        import_snapshot(source, str(snapshot_path))
+
+    data = bytearray(snapshot_path.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+    assert verify_snapshot(str(snapshot_path))["errors"] == ["vector checksum mismatch"]
+    snapshot_path.write_bytes(bytes(data[:-8]))
+    assert not verify_snapshot(str(snapshot_path))["valid"]
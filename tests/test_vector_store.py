@@ -0,0 +1,137 @@
+# tests/test_vector_store.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from services.vector_store import NumpyCollection
+
+
+def clustered_vectors(count, dim=64, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    vectors = centers[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def recall_at_k(collection, exact, queries, k=10):
+    found = collection.query(query_embeddings=queries, n_results=k, include=[])["ids"]
+    expected = exact.query(query_embeddings=queries, n_results=k, include=[])["ids"]
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(found, expected)])
+
+
+@pytest.mark.parametrize("quantization,rerank,min_recall,max_ratio", [
+    ("int8", False, 0.9, 0.32),
+    ("int8", True, 0.98, 0.32),
+])
+def test_quantized_collections_shrink_memory_and_keep_recall(quantization, rerank, min_recall, max_ratio):
+    vectors = clustered_vectors(2000)
+    queries = clustered_vectors(20, seed=1)
+    ids = [f"c{i}" for i in range(len(vectors))]
+
+    exact = NumpyCollection("exact")
+    exact.add(ids=ids, embeddings=vectors)
+    quantized = NumpyCollection("quantized", quantization=quantization, rerank=rerank)
+    quantized.add(ids=ids[:1000], embeddings=vectors[:1000])
+    quantized.add(ids=ids[1000:], embeddings=vectors[1000:])
+
+    memory = quantized.memory_usage()
+    assert memory["resident_float32_bytes"] == 0
+    assert memory["total_bytes"] <= max_ratio * memory["float32_bytes"]
+    assert recall_at_k(quantized, exact, queries) >= min_recall
+
+    quantized.delete(ids=ids[:10])
+    assert quantized.count() == 1990
+    assert not set(quantized.query(query_embeddings=vectors[:5], n_results=3, include=[])["ids"][0]) & set(ids[:10])
+
+
+def test_quantized_collection_reloads_from_snapshot(tmp_path):
+    vectors = clustered_vectors(300)
+    ids = [f"c{i}" for i in range(len(vectors))]
+    collection = NumpyCollection("snap", persist_directory=str(tmp_path), quantization="int8")
+    collection.add(ids=ids, embeddings=vectors, metadatas=[{"group": i % 3} for i in range(300)])
+
+    reloaded = NumpyCollection("snap", persist_directory=str(tmp_path), quantization="int8")
+    result = reloaded.query(query_embeddings=vectors[:1], n_results=1, where={"group": 0})
+    assert result["ids"] == [["c0"]]
+    assert abs(result["distances"][0][0]) < 1e-5
+    assert isinstance(reloaded._vectors, np.memmap)
+
+
+def test_quantized_upserts_append_and_encode_only_the_written_rows(tmp_path, monkeypatch):
+    vectors = clustered_vectors(400)
+    ids = [f"c{i}" for i in range(len(vectors))]
+    collection = NumpyCollection("rows", persist_directory=str(tmp_path), quantization="int8")
+    collection.add(ids=ids[:200], embeddings=vectors[:200])
+
+    encoded = []
+    encode = collection._quantizer.encode
+    monkeypatch.setattr(collection._quantizer, "encode", lambda rows: encoded.append(len(rows)) or encode(rows))
+    monkeypatch.setattr(collection, "_rewrite_rows", None)  # a full rewrite would fail
+    # 200 new rows, plus c0 updated to c399's vector
+    collection.upsert(ids=ids[200:] + ids[:1], embeddings=np.vstack([vectors[200:], vectors[399:]]))
+    assert sorted(encoded) == [1, 200]
+    assert (tmp_path / "rows.f32").stat().st_size == 400 * vectors.shape[1] * 4
+    assert not (tmp_path / "rows.npy").exists()
+
+    reloaded = NumpyCollection("rows", persist_directory=str(tmp_path), quantization="int8")
+    result = reloaded.query(query_embeddings=vectors[399:], n_results=2)
+    assert sorted(result["ids"][0]) == ["c0", "c399"]
+    assert max(result["distances"][0]) < 1e-5
+
+    reloaded.delete(ids=["c399"])
+    again = NumpyCollection("rows", persist_directory=str(tmp_path), quantization="int8")
+    assert again.count() == 399
+    assert again.query(query_embeddings=vectors[399:], n_results=1, include=[])["ids"] == [["c0"]]
+
+
+def test_product_quantization_is_not_selectable():
+    with pytest.raises(ValueError):
+        NumpyCollection("pq", quantization="pq")
+
+
+def test_float32_upserts_append_rows_and_grow_the_buffer_geometrically(tmp_path, monkeypatch):
+    vectors = clustered_vectors(300)
+    ids = [f"c{i}" for i in range(len(vectors))]
+    collection = NumpyCollection("exact", persist_directory=str(tmp_path))
+    monkeypatch.setattr(collection, "_rewrite_rows", None)  # a full rewrite would fail
+    monkeypatch.setattr(np, "save", None)
+
+    buffers = set()
+    for i in range(len(vectors)):
+        collection.add(ids=[ids[i]], embeddings=vectors[i:i + 1])
+        buffers.add(id(collection._vector_buffer))
+    collection.upsert(ids=ids[:1], embeddings=vectors[299:])
+    assert len(buffers) <= 10
+    assert (tmp_path / "exact.f32").stat().st_size == 300 * vectors.shape[1] * 4
+    assert not (tmp_path / "exact.npy").exists()
+
+    reloaded = NumpyCollection("exact", persist_directory=str(tmp_path))
+    result = reloaded.query(query_embeddings=vectors[299:], n_results=2)
+    assert sorted(result["ids"][0]) == ["c0", "c299"]
+    assert max(result["distances"][0]) < 1e-5
+    assert np.allclose(reloaded.get(ids=["c150"], include=["embeddings"])["embeddings"], vectors[150:151])
+
+
+def test_float32_snapshot_saved_as_npy_moves_to_a_row_file(tmp_path):
+    import json
+
+    vectors = clustered_vectors(20)
+    np.save(tmp_path / "legacy.npy", vectors)
+    (tmp_path / "legacy.json").write_text(json.dumps({
+        "metadata": {}, "dimension": vectors.shape[1], "ids": [f"c{i}" for i in range(20)],
+        "documents": [None] * 20, "metadatas": [{}] * 20,
+    }))
+
+    collection = NumpyCollection("legacy", persist_directory=str(tmp_path))
+    collection.add(ids=["new"], embeddings=vectors[:1])
+    assert not (tmp_path / "legacy.npy").exists()
+
+    reloaded = NumpyCollection("legacy", persist_directory=str(tmp_path))
+    assert reloaded.count() == 21
+    assert reloaded.query(query_embeddings=vectors[5:6], n_results=1, include=[])["ids"] == [["c5"]]
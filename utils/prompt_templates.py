@@ -1,8 +1,25 @@
 from models import UserProfile, ScrapedJobData, ResumeAnalysisResult
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import json
 from datetime import datetime
 
+# Rough characters-per-token ratio for English text and compact JSON
+CHARS_PER_TOKEN = 4
+
+# Default token budget for a single candidate profile embedded in a prompt
+DEFAULT_PROFILE_TOKEN_BUDGET = 1200
+
+# Truncation stages applied in order until the profile fits its token budget.
+# Each stage maps a list field to the number of items kept (0 drops the field)
+# and caps free-text fields to a number of characters.
+_COMPACTION_STAGES: List[Dict[str, Any]] = [
+    {"lists": {"achievements": 2, "relevant_coursework": 3}, "text_chars": None},
+    {"lists": {"achievements": 0, "relevant_coursework": 0, "url": 0}, "text_chars": 400},
+    {"lists": {"achievements": 0, "relevant_coursework": 0, "url": 0, "soft": 5}, "text_chars": 160},
+]
+
+_TEXT_FIELDS = ("description", "professional_summary")
+
 def serialize_for_prompt(obj: Any) -> Any:
     """Helper function to serialize objects for prompt generation"""
     if isinstance(obj, datetime):
@@ -11,6 +28,76 @@ def serialize_for_prompt(obj: Any) -> Any:
         return obj.model_dump(mode='json')  # Use Pydantic's json mode
     return obj
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _drop_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings, empty lists and empty dicts"""
+    if isinstance(value, dict):
+        pruned = {k: _drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [_drop_empty(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+def _compact(value: Any, lists: Dict[str, int], text_chars: Optional[int]) -> Any:
+    """Apply one truncation stage to a pruned profile structure"""
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in lists and lists[key] == 0:
+                continue
+            if key in lists and isinstance(item, list):
+                item = item[:lists[key]]
+            elif key in _TEXT_FIELDS and text_chars and isinstance(item, str) and len(item) > text_chars:
+                item = item[:text_chars].rstrip() + "…"
+            compacted[key] = _compact(item, lists, text_chars)
+        return compacted
+    if isinstance(value, list):
+        return [_compact(item, lists, text_chars) for item in value]
+    return value
+
+def _dumps_compact(value: Any) -> str:
+    """Serialize to JSON without pretty-print whitespace"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def encode_profile_compact(
+    profile: Any,
+    token_budget: Optional[int] = DEFAULT_PROFILE_TOKEN_BUDGET
+) -> Tuple[str, int]:
+    """
+    Serialize a candidate profile for a prompt using as few tokens as possible
+
+    Empty and default fields are dropped and minimal JSON separators are used.
+    If the result exceeds token_budget, low-value fields (achievements, coursework,
+    project URLs, soft skills, long descriptions) are truncated stage by stage.
+    Core fields are never removed, so the result can still exceed the budget.
+
+    Args:
+        profile: UserProfile model or plain dict
+        token_budget: Maximum estimated tokens, or None to skip truncation
+
+    Returns:
+        Tuple of (compact JSON text, estimated token count)
+    """
+    profile_data = profile.model_dump(mode='json') if hasattr(profile, 'model_dump') else profile
+    pruned = _drop_empty(profile_data)
+
+    text = _dumps_compact(pruned)
+    tokens = estimate_tokens(text)
+    if token_budget is None:
+        return text, tokens
+
+    for stage in _COMPACTION_STAGES:
+        if tokens <= token_budget:
+            break
+        text = _dumps_compact(_compact(pruned, stage["lists"], stage["text_chars"]))
+        tokens = estimate_tokens(text)
+
+    return text, tokens
+
 def _format_experience(work_history: list) -> str:
     """Format work history for prompt"""
     return "\n".join([
@@ -31,11 +118,10 @@ def get_resume_analysis_prompt(profile: UserProfile, job_data: ScrapedJobData) -
     Generate prompt for overall resume analysis
     """
     # Handle both Pydantic models and dictionaries
-    profile_data = profile.model_dump() if hasattr(profile, 'model_dump') else profile
     job_data_dict = job_data.model_dump() if hasattr(job_data, 'model_dump') else job_data
     
-    profile_json = json.dumps(profile_data, indent=2)
-    job_data_json = json.dumps(job_data_dict, indent=2)
+    profile_json, _ = encode_profile_compact(profile)
+    job_data_json = _dumps_compact(job_data_dict)
     
     return f"""You are an expert resume analyzer. Analyze this candidate's profile against the job requirements and provide a comprehensive breakdown for quick judgment.
 
@@ -74,6 +160,61 @@ def get_resume_analysis_prompt(profile: UserProfile, job_data: ScrapedJobData) -
     - quick_judgment: Help recruiters make fast decisions
     - recommendation: "shortlist" for 70+, "maybe" for 50-69, "reject" for <50, but adjust based on critical gaps"""
 
+def get_batch_resume_analysis_prompt(profiles: Dict[str, UserProfile], job_data: ScrapedJobData) -> str:
+    """
+    Generate prompt for analyzing several candidates against the same job in one call
+
+    The job details are included once; each candidate profile is keyed by its ID
+    so results can be matched back to the candidate.
+    """
+    job_data_dict = job_data.model_dump() if hasattr(job_data, 'model_dump') else job_data
+    job_data_json = _dumps_compact(job_data_dict)
+
+    candidates_block = "\n".join(
+        f"- candidate_id: {candidate_id}\n  profile: {encode_profile_compact(profile)[0]}"
+        for candidate_id, profile in profiles.items()
+    )
+
+    return f"""You are an expert resume analyzer. Analyze EACH of the following candidates independently against the same job requirements and provide a comprehensive breakdown for quick judgment.
+
+    JOB DETAILS:
+    {job_data_json}
+
+    CANDIDATES ({len(profiles)}):
+    {candidates_block}
+
+    IMPORTANT: Respond ONLY with a JSON object in the following format, with exactly one entry per candidate and no additional text, thoughts, or explanations:
+    {{
+        "results": [
+            {{
+                "candidate_id": "the candidate_id exactly as given above",
+                "match_score": number between 0-100 (overall match score),
+                "candidate_overview": "A concise 2-3 sentence summary of the candidate's fit for this role",
+                "section_scores": {{
+                    "experience": number 0-100,
+                    "skills": number 0-100,
+                    "education": number 0-100,
+                    "overall_fit": number 0-100
+                }},
+                "key_matches": [list of 3-5 main areas where candidate strongly matches requirements - be specific],
+                "gaps": [list of 3-5 specific gaps or missing requirements - prioritize critical gaps first],
+                "suggestions": [list of 3-5 specific, actionable suggestions for improvement],
+                "quick_judgment": {{
+                    "strength_1": "Top strength for this role (one short phrase)",
+                    "strength_2": "Second strength (one short phrase)",
+                    "concern_1": "Top concern or gap (one short phrase)",
+                    "concern_2": "Second concern (one short phrase)",
+                    "recommendation": "shortlist" | "maybe" | "reject"
+                }}
+            }}
+        ]
+    }}
+
+    Guidelines for scoring:
+    - Score every candidate on its own merits; do not rank candidates against each other
+    - match_score: Weighted average considering all factors, prioritize must-have skills and experience
+    - recommendation: "shortlist" for 70+, "maybe" for 50-69, "reject" for <50, but adjust based on critical gaps"""
+
 def get_section_analysis_prompt(
     profile: UserProfile,
     job_data: ScrapedJobData,
@@ -81,11 +222,10 @@ def get_section_analysis_prompt(
 ) -> str:
     
     # Handle both Pydantic models and dictionaries
-    profile_data = profile.model_dump() if hasattr(profile, 'model_dump') else profile
     job_data_dict = job_data.model_dump() if hasattr(job_data, 'model_dump') else job_data
     
-    profile_json = json.dumps(profile_data, indent=2)
-    job_data_json = json.dumps(job_data_dict, indent=2)
+    profile_json, _ = encode_profile_compact(profile)
+    job_data_json = _dumps_compact(job_data_dict)
     
     
     """